@@ -1,16 +1,20 @@
-from django.conf import settings
-from apps.core.models import Company
+from django.utils.functional import SimpleLazyObject
+
+from apps.core.services.company_profile import company_profile
 
 def company_info(request):
-    context = {}
-    try:
-        # Get the first company (you might want to modify this based on your needs)
-        company = Company.objects.first()
-        if company:
-            context['company'] = company
-            context['company_name'] = company.name
-    except Exception as e:
-        # Fallback to default name if company doesn't exist
-        context['company_name'] = "BUMDES"
-    
-    return context
+    """
+    Profil perusahaan untuk template, dimuat malas: template yang tidak
+    memakai `company` / `company_name` (fragment AJAX, admin) tidak
+    menyentuh cache maupun database.
+    """
+    company = SimpleLazyObject(company_profile)
+
+    def company_name():
+        # Fallback ke nama default jika belum ada company
+        return company.name if company else "BUMDES"
+
+    return {
+        'company': company,
+        'company_name': SimpleLazyObject(company_name),
+    }
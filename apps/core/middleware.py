@@ -0,0 +1,190 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from apps.core.services.user_roles import bind_session, release_session
+
+logger = logging.getLogger('apps.core.query_metrics')
+
+# Jumlah fingerprint duplikat / karakter SQL yang ikut ditulis ke log
+MAX_DUPLICATES_LOGGED = 5
+MAX_SQL_LENGTH = 500
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_SPACES = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """SQL tanpa nilai (placeholder, literal, isi IN (...)) → query yang sama bentuknya."""
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _LITERAL.sub('?', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+# ==========================================================
+# 📊 PENCATAT QUERY (dipasang via connection.execute_wrapper)
+# ==========================================================
+class QueryMetrics:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = (0.0, '')
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.total += elapsed
+            if elapsed > self.slowest[0]:
+                self.slowest = (elapsed, sql)
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self):
+        return [
+            {'sql': sql[:MAX_SQL_LENGTH], 'count': count}
+            for sql, count in self.fingerprints.most_common(MAX_DUPLICATES_LOGGED)
+            if count > 1
+        ]
+
+    def as_dict(self):
+        return {
+            'queries': self.count,
+            'db_ms': round(self.total * 1000, 2),
+            'slowest_ms': round(self.slowest[0] * 1000, 2),
+            'slowest_sql': self.slowest[1][:MAX_SQL_LENGTH],
+            'duplicates': self.duplicates(),
+        }
+
+
+# ==========================================================
+# 🧭 MIDDLEWARE
+# ==========================================================
+class QueryMetricsMiddleware:
+    """
+    Catat jumlah query, total waktu DB, query terlambat dan query duplikat
+    per URL name, tulis ke logger 'apps.core.query_metrics' (JSON) dan
+    opsional ke header Server-Timing.
+
+    Settings:
+    - QUERY_METRICS_ENABLED       → aktifkan middleware (default False)
+    - QUERY_METRICS_SERVER_TIMING → tambah header Server-Timing (default False)
+    - QUERY_METRICS_BUDGETS       → {'default' | url name | nama view: {'queries': n, 'db_ms': ms}},
+                                    lewat batas → log warning
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'QUERY_METRICS_SERVER_TIMING', False)
+        self.budgets = getattr(settings, 'QUERY_METRICS_BUDGETS', {})
+
+    def __call__(self, request):
+        metrics = QueryMetrics()
+        started = time.perf_counter()
+
+        with connection.execute_wrapper(metrics):
+            response = self.get_response(request)
+
+        if self.server_timing:
+            # untuk streaming hanya mencakup query sebelum body dikirim
+            response['Server-Timing'] = (
+                f'db;dur={metrics.total * 1000:.1f};desc="{metrics.count} queries", '
+                f'app;dur={(time.perf_counter() - started) * 1000:.1f}'
+            )
+
+        if response.streaming:
+            response.streaming_content = self.stream(request, response, response.streaming_content, metrics, started)
+        else:
+            self.report(request, response, metrics, started)
+
+        return response
+
+    def stream(self, request, response, content, metrics, started):
+        """Query selama body streaming dikirim ikut dihitung, log ditulis di akhir."""
+        try:
+            with connection.execute_wrapper(metrics):
+                yield from content
+        finally:
+            self.report(request, response, metrics, started)
+
+    # ------------------------------------------------------
+    # LOG & BUDGET
+    # ------------------------------------------------------
+    def view_names(self, request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return []
+        return [match.view_name, match.url_name, getattr(match.func, '__name__', None)]
+
+    def budget_for(self, names):
+        for name in names:
+            if name and name in self.budgets:
+                return self.budgets[name]
+        return self.budgets.get('default')
+
+    def report(self, request, response, metrics, started):
+        names = self.view_names(request)
+        record = {
+            'view': names[0] if names else None,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round((time.perf_counter() - started) * 1000, 2),
+            **metrics.as_dict(),
+        }
+        logger.info(json.dumps(record, default=str))
+
+        budget = self.budget_for(names)
+        if not budget:
+            return
+
+        exceeded = []
+        if 'queries' in budget and metrics.count > budget['queries']:
+            exceeded.append(f"{metrics.count} query (batas {budget['queries']})")
+        if 'db_ms' in budget and metrics.total * 1000 > budget['db_ms']:
+            exceeded.append(f"{metrics.total * 1000:.1f} ms DB (batas {budget['db_ms']} ms)")
+
+        if exceeded:
+            logger.warning(
+                "Budget query terlampaui di %s: %s",
+                record['view'] or request.path,
+                ', '.join(exceeded),
+                extra={'query_metrics': record},
+            )
+
+
+# ==========================================================
+# 👥 SNAPSHOT ROLE DI SESSION
+# ==========================================================
+class UserRolesMiddleware:
+    """
+    Sediakan session request ke resolver role (services.user_roles), supaya
+    nama grup user dibaca dari snapshot session alih-alih query ke database.
+
+    Settings:
+    - USER_ROLES_SESSION_SNAPSHOT → simpan snapshot role di session (default True)
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'USER_ROLES_SESSION_SNAPSHOT', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        bind_session(getattr(request, 'session', None))
+        try:
+            return self.get_response(request)
+        finally:
+            release_session()
@@ -0,0 +1,93 @@
+import logging
+import time
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.core.models import Company
+
+logger = logging.getLogger(__name__)
+
+COMPANY_PROFILE_PREFIX = 'core:company-profile'
+COMPANY_VERSION_KEY = 'core:company-profile:version'
+COMPANY_PROFILE_TIMEOUT = 60 * 60 * 24
+
+# Data perusahaan yang dipakai template (header, menu, paket)
+CompanyProfile = namedtuple('CompanyProfile', ['id', 'name', 'logo_url', 'plan', 'ir_menu_visible'])
+
+# Penanda "belum ada Company" di cache (None berarti cache kosong)
+NO_COMPANY = 'none'
+
+
+# ==============================
+# VERSI PROFIL
+# ==============================
+# Profil disimpan dengan key yang memuat nomor versi. Simpan / hapus
+# Company cukup menaikkan versi; isi cache lama (termasuk yang ditulis
+# request lain dengan data lama) otomatis tidak terpakai.
+
+def _version():
+    version = cache.get(COMPANY_VERSION_KEY)
+    if version is None:
+        cache.add(COMPANY_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(COMPANY_VERSION_KEY)
+    return version
+
+
+def bump_company_version():
+    try:
+        try:
+            cache.incr(COMPANY_VERSION_KEY)
+        except ValueError:
+            cache.set(COMPANY_VERSION_KEY, time.time_ns(), None)
+    except Exception:
+        logger.exception("Gagal invalidasi cache profil perusahaan")
+
+
+def invalidate_company_profile():
+    """Naikkan versi sekarang dan sekali lagi setelah commit."""
+    bump_company_version()
+    transaction.on_commit(bump_company_version)
+
+
+# ==============================
+# BACA PROFIL
+# ==============================
+def build_company_profile():
+    """CompanyProfile dari Company pertama (satu query), atau None."""
+    company = Company.objects.order_by('pk').first()
+    if company is None:
+        return None
+    return CompanyProfile(
+        id=company.pk,
+        name=company.name,
+        logo_url=company.logo.url if company.logo else '',
+        plan=company.plan,
+        ir_menu_visible=company.ir_menu_visible,
+    )
+
+
+def company_profile():
+    """
+    Profil perusahaan dari cache; jika cache kosong / versi berubah,
+    satu query lalu disimpan ke cache dengan versi saat ini.
+    """
+    try:
+        key = f'{COMPANY_PROFILE_PREFIX}:{_version()}'
+        cached = cache.get(key)
+    except Exception:
+        logger.exception("Cache profil perusahaan tidak tersedia, baca langsung")
+        return build_company_profile()
+
+    if cached is not None:
+        return None if cached == NO_COMPANY else CompanyProfile(*cached)
+
+    profile = build_company_profile()
+    # di dalam transaksi data bisa belum di-commit (atau di-rollback): jangan di-cache
+    if not transaction.get_connection().in_atomic_block:
+        try:
+            cache.set(key, tuple(profile) if profile else NO_COMPANY, COMPANY_PROFILE_TIMEOUT)
+        except Exception:
+            logger.exception("Gagal menyimpan profil perusahaan ke cache")
+    return profile
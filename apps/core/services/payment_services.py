@@ -2,6 +2,7 @@ from django.conf import settings
 from django.core.mail import send_mail
 
 from apps.core.models.order import Order, PaymentReceipt
+from .user_roles import is_owner
 
 def get_pro_modules():
     """Return the list of available professional modules with their prices."""
@@ -64,7 +65,7 @@ def calculate_order_details(request_data, base_price=50000):
 def create_order_in_database(order_data, user=None):
     """Create an order record in the database if possible."""
     try:
-        if user and hasattr(user, 'is_owner') and user.is_owner():
+        if user and is_owner(user):
             Order.objects.create(
                 user=user,
                 company=user.company,
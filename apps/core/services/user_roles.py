@@ -0,0 +1,117 @@
+import logging
+import time
+
+from asgiref.local import Local
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+OWNER = 'Owner'
+EMPLOYEE = 'Employee'
+
+ROLE_SESSION_KEY = '_user_roles'
+ROLE_VERSION_PREFIX = 'core:roles'
+ROLE_GLOBAL_SCOPE = 'all'
+
+# Session request saat ini (diisi UserRolesMiddleware) untuk snapshot role
+_request = Local()
+
+
+# ==============================
+# VERSI ROLE
+# ==============================
+# Snapshot role di session menyimpan versi role user (per user + global).
+# Perubahan keanggotaan grup menaikkan versi, snapshot lama langsung basi
+# tanpa perlu mencari session milik user tersebut.
+
+def _version_key(scope):
+    return f'{ROLE_VERSION_PREFIX}:{scope}'
+
+
+def bump_role_versions(*scopes):
+    for scope in set(scopes):
+        key = _version_key(scope)
+        try:
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, time.time_ns(), None)
+        except Exception:
+            logger.exception("Gagal invalidasi snapshot role untuk %s", scope)
+
+
+def role_version(user_id):
+    keys = [_version_key(ROLE_GLOBAL_SCOPE), _version_key(user_id)]
+    values = cache.get_many(keys)
+
+    for key in keys:
+        if key not in values:
+            cache.add(key, time.time_ns(), None)
+            values[key] = cache.get(key)
+
+    return '.'.join(str(values[key]) for key in keys)
+
+
+# ==============================
+# SESSION SNAPSHOT
+# ==============================
+def bind_session(session):
+    _request.session = session
+
+
+def release_session():
+    _request.session = None
+
+
+def _snapshot_roles(user, load):
+    """Role dari snapshot session jika versinya masih sama, selain itu load() lalu simpan."""
+    session = getattr(_request, 'session', None)
+    if session is None:
+        return load()
+
+    try:
+        version = role_version(user.pk)
+    except Exception:
+        logger.exception("Versi role tidak tersedia, baca grup langsung")
+        return load()
+
+    snapshot = session.get(ROLE_SESSION_KEY)
+    if snapshot and snapshot.get('user') == user.pk and snapshot.get('version') == version:
+        return frozenset(snapshot['roles'])
+
+    roles = load()
+    session[ROLE_SESSION_KEY] = {'user': user.pk, 'version': version, 'roles': sorted(roles)}
+    return roles
+
+
+# ==============================
+# RESOLVER
+# ==============================
+def user_roles(user):
+    """
+    Nama grup user sebagai frozenset, dimuat sekali per request
+    (disimpan di objek user) dan, jika UserRolesMiddleware aktif,
+    dari snapshot di session.
+    """
+    if user is None or not user.is_authenticated:
+        return frozenset()
+
+    roles = getattr(user, '_role_names', None)
+    if roles is None:
+        roles = _snapshot_roles(
+            user, lambda: frozenset(user.groups.values_list('name', flat=True))
+        )
+        user._role_names = roles
+    return roles
+
+
+def has_role(user, *names):
+    return not user_roles(user).isdisjoint(names)
+
+
+def is_owner(user):
+    return has_role(user, OWNER)
+
+
+def is_employee(user):
+    return has_role(user, EMPLOYEE)
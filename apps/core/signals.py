@@ -0,0 +1,39 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core.models import Company
+from apps.core.services.company_profile import invalidate_company_profile
+from apps.core.services.user_roles import ROLE_GLOBAL_SCOPE, bump_role_versions
+
+
+# ==========================================================
+# 🏢 COMPANY → profil perusahaan di cache jadi basi
+# ==========================================================
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def invalidate_company(sender, instance, **kwargs):
+    invalidate_company_profile()
+
+
+# ==========================================================
+# 👥 KEANGGOTAAN GRUP → snapshot role di session jadi basi
+# ==========================================================
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+def invalidate_user_roles(sender, instance, action, reverse, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # group.user_set.add(...) / clear(): bisa banyak user sekaligus
+        bump_role_versions(ROLE_GLOBAL_SCOPE)
+        return
+    instance.__dict__.pop('_role_names', None)
+    bump_role_versions(instance.pk)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group(sender, instance, **kwargs):
+    # ganti nama / hapus grup mengubah role semua anggotanya
+    bump_role_versions(ROLE_GLOBAL_SCOPE)
@@ -1,5 +1,7 @@
 from django import template
 
+from apps.core.services import user_roles
+
 register = template.Library()
 
 @register.simple_tag
@@ -15,12 +17,12 @@ def create_menu(user):
 
 @register.filter
 def is_owner(user):
-    return user.groups.filter(name='Owner').exists()
+    return user_roles.is_owner(user)
 
 
 @register.filter
 def is_employee(user):
-    return hasattr(user, 'is_employee') and user.is_employee()
+    return user_roles.is_employee(user)
 
 
 @register.filter
@@ -4,6 +4,7 @@ from django.http import Http404, HttpResponseRedirect
 from django.urls import reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 from ..models import Company, Department, Position
+from ..services.user_roles import is_owner
 
 
 class UpdateCompanyView(LoginRequiredMixin, UpdateView):
@@ -14,7 +15,7 @@ class UpdateCompanyView(LoginRequiredMixin, UpdateView):
 
     def get_object(self):
         user = self.request.user
-        if user.is_owner():
+        if is_owner(user):
             return user.company
         raise Http404()
 
@@ -30,7 +31,7 @@ class DepartmentListView(LoginRequiredMixin, ListView):
     context_object_name = 'departments'
 
     def get_queryset(self):
-        if self.request.user.is_owner():
+        if is_owner(self.request.user):
             return Department.objects.filter(company=self.request.user.company)
         raise Http404()
 
@@ -41,7 +42,7 @@ class DepartmentCreateView(LoginRequiredMixin, CreateView):
     template_name = 'company/department_form.html'
 
     def form_valid(self, form):
-        if not self.request.user.is_owner():
+        if not is_owner(self.request.user):
             raise Http404()
         form.instance.company = self.request.user.company
         messages.success(self.request, 'Department created successfully.')
@@ -58,7 +59,7 @@ class DepartmentUpdateView(LoginRequiredMixin, UpdateView):
     context_object_name = 'department'
 
     def get_queryset(self):
-        if self.request.user.is_owner():
+        if is_owner(self.request.user):
             return Department.objects.filter(company=self.request.user.company)
         raise Http404()
 
@@ -76,7 +77,7 @@ class DepartmentDeleteView(LoginRequiredMixin, DeleteView):
     context_object_name = 'department'
 
     def get_queryset(self):
-        if self.request.user.is_owner():
+        if is_owner(self.request.user):
             return Department.objects.filter(company=self.request.user.company)
         raise Http404()
 
@@ -94,7 +95,7 @@ class PositionListView(LoginRequiredMixin, ListView):
     context_object_name = 'positions'
 
     def get_queryset(self):
-        if self.request.user.is_owner():
+        if is_owner(self.request.user):
             return Position.objects.filter(department__company=self.request.user.company)
         raise Http404()
 
@@ -105,7 +106,7 @@ class PositionCreateView(LoginRequiredMixin, CreateView):
     template_name = 'company/position_form.html'
 
     def form_valid(self, form):
-        if not self.request.user.is_owner():
+        if not is_owner(self.request.user):
             raise Http404()
         form.instance.company = self.request.user.company
         messages.success(self.request, 'Position created successfully.')
@@ -122,7 +123,7 @@ class PositionUpdateView(LoginRequiredMixin, UpdateView):
     context_object_name = 'position'
 
     def get_queryset(self):
-        if self.request.user.is_owner():
+        if is_owner(self.request.user):
             return Position.objects.filter(department__company=self.request.user.company)
         raise Http404()
 
@@ -140,7 +141,7 @@ class PositionDeleteView(LoginRequiredMixin, DeleteView):
     context_object_name = 'position'
 
     def get_queryset(self):
-        if self.request.user.is_owner():
+        if is_owner(self.request.user):
             return Position.objects.filter(department__company=self.request.user.company)
         raise Http404()
 
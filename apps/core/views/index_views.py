@@ -4,6 +4,7 @@ from django.urls import reverse
 from django.contrib import messages
 
 from apps.extras.job.models import Jobs, Application
+from ..services.user_roles import is_employee, is_owner
 from ..services.payment_services import (
     get_pro_modules,
     calculate_order_details,
@@ -17,10 +18,10 @@ def index(request):
 
     if request.user.is_authenticated:
         current_user = request.user
-        if current_user.is_superuser or current_user.groups.filter(name='Owner').exists():
+        if current_user.is_superuser or is_owner(current_user):
             return render(request, 'dashboard/dashboard.html')
 
-        elif current_user.groups.filter(name='Employee').exists():
+        elif is_employee(current_user):
             jobs = Jobs.objects.filter(team_lead=request.user)
             applications = Application.objects.filter(job_id__in=jobs)
             return render(request, 'dashboard/dashboard.html',
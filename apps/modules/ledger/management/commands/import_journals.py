@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.modules.ledger.services import IMPORT_BATCH_SIZE, JournalImportError, import_journals
+
+
+class Command(BaseCommand):
+    help = (
+        "Impor jurnal historis dari CSV (header sama dengan ekspor 'journals': "
+        "No Jurnal, Tanggal, Periode, Deskripsi, Posted, COA, Debit, Kredit, Keterangan). "
+        "Periode harus setelah periode closed terakhir. Jurnal periode lampau disimpan posted "
+        "dan periodenya ditutup berurutan; jurnal periode open saat ini disimpan sebagai draft. "
+        "Satu kesalahan saja → tidak ada yang disimpan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File CSV (UTF-8).")
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help="Jurnal per bulk_create.")
+        parser.add_argument('--dry-run', action='store_true', help="Validasi saja, tanpa menyimpan.")
+        parser.add_argument('--max-errors', type=int, default=50, help="Jumlah kesalahan yang ditampilkan.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as stream:
+                result = import_journals(
+                    stream,
+                    batch_size=options['batch_size'],
+                    dry_run=options['dry_run'],
+                )
+        except OSError as e:
+            raise CommandError(f"File tidak bisa dibaca: {e}")
+        except UnicodeDecodeError:
+            raise CommandError("File harus berformat UTF-8.")
+        except JournalImportError as e:
+            for line_no, message in e.errors[:options['max_errors']]:
+                self.stderr.write(f"  baris {line_no}: {message}")
+            if len(e.errors) > options['max_errors']:
+                self.stderr.write(f"  ... dan {len(e.errors) - options['max_errors']} kesalahan lain")
+            raise CommandError(str(e))
+
+        elapsed = time.perf_counter() - started
+        action = "valid (dry run)" if options['dry_run'] else f"diimpor (batch {result['batch']})"
+        periods = f"{result['periods'][0]} s/d {result['periods'][-1]}" if result['periods'] else "-"
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {result['journals']} jurnal / {result['lines']} baris {action}, "
+            f"periode {periods}, {elapsed:.1f} detik."
+        ))
+        if result['closed']:
+            verb = "akan ditutup" if options['dry_run'] else "ditutup"
+            self.stdout.write(f"🔒 Periode {verb}: {result['closed'][0]} s/d {result['closed'][-1]}")
@@ -0,0 +1,185 @@
+import json
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.modules.ledger.models import ClosingPeriod, JournalItem
+from apps.modules.ledger.services.report_cache import bump_generations
+
+
+def benchmark_views(period, year, open_period, include_close=False):
+    """
+    (nama, url, ubah_data) untuk setiap halaman ledger yang diukur.
+    close_period benar-benar menutup periode open, jadi hanya ikut jika diminta.
+    """
+    views = [
+        ('ledger_report', reverse('ledger:ledger_report') + f'?period={period}', False),
+        ('ledger_report_full', reverse('ledger:ledger_report') + f'?period={period}&view=full', False),
+        ('ledger_report_year', reverse('ledger:ledger_report') + f'?mode=year&year={year}&view=full', False),
+        ('balance_sheet', reverse('ledger:balance_sheet') + f'?period={period}', False),
+        ('profit_loss', reverse('ledger:profit_loss_report') + f'?period={period}', False),
+        ('profitabilitas', reverse('ledger:profitabilitas') + f'?period={period}', False),
+        ('solvabilitas', reverse('ledger:solvabilitas') + f'?period={period}', False),
+        ('journal_list', reverse('ledger:journal_list'), False),
+    ]
+    if include_close:
+        views.append(('close_period', reverse('ledger:close_period', args=[open_period]), True))
+    return views
+
+
+def run_view(client, url, measure_memory=False):
+    """
+    Jalankan satu request dan kembalikan (status, waktu ms, jumlah query, peak KB).
+    Request berjalan seperti di produksi (autocommit, tanpa transaksi pembungkus)
+    agar cache dan callback on_commit ikut terukur.
+    Cache laporan dibuat basi dulu agar yang terukur selalu hitungan penuh.
+    """
+    bump_generations('accounts', 'posting')
+
+    if measure_memory:
+        tracemalloc.start()
+
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = client.get(url)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        elapsed = time.perf_counter() - started
+
+    peak = None
+    if measure_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'status': response.status_code,
+        'wall_ms': round(elapsed * 1000, 1),
+        'queries': len(queries),
+        'peak_kb': round(peak / 1024, 1) if peak is not None else None,
+    }
+
+
+def compare(baseline, runs, tolerance):
+    """Bandingkan hasil dengan baseline, return daftar (ukuran, view, pesan) yang memburuk."""
+    previous = {str(run['size']): run['views'] for run in baseline.get('runs', [])}
+    regressions = []
+
+    for run in runs:
+        old_views = previous.get(str(run['size']))
+        if not old_views:
+            continue
+        for name, result in run['views'].items():
+            old = old_views.get(name)
+            if not old:
+                continue
+            if result['queries'] > old['queries']:
+                regressions.append((run['size'], name, f"query {old['queries']} → {result['queries']}"))
+            if old['wall_ms'] and result['wall_ms'] > old['wall_ms'] * (1 + tolerance / 100):
+                regressions.append((run['size'], name, f"waktu {old['wall_ms']} → {result['wall_ms']} ms"))
+
+    return regressions
+
+
+class Command(BaseCommand):
+    help = (
+        "Ukur waktu, jumlah query dan peak memory setiap halaman ledger, "
+        "simpan hasilnya sebagai baseline JSON dan bandingkan dengan run sebelumnya."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            help="Daftar jumlah item dipisah koma (mis. 10000,100000,1000000). "
+                 "Setiap ukuran di-seed ulang dengan ledger_seed --flush. Default: data yang ada.",
+        )
+        parser.add_argument('--months', type=int, default=12, help="Jumlah periode saat seed (default 12).")
+        parser.add_argument('--period', help="Periode yang diukur (YYYY-MM). Default: periode closed terakhir.")
+        parser.add_argument('--output', help="Tulis hasil ke file JSON ini.")
+        parser.add_argument('--baseline', help="File JSON hasil run sebelumnya untuk dibandingkan.")
+        parser.add_argument(
+            '--tolerance', type=float, default=20,
+            help="Batas kenaikan waktu (persen) sebelum dianggap regresi (default 20).",
+        )
+        parser.add_argument('--no-memory', action='store_true', help="Lewati pengukuran peak memory (tracemalloc).")
+        parser.add_argument(
+            '--include-close', action='store_true',
+            help="Ukur juga close_period. Periode open BENAR-BENAR ditutup, jalankan hanya di database benchmark.",
+        )
+
+    def handle(self, *args, **options):
+        sizes = [None]
+        if options.get('sizes'):
+            try:
+                sizes = [int(size) for size in options['sizes'].split(',')]
+            except ValueError:
+                raise CommandError("--sizes harus berupa angka dipisah koma.")
+
+        baseline = None
+        if options.get('baseline'):
+            with open(options['baseline']) as fh:
+                baseline = json.load(fh)
+
+        # Host yang diizinkan (Client default memakai 'testserver')
+        host = next((h for h in settings.ALLOWED_HOSTS if h not in ('*', '') and not h.startswith('.')), 'localhost')
+        client = Client(HTTP_HOST=host, raise_request_exception=False)
+
+        runs = []
+        for size in sizes:
+            if size is not None:
+                self.stdout.write(self.style.MIGRATE_HEADING(f"Seed {size} item..."))
+                call_command('ledger_seed', items=size, months=options['months'], flush=True, stdout=self.stdout)
+            runs.append(self.run_size(client, options, size))
+
+        result = {
+            'generated_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'runs': runs,
+        }
+
+        if options.get('output'):
+            with open(options['output'], 'w') as fh:
+                json.dump(result, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"📄 Hasil disimpan ke {options['output']}"))
+
+        if baseline is not None:
+            regressions = compare(baseline, runs, options['tolerance'])
+            for size, name, message in regressions:
+                self.stdout.write(self.style.ERROR(f"✗ [{size}] {name}: {message}"))
+            if regressions:
+                raise CommandError(f"{len(regressions)} regresi dibanding baseline.")
+            self.stdout.write(self.style.SUCCESS("✅ Tidak ada regresi dibanding baseline."))
+
+    def run_size(self, client, options, size=None):
+        closed = ClosingPeriod.objects.filter(is_closed=True).order_by('-period').first()
+        period = options.get('period') or (closed.period if closed else ClosingPeriod.get_open_period().period)
+        open_period = ClosingPeriod.get_open_period().period
+        items = JournalItem.objects.count()
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Benchmark {items} item, periode {period}"))
+
+        views = {}
+        for name, url, mutates in benchmark_views(period, period[:4], open_period, options['include_close']):
+            result = run_view(client, url)
+            if not options['no_memory'] and not mutates:
+                # pass terpisah: tracemalloc memperlambat, jangan campur dengan waktu
+                # (view yang mengubah data hanya dijalankan sekali)
+                result['peak_kb'] = run_view(client, url, measure_memory=True)['peak_kb']
+            views[name] = result
+
+            style = self.style.SUCCESS if result['status'] < 400 else self.style.ERROR
+            self.stdout.write(style(
+                f"  {name:<20} {result['status']}  {result['wall_ms']:>9} ms  "
+                f"{result['queries']:>5} query  {result['peak_kb'] or '-':>10} KB"
+            ))
+
+        # size: ukuran seed yang diminta (kunci pembanding baseline), items: jumlah aktual
+        return {'size': size or items, 'items': items, 'period': period, 'views': views}
@@ -0,0 +1,112 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Sum
+from django.utils import timezone
+
+from apps.modules.ledger.models import AccountPeriodBalance, ClosingPeriod, JournalItem
+from apps.modules.ledger.services import period_registry, running_balance_lines
+
+# Tabel besar yang tidak boleh di-scan penuh oleh query laporan
+WATCHED_TABLES = ('ledger_journalentry', 'ledger_journalitem', 'ledger_accountperiodbalance')
+
+# MySQL EXPLAIN.type yang berarti semua baris dibaca: 'ALL' (tabel) dan 'index' (seluruh index)
+MYSQL_FULL_SCAN_TYPES = ('ALL', 'index')
+
+
+def report_queries(period, year):
+    """(nama, queryset) untuk query utama tiap laporan ledger."""
+    posted = JournalItem.objects.filter(journal_entry__is_posted=True)
+    period_items = posted.filter(journal_entry__period=period)
+    year_items = posted.filter(journal_entry__date__year=year)
+
+    # bentuk query sama dengan account_totals() (yang langsung dievaluasi)
+    def grouped(items):
+        return items.order_by().values('account_id').annotate(debit_total=Sum('debit'), credit_total=Sum('credit'))
+
+    return [
+        ('balance_sheet / trial balance (period)', grouped(period_items)),
+        ('balance_sheet / trial balance (year)', grouped(year_items)),
+        ('ledger_report opening (year)', grouped(posted.filter(journal_entry__date__year__lt=year))),
+        ('ledger_report opening (snapshot)', AccountPeriodBalance.objects.filter(period=period)),
+        ('ledger_report lines (period)', running_balance_lines(period_items).order_by('account_id', 'journal_entry__date', 'id')),
+        ('ledger_report lines (year)', running_balance_lines(year_items).order_by('account_id', 'journal_entry__date', 'id')),
+        ('ledger drill-down (account)', period_items.filter(account_id=1).order_by('journal_entry__date', 'id')),
+    ]
+
+
+def full_scans(sql, params):
+    """
+    Daftar tabel (dari WATCHED_TABLES) yang di-scan penuh menurut EXPLAIN,
+    termasuk full index scan (seluruh index dibaca, walau covering).
+    """
+    vendor = connection.vendor
+    scanned = []
+
+    with connection.cursor() as cursor:
+        if vendor == 'mysql':
+            cursor.execute('EXPLAIN ' + sql, params)
+            columns = [col[0] for col in cursor.description]
+            plan = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            for row in plan:
+                if row.get('type') in MYSQL_FULL_SCAN_TYPES and row.get('table') in WATCHED_TABLES:
+                    scanned.append(row['table'])
+        elif vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            plan = cursor.fetchall()
+            for row in plan:
+                detail = row[-1]
+                words = detail.split()
+                # SCAN <tabel> [USING [COVERING] INDEX ...] = semua baris dibaca; SEARCH = lookup index
+                if words[:1] == ['SCAN']:
+                    table = words[1] if len(words) > 1 else ''
+                    if table in WATCHED_TABLES:
+                        scanned.append(table)
+        elif vendor == 'postgresql':
+            cursor.execute('EXPLAIN ' + sql, params)
+            plan = cursor.fetchall()
+            for (line,) in plan:
+                if 'Seq Scan on' in line:
+                    table = line.split('Seq Scan on', 1)[1].split()[0]
+                    if table in WATCHED_TABLES:
+                        scanned.append(table)
+        else:
+            raise CommandError(f"Database '{vendor}' belum didukung oleh ledger_explain.")
+
+    return plan, scanned
+
+
+class Command(BaseCommand):
+    help = (
+        "Jalankan EXPLAIN pada query laporan ledger dan gagal jika ada yang "
+        "melakukan full table scan pada tabel jurnal."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--period', help="Periode contoh (YYYY-MM). Default: periode open terbaru / bulan ini.")
+        parser.add_argument('--year', type=int, help="Tahun contoh. Default: tahun berjalan.")
+        parser.add_argument('--verbose-plan', action='store_true', help="Tampilkan hasil EXPLAIN lengkap.")
+
+    def handle(self, *args, **options):
+        # hanya baca: get_open_period() bisa membuat baris ClosingPeriod
+        period = options.get('period') or period_registry().latest_open() or ClosingPeriod.get_current_period()
+        year = options.get('year') or timezone.now().year
+
+        failures = []
+        for name, queryset in report_queries(period, year):
+            sql, params = queryset.query.sql_with_params()
+            plan, scanned = full_scans(sql, params)
+
+            if scanned:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f"✗ {name}: full scan pada {', '.join(sorted(set(scanned)))}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"✓ {name}"))
+
+            if options.get('verbose_plan'):
+                for row in plan:
+                    self.stdout.write(f"    {row}")
+
+        if failures:
+            raise CommandError(f"{len(failures)} query laporan melakukan full table scan.")
+
+        self.stdout.write(self.style.SUCCESS("✅ Semua query laporan memakai index."))
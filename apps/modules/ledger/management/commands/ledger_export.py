@@ -0,0 +1,42 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.modules.ledger.services import LEDGER_EXPORTS, ExportError, check_format, write_export
+from apps.modules.ledger.services.export import EXPORT_FORMATS
+
+
+class Command(BaseCommand):
+    help = "Ekspor buku besar / jurnal / neraca saldo ke CSV atau XLSX (streaming, memori tetap)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(LEDGER_EXPORTS), help="Data yang diekspor.")
+        parser.add_argument('--period', help="Periode akuntansi (YYYY-MM).")
+        parser.add_argument('--year', help="Tahun (YYYY), diutamakan jika diisi bersama --period.")
+        parser.add_argument('--format', dest='fmt', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument(
+            '--output',
+            help="File tujuan. Default: <nama dataset>.<format> di direktori kerja, '-' untuk stdout.",
+        )
+
+    def handle(self, *args, **options):
+        export = LEDGER_EXPORTS[options['dataset']](
+            mode='year' if options['year'] else 'period',
+            period=options['period'],
+            year=options['year'],
+        )
+        fmt = options['fmt']
+        output = options['output'] or f"{export['filename']}.{fmt}"
+
+        try:
+            check_format(fmt)
+        except ExportError as e:
+            raise CommandError(str(e))
+
+        if output == '-':
+            write_export(export, fmt, sys.stdout.buffer)
+            return
+        with open(output, 'wb') as stream:
+            write_export(export, fmt, stream)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {export['title']} diekspor ke {output}"))
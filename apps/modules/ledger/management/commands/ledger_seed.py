@@ -0,0 +1,218 @@
+import random
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.modules.ledger.models import Account, ClosingPeriod, JournalEntry, JournalItem
+from apps.modules.ledger.services import rebuild_period_snapshots
+from apps.modules.ledger.services.report_cache import bump_generations, journal_scopes
+
+# Penanda deskripsi jurnal hasil seed (dipakai --flush)
+SEED_TAG = '[seed]'
+
+# Bagan akun contoh BUMDes: (coa, nama, tipe, saldo normal, role default)
+CHART_OF_ACCOUNTS = [
+    ('1101', 'Kas', 'ASSET', 'Debit', 'cash'),
+    ('1102', 'Bank', 'ASSET', 'Debit', None),
+    ('1103', 'Piutang Usaha', 'ASSET', 'Debit', None),
+    ('1200', 'Persediaan Barang Dagang', 'ASSET', 'Debit', None),
+    ('1301', 'Peralatan', 'ASSET', 'Debit', None),
+    ('2101', 'Utang Usaha', 'LIABILITY', 'Credit', None),
+    ('2102', 'Utang Gaji', 'LIABILITY', 'Credit', None),
+    ('2201', 'Utang Bank', 'LIABILITY', 'Credit', None),
+    ('3101', 'Modal Penyertaan Desa', 'CAPITAL', 'Credit', None),
+    ('3999', 'Retained Earnings', 'CAPITAL', 'Credit', None),
+    ('4101', 'Pendapatan Parkir', 'INCOME', 'Credit', None),
+    ('4102', 'Pendapatan Sewa', 'INCOME', 'Credit', None),
+    ('4103', 'Pendapatan Penjualan', 'INCOME', 'Credit', None),
+    ('5001', 'Harga Pokok Penjualan', 'COGS', 'Debit', None),
+    ('6101', 'Beban Gaji', 'EXPENSES', 'Debit', None),
+    ('6102', 'Beban Listrik & Air', 'EXPENSES', 'Debit', None),
+    ('6103', 'Beban Pemeliharaan', 'EXPENSES', 'Debit', None),
+    ('6104', 'Beban Operasional Parkir', 'EXPENSES', 'Debit', None),
+]
+
+# Pola transaksi: (deskripsi, akun debit, akun kredit) → coa
+TRANSACTION_TEMPLATES = [
+    ('Pendapatan parkir harian', ['1101'], ['4101']),
+    ('Pendapatan sewa', ['1101', '1102'], ['4102']),
+    ('Penjualan barang', ['1101', '1103'], ['4103']),
+    ('Pembelian persediaan', ['1200'], ['1101', '2101']),
+    ('Harga pokok penjualan', ['5001'], ['1200']),
+    ('Pembayaran beban', ['6101', '6102', '6103', '6104'], ['1101', '1102']),
+    ('Pelunasan utang', ['2101', '2102'], ['1101', '1102']),
+    ('Setoran ke bank', ['1102'], ['1101']),
+]
+
+
+def month_periods(start, months):
+    """Daftar periode YYYY-MM berurutan mulai dari `start`."""
+    first = date(int(start[:4]), int(start[5:7]), 1)
+    return [(first + relativedelta(months=i)).strftime('%Y-%m') for i in range(months)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Buat data ledger sintetis (bagan akun, periode, jurnal seimbang) untuk "
+        "benchmark. Jangan dijalankan di database produksi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=10000, help="Jumlah JournalItem yang dibuat (default 10000).")
+        parser.add_argument('--months', type=int, default=12, help="Jumlah periode (default 12, periode terakhir dibiarkan open).")
+        parser.add_argument('--start', help="Periode pertama (YYYY-MM). Default: --months bulan sebelum bulan ini.")
+        parser.add_argument('--seed', type=int, default=42, help="Seed random agar data bisa diulang.")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Ukuran batch bulk_create.")
+        parser.add_argument('--flush', action='store_true', help=f"Hapus dulu jurnal hasil seed sebelumnya ({SEED_TAG}).")
+
+    def handle(self, *args, **options):
+        items_target = options['items']
+        months = options['months']
+        batch_size = options['batch_size']
+        if items_target < 2 or months < 1:
+            raise CommandError("--items minimal 2 dan --months minimal 1.")
+
+        start = options.get('start') or (
+            timezone.now().date().replace(day=1) - relativedelta(months=months - 1)
+        ).strftime('%Y-%m')
+        try:
+            periods = month_periods(start, months)
+        except ValueError:
+            raise CommandError("Format --start tidak valid. Gunakan YYYY-MM.")
+
+        rng = random.Random(options['seed'])
+
+        if options['flush']:
+            deleted = self.flush()
+            self.stdout.write(f"🗑  {deleted} jurnal seed lama dihapus.")
+
+        accounts = self.seed_accounts()
+        closed = self.seed_periods(periods)
+
+        # ===============================
+        # JURNAL (bulk, id diberikan database)
+        # ===============================
+        created_items = 0
+        created_entries = 0
+        entries, items = [], []
+        scopes = set()
+
+        while created_items + len(items) < items_target:
+            period = rng.choice(periods)
+            entry_date = date(int(period[:4]), int(period[5:7]), rng.randint(1, 28))
+            description, debit_coas, credit_coas = rng.choice(TRANSACTION_TEMPLATES)
+
+            entry = JournalEntry(
+                date=entry_date,
+                description=f"{SEED_TAG} {description}",
+                period=period,
+                is_posted=period in closed,
+            )
+            entries.append(entry)
+            scopes.update(journal_scopes(period, entry_date))
+
+            # 2–4 baris: satu sisi satu akun, sisi lain dipecah (tetap seimbang)
+            remaining = items_target - created_items - len(items)
+            lines = max(2, min(rng.randint(2, 4), remaining))
+            amount = rng.randint(10, 5000) * 1000
+            splits = [amount // (lines - 1)] * (lines - 1)
+            splits[-1] += amount - sum(splits)
+
+            if rng.random() < 0.5:
+                items.append(JournalItem(journal_entry=entry, account=accounts[rng.choice(debit_coas)], debit=amount))
+                items += [
+                    JournalItem(journal_entry=entry, account=accounts[rng.choice(credit_coas)], credit=part)
+                    for part in splits
+                ]
+            else:
+                items += [
+                    JournalItem(journal_entry=entry, account=accounts[rng.choice(debit_coas)], debit=part)
+                    for part in splits
+                ]
+                items.append(JournalItem(journal_entry=entry, account=accounts[rng.choice(credit_coas)], credit=amount))
+
+            if len(items) >= batch_size:
+                self.write_batch(entries, items, batch_size)
+                created_entries += len(entries)
+                created_items += len(items)
+                entries, items = [], []
+                self.stdout.write(f"  • {created_items}/{items_target} item")
+
+        if entries:
+            self.write_batch(entries, items, batch_size)
+            created_entries += len(entries)
+            created_items += len(items)
+
+        # ===============================
+        # SNAPSHOT & CACHE
+        # ===============================
+        rebuilt = rebuild_period_snapshots(since=periods[0])
+        bump_generations('accounts', 'posting', *scopes)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {created_entries} jurnal / {created_items} item dibuat untuk "
+            f"{periods[0]} s/d {periods[-1]} ({len(rebuilt)} snapshot periode)."
+        ))
+
+    # ==========================================================
+    # 🔧 HELPER
+    # ==========================================================
+    def seed_accounts(self):
+        """Buat akun contoh yang belum ada (akun yang sudah ada tidak diubah), return {coa: Account}."""
+        accounts = {}
+        for coa, name, account_type, balance_type, role in CHART_OF_ACCOUNTS:
+            account, _ = Account.objects.get_or_create(
+                coa=coa,
+                defaults={
+                    'account_name': name,
+                    'account_type': account_type,
+                    'balance_type': balance_type,
+                    'coa_role_default': role,
+                },
+            )
+            accounts[coa] = account
+        return accounts
+
+    def seed_periods(self, periods):
+        """
+        Periode baru dibuat closed kecuali yang terakhir; periode yang sudah
+        ada dibiarkan apa adanya. Return set periode yang closed.
+        """
+        closed = set()
+        for period in periods:
+            is_closed = period != periods[-1]
+            period_obj, _ = ClosingPeriod.objects.get_or_create(
+                period=period,
+                defaults={
+                    'is_closed': is_closed,
+                    'closed_at': timezone.now() if is_closed else None,
+                    'closed_by': 'ledger_seed' if is_closed else None,
+                },
+            )
+            if period_obj.is_closed:
+                closed.add(period)
+        return closed
+
+    def write_batch(self, entries, items, batch_size):
+        with transaction.atomic():
+            JournalEntry.objects.bulk_create(entries, batch_size=batch_size)
+            if entries[0].pk is None:
+                # backend tanpa RETURNING (MySQL): ambil id yang baru dibuat,
+                # urutan auto increment sama dengan urutan INSERT
+                new_ids = (
+                    JournalEntry.objects.filter(description__startswith=SEED_TAG)
+                    .order_by('-id')
+                    .values_list('id', flat=True)[:len(entries)]
+                )
+                for entry, pk in zip(entries, reversed(list(new_ids))):
+                    entry.pk = pk
+            JournalItem.objects.bulk_create(items, batch_size=batch_size)
+
+    def flush(self):
+        """Hapus jurnal seed sebelumnya (hanya yang deskripsinya ber-tag SEED_TAG) beserta itemnya."""
+        with transaction.atomic():
+            _, deleted = JournalEntry.objects.filter(description__startswith=SEED_TAG).delete()
+        return deleted.get(JournalEntry._meta.label, 0)
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.modules.ledger.services import rebuild_period_snapshots
+
+
+class Command(BaseCommand):
+    help = "Bangun ulang snapshot saldo akun (AccountPeriodBalance) untuk periode yang sudah closed."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help="Mulai dari periode ini (YYYY-MM). Default: semua periode closed.",
+        )
+
+    def handle(self, *args, **options):
+        periods = rebuild_period_snapshots(since=options.get('since'))
+
+        if not periods:
+            self.stdout.write(self.style.WARNING("Tidak ada periode closed untuk dibangun ulang."))
+            return
+
+        for period in periods:
+            self.stdout.write(f"  • {period}")
+        self.stdout.write(self.style.SUCCESS(f"✅ Snapshot {len(periods)} periode berhasil dibangun ulang."))
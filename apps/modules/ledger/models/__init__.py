@@ -3,3 +3,4 @@ from apps.modules.ledger.models import *
 from .account import Account
 from .journal_entry import JournalEntry, JournalItem
 from .closing_period import ClosingPeriod  # ✅ Tambahkan baris ini
+from .account_period_balance import AccountPeriodBalance
@@ -0,0 +1,26 @@
+from django.db import models
+from apps.modules.ledger.models.account import Account
+
+
+class AccountPeriodBalance(models.Model):
+    """
+    Snapshot saldo akun per periode, ditulis saat periode ditutup.
+
+    - debit / credit   → mutasi (posted) pada periode tersebut
+    - closing_balance  → saldo kumulatif (debit - kredit) s/d akhir periode
+    """
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='period_balances')
+    period = models.CharField(max_length=7)  # format YYYY-MM
+    debit = models.BigIntegerField(default=0)
+    credit = models.BigIntegerField(default=0)
+    closing_balance = models.BigIntegerField(default=0)
+
+    class Meta:
+        app_label = 'ledger'
+        ordering = ['period', 'account_id']
+        constraints = [
+            models.UniqueConstraint(fields=['period', 'account'], name='uniq_account_period_balance'),
+        ]
+
+    def __str__(self):
+        return f"{self.period} - {self.account.account_name}: {self.closing_balance}"
@@ -45,27 +45,20 @@ class ClosingPeriod(models.Model):
     # ==========================================================
     def close_period(self, user=None):
         """
-        Tutup periode ini, dan masukkan semua jurnal yang belum di-close
-        (is_posted=False) ke periode ini, berapapun tanggalnya.
+        Tutup periode ini lewat services.closing.close_period: jurnal draft
+        (is_posted=False) periode ini, periode sebelumnya atau tanpa periode
+        masuk ke periode ini, lalu retained earnings dan snapshot saldo, semuanya
+        dalam satu transaksi. Periode berikutnya tidak dibuka otomatis
+        (aksi admin bisa menutup beberapa periode sekaligus).
         """
-        if self.is_closed:
-            print(f"⚠️ Periode {self.period} sudah ditutup.")
-            return self
-
-        from apps.modules.ledger.models.journal_entry import JournalEntry  # hindari circular import
-
-        # Ambil semua jurnal yang belum pernah di-close
-        unposted_entries = JournalEntry.objects.filter(is_posted=False)
+        from apps.modules.ledger.services.closing import PeriodClosingError, close_period  # hindari circular import
 
-        # Update semuanya ke periode ini
-        updated_count = unposted_entries.update(period=self.period, is_posted=True)
-
-        # Tutup periode
-        self.is_closed = True
-        self.closed_at = timezone.now()
-        if user:
-            self.closed_by = user
-        self.save()
+        try:
+            result = close_period(self.period, user=user, open_next=False)
+        except PeriodClosingError as e:
+            print(f"⚠️ {e}")
+            return self
 
-        print(f"✅ Closed {updated_count} jurnal → periode {self.period}")
+        self.refresh_from_db()
+        print(f"✅ Closed {result['posted_count']} jurnal → periode {self.period}")
         return self
@@ -7,14 +7,34 @@ class JournalEntry(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     period = models.CharField(max_length=7, blank=True, null=True)  # format YYYY-MM
     is_posted = models.BooleanField(default=False)
+    # '<batch>:<urutan>' untuk jurnal hasil impor CSV (services.journal_import)
+    import_ref = models.CharField(max_length=32, blank=True, null=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # filter laporan per periode: period=X AND is_posted=True
+            models.Index(fields=['period', 'is_posted'], name='ledger_je_period_posted_idx'),
+            # filter laporan tahunan / saldo awal: is_posted=True AND date BETWEEN ...
+            models.Index(fields=['is_posted', 'date'], name='ledger_je_posted_date_idx'),
+            # daftar jurnal: keyset per periode ORDER BY date DESC, id DESC
+            models.Index(fields=['period', 'date', 'id'], name='ledger_je_period_date_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # periode & tanggal saat dimuat (tanpa query untuk field yang di-defer),
+        # dipakai ledger.signals untuk meng-invalidasi cakupan lama saat jurnal dipindah
+        instance._ledger_origin = (instance.__dict__.get('period'), instance.__dict__.get('date'))
+        return instance
 
     def save(self, *args, **kwargs):
-        from apps.modules.ledger.models.closing_period import ClosingPeriod
+        from apps.modules.ledger.services.period_status import open_period  # hindari circular import
 
-        # 💡 Hanya isi period jika belum diset
+        # 💡 Hanya isi period jika belum diset (periode open dari cache, tanpa query;
+        #    untuk banyak jurnal sekaligus pakai services.period_status.assign_open_period)
         if not self.period:
-            open_period = ClosingPeriod.get_open_period()
-            self.period = open_period.period
+            self.period = open_period()
 
         super().save(*args, **kwargs)
 
@@ -27,5 +47,11 @@ class JournalItem(models.Model):
     credit = models.IntegerField(default=0)
     note = models.CharField(max_length=255, blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # GROUP BY account_id + join ke jurnal tanpa baca tabel
+            models.Index(fields=['account', 'journal_entry'], name='ledger_ji_account_entry_idx'),
+        ]
+
     def __str__(self):
         return f"{self.journal_entry.date} - {self.account.account_name}"
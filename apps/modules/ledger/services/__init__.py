@@ -0,0 +1,13 @@
+# Service layer ledger: perhitungan saldo & posting yang dipakai bersama oleh views
+from .balance import account_totals, balance_from_totals, period_account_totals
+from .period_balance import opening_balances, rebuild_period_snapshots, write_period_snapshot
+from .ledger_lines import LINE_FIELDS, ledger_opening_balances, running_balance_lines, scoped_items
+from .trial_balance import TrialBalance
+from .report_cache import cached_report, invalidate_journals
+from .journal_posting import JournalPostingError, post_journal, post_journals, update_journal
+from .closing import PeriodClosingError, close_period
+from .comparative import MAX_COMPARATIVE_PERIODS, ComparativeReport, period_range
+from .export import LEDGER_EXPORTS, ExportError, check_format, export_response, write_export
+from .journal_import import IMPORT_BATCH_SIZE, JournalImportError, import_journals
+from .chart_of_accounts import coa_json, coa_version
+from .period_status import PeriodStatus, assign_open_period, invalidate_period_status, open_period, period_registry
@@ -0,0 +1,88 @@
+from django.db.models import Sum
+
+from apps.modules.ledger.models import JournalItem
+
+
+# ==============================
+# TOTAL DEBIT / KREDIT PER AKUN
+# ==============================
+def account_totals(period=None, year=None, accounts=None, posted_only=True,
+                   date_from=None, date_to=None):
+    """
+    Hitung total debit & kredit semua akun dalam SATU query
+    (GROUP BY account_id), bukan satu aggregate per akun.
+
+    - period  → filter periode akuntansi (YYYY-MM)
+    - year    → filter tahun tanggal jurnal (YYYY), diutamakan jika diisi
+    - date_from / date_to → rentang tanggal jurnal (inklusif), jika tanpa period/year
+    - accounts → batasi ke akun / id akun tertentu (opsional)
+
+    Return: {account_id: (debit_total, credit_total)}
+    """
+    items = JournalItem.objects.all()
+
+    if posted_only:
+        items = items.filter(journal_entry__is_posted=True)
+
+    if year:
+        items = items.filter(journal_entry__date__year=year)
+    elif period:
+        items = items.filter(journal_entry__period=period)
+    else:
+        if date_from:
+            items = items.filter(journal_entry__date__gte=date_from)
+        if date_to:
+            items = items.filter(journal_entry__date__lte=date_to)
+
+    if accounts is not None:
+        items = items.filter(account__in=accounts)
+
+    rows = (
+        items.order_by()
+        .values('account_id')
+        .annotate(debit_total=Sum('debit'), credit_total=Sum('credit'))
+    )
+
+    return {
+        row['account_id']: (row['debit_total'] or 0, row['credit_total'] or 0)
+        for row in rows
+    }
+
+
+def balance_from_totals(account, totals):
+    """Saldo akun sesuai balance_type dari hasil account_totals()."""
+    debit_total, credit_total = totals.get(account.id, (0, 0))
+
+    if account.balance_type == 'Debit':
+        return debit_total - credit_total
+    else:
+        return credit_total - debit_total
+
+
+# ==============================
+# TOTAL PER AKUN x PERIODE
+# ==============================
+def period_account_totals(periods, posted_only=True):
+    """
+    Total debit & kredit per akun untuk banyak periode sekaligus,
+    satu query GROUP BY account_id, period.
+
+    Return: {period: {account_id: (debit_total, credit_total)}}
+    """
+    items = JournalItem.objects.filter(journal_entry__period__in=periods)
+    if posted_only:
+        items = items.filter(journal_entry__is_posted=True)
+
+    rows = (
+        items.order_by()
+        .values('account_id', 'journal_entry__period')
+        .annotate(debit_total=Sum('debit'), credit_total=Sum('credit'))
+    )
+
+    totals = {period: {} for period in periods}
+    for row in rows:
+        totals[row['journal_entry__period']][row['account_id']] = (
+            row['debit_total'] or 0,
+            row['credit_total'] or 0,
+        )
+    return totals
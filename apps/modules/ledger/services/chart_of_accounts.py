@@ -0,0 +1,61 @@
+import json
+import logging
+
+from django.core.cache import cache
+
+from apps.modules.ledger.models import Account
+from .report_cache import scope_generation
+
+logger = logging.getLogger(__name__)
+
+COA_CACHE_PREFIX = 'ledger:coa'
+COA_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Urutan kolom setiap akun di JSON (array, bukan object, supaya ringkas)
+COA_FIELDS = ['id', 'code', 'name', 'type', 'balance_type', 'active']
+
+
+# ==============================
+# VERSI & PAYLOAD
+# ==============================
+# Versi COA = generasi cakupan 'accounts' (report_cache), yang sudah
+# dinaikkan ledger.signals setiap Account disimpan / dihapus.
+
+def coa_version():
+    try:
+        return scope_generation('accounts')
+    except Exception:
+        logger.exception("Versi COA tidak tersedia")
+        return None
+
+
+def build_coa_json(version=None):
+    """Semua akun sebagai JSON {'version', 'fields', 'accounts': [[...], ...]} (satu query)."""
+    accounts = Account.objects.order_by('coa', 'account_name', 'id').values_list(
+        'id', 'coa', 'account_name', 'account_type', 'balance_type', 'active'
+    )
+    return json.dumps(
+        {'version': version, 'fields': COA_FIELDS, 'accounts': [list(row) for row in accounts]},
+        separators=(',', ':'),
+    )
+
+
+def coa_json(version=None):
+    """JSON COA untuk `version` dari cache, atau dibangun lalu disimpan."""
+    if version is None:
+        return build_coa_json()
+
+    key = f'{COA_CACHE_PREFIX}:{version}'
+    try:
+        data = cache.get(key)
+    except Exception:
+        logger.exception("Cache COA tidak tersedia, bangun langsung")
+        return build_coa_json(version)
+
+    if data is None:
+        data = build_coa_json(version)
+        try:
+            cache.set(key, data, COA_CACHE_TIMEOUT)
+        except Exception:
+            logger.exception("Gagal menyimpan cache COA")
+    return data
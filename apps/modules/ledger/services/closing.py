@@ -0,0 +1,170 @@
+import calendar
+from datetime import date, datetime
+
+from dateutil.relativedelta import relativedelta
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from apps.modules.ledger.models import Account, ClosingPeriod, JournalEntry, JournalItem
+from apps.modules.ledger.services.period_balance import write_period_snapshot
+from apps.modules.ledger.services.period_status import invalidate_period_status
+
+# Tipe akun yang masuk laba/rugi (saldo kredit - debit = kontribusi ke laba)
+PROFIT_LOSS_TYPES = ('INCOME', 'COGS', 'EXPENSES')
+RETAINED_EARNINGS_COA = '3999'
+
+
+class PeriodClosingError(ValueError):
+    """Periode tidak bisa ditutup (format salah / sudah closed)."""
+
+
+def period_bounds(period):
+    """'YYYY-MM' → (tanggal awal, tanggal akhir) bulan tersebut."""
+    try:
+        start = datetime.strptime(period, '%Y-%m').date()
+    except (TypeError, ValueError):
+        raise PeriodClosingError("Format periode tidak valid. Gunakan YYYY-MM.")
+    return start, date(start.year, start.month, calendar.monthrange(start.year, start.month)[1])
+
+
+def retained_earnings_account():
+    """
+    Akun retained earnings dalam satu query: nama 'Retained Earnings',
+    lalu COA 3999, lalu akun CAPITAL pertama.
+    """
+    candidates = list(
+        Account.objects.filter(
+            Q(account_name__icontains='Retained Earnings')
+            | Q(coa=RETAINED_EARNINGS_COA)
+            | Q(account_type='CAPITAL')
+        ).order_by('id')
+    )
+    for matches in (
+        lambda acc: 'retained earnings' in acc.account_name.lower(),
+        lambda acc: acc.coa == RETAINED_EARNINGS_COA,
+        lambda acc: acc.account_type == 'CAPITAL',
+    ):
+        for account in candidates:
+            if matches(account):
+                return account
+    return None
+
+
+def period_profit(period):
+    """
+    Laba/rugi periode dari satu GROUP BY per tipe akun.
+    Return: {tipe akun: saldo kredit - debit} untuk PROFIT_LOSS_TYPES.
+    """
+    rows = (
+        JournalItem.objects.filter(
+            journal_entry__period=period,
+            journal_entry__is_posted=True,
+            account__account_type__in=PROFIT_LOSS_TYPES,
+        )
+        .order_by()
+        .values('account__account_type')
+        .annotate(total=Sum(F('credit') - F('debit')))
+    )
+    return {row['account__account_type']: row['total'] or 0 for row in rows}
+
+
+# ==========================================================
+# 🔒 TUTUP PERIODE
+# ==========================================================
+def close_period(period, user=None, open_next=True):
+    """
+    Tutup satu periode dalam satu transaksi (jumlah query tetap):
+
+    1. buat (jika belum ada) lalu kunci baris ClosingPeriod (select_for_update)
+    2. posting jurnal draft periode ini, periode sebelumnya dan tanpa periode
+       ke periode ini (satu UPDATE); draft periode sesudahnya tidak disentuh
+    3. hitung laba bersih dengan satu agregat GROUP BY tipe akun
+    4. jurnal penyesuaian retained earnings (dilewati jika akunnya tidak ada),
+       tandai closed, tulis snapshot saldo
+    5. buka periode berikutnya (open_next)
+    6. periode open di memori proses & cache dibuang setelah commit
+
+    Gagal di langkah mana pun → semua di-rollback, periode tidak setengah tertutup.
+    """
+    _, period_end = period_bounds(period)
+
+    with transaction.atomic():
+        # baris periode dibuat di transaksi yang sama: gagal → tidak tertinggal periode kosong
+        ClosingPeriod.objects.get_or_create(period=period)
+        period_obj = ClosingPeriod.objects.select_for_update().get(period=period)
+        if period_obj.is_closed:
+            raise PeriodClosingError(f"Periode {period} sudah tertutup.")
+
+        # ---------------------------
+        # POSTING JURNAL TERTUNDA
+        # ---------------------------
+        posted_count = (
+            JournalEntry.objects.filter(is_posted=False)
+            .filter(Q(period__lte=period) | Q(period__isnull=True) | Q(period=''))
+            .update(period=period, is_posted=True)
+        )
+
+        # ---------------------------
+        # LABA BERSIH → RETAINED EARNINGS
+        # ---------------------------
+        profit = period_profit(period)
+        net_profit = sum(profit.values())
+
+        retained_account = retained_earnings_account() if net_profit else None
+        retained_entry = None
+        if retained_account is not None:
+            retained_entry = JournalEntry.objects.create(
+                date=period_end,
+                description=f"Automatic Retained Earnings Adjustment for {period}",
+                period=period,
+                is_posted=True,
+            )
+            JournalItem.objects.create(
+                journal_entry=retained_entry,
+                account=retained_account,
+                debit=abs(net_profit) if net_profit < 0 else 0,
+                credit=net_profit if net_profit > 0 else 0,
+                note="Transfer Profit to Retained Earnings" if net_profit > 0 else "Transfer Loss to Retained Earnings",
+            )
+
+        # ---------------------------
+        # TANDAI CLOSED + SNAPSHOT
+        # ---------------------------
+        period_obj.is_closed = True
+        period_obj.closed_at = timezone.now()
+        period_obj.closed_by = user or "system"
+        period_obj.save(update_fields=['is_closed', 'closed_at', 'closed_by'])
+
+        snapshot_accounts = write_period_snapshot(period)
+
+        # ---------------------------
+        # PERIODE BERIKUTNYA
+        # ---------------------------
+        next_period = None
+        next_opened = False
+        if open_next:
+            next_month = (period_end + relativedelta(days=1)).strftime('%Y-%m')
+            next_period, next_opened = ClosingPeriod.objects.get_or_create(period=next_month)
+            if next_period.is_closed:
+                next_period.is_closed = False
+                next_period.closed_at = None
+                next_period.closed_by = None
+                next_period.save(update_fields=['is_closed', 'closed_at', 'closed_by'])
+                next_opened = True
+
+        # jurnal diposting lewat update() (tanpa signal): jangan andalkan signal
+        # ClosingPeriod saja untuk membuang periode open yang lama
+        invalidate_period_status()
+
+    return {
+        'period': period_obj,
+        'posted_count': posted_count,
+        'profit': profit,
+        'net_profit': net_profit,
+        'retained_account': retained_account,
+        'retained_entry': retained_entry,
+        'snapshot_accounts': snapshot_accounts,
+        'next_period': next_period,
+        'next_opened': next_opened,
+    }
@@ -0,0 +1,132 @@
+from datetime import datetime
+
+from dateutil.relativedelta import relativedelta
+from django.utils.functional import cached_property
+
+from apps.modules.ledger.models import Account
+from .balance import period_account_totals
+from .trial_balance import TrialBalance
+
+# Batas kolom laporan perbandingan
+MAX_COMPARATIVE_PERIODS = 36
+
+
+def period_range(start, end):
+    """Daftar periode YYYY-MM dari `start` s/d `end` (inklusif)."""
+    first = datetime.strptime(start, '%Y-%m').date()
+    last = datetime.strptime(end, '%Y-%m').date()
+    periods = []
+    while first <= last:
+        periods.append(first.strftime('%Y-%m'))
+        first += relativedelta(months=1)
+    return periods
+
+
+def series(values):
+    """[nilai] → [{'value', 'delta'}], delta = selisih dengan periode sebelumnya."""
+    cells = []
+    previous = None
+    for value in values:
+        delta = None if previous is None or value is None else value - previous
+        cells.append({'value': value, 'delta': delta})
+        previous = value
+    return cells
+
+
+def ratio(numerator, denominator, scale=1):
+    return round(numerator / denominator * scale, 2) if denominator else None
+
+
+class ComparativeReport:
+    """
+    Laporan perbandingan akun x periode (tren bulanan).
+
+    Semua angka berasal dari satu query GROUP BY account_id, period yang
+    di-pivot di memori menjadi satu TrialBalance per periode, jadi aturan
+    saldo sama persis dengan laporan satu periode.
+    """
+
+    def __init__(self, periods):
+        if len(periods) > MAX_COMPARATIVE_PERIODS:
+            raise ValueError(f"Maksimal {MAX_COMPARATIVE_PERIODS} periode.")
+        self.periods = list(periods)
+
+    @cached_property
+    def trial_balances(self):
+        accounts = list(Account.objects.all().order_by('account_name', 'id'))
+        totals = period_account_totals(self.periods)
+        return [
+            TrialBalance.from_totals(totals[period], accounts, period=period)
+            for period in self.periods
+        ]
+
+    # ==============================
+    # MATRIKS
+    # ==============================
+    def rows(self, *account_types):
+        """[{'account', 'cells'}] saldo tiap akun per periode."""
+        first = self.trial_balances[0] if self.trial_balances else None
+        if first is None:
+            return []
+        return [
+            {
+                'account': account,
+                'cells': series([tb.balance(account) for tb in self.trial_balances]),
+            }
+            for account in first.accounts_of_type(*account_types)
+        ]
+
+    def totals(self, *account_types):
+        return [tb.total(*account_types) for tb in self.trial_balances]
+
+    # ==============================
+    # BAGIAN LAPORAN
+    # ==============================
+    def profit_loss(self):
+        income = self.totals('INCOME')
+        cogs = self.totals('COGS')
+        expenses = self.totals('EXPENSES')
+        gross = [i - c for i, c in zip(income, cogs)]
+        net = [g - e for g, e in zip(gross, expenses)]
+        return {
+            'sections': [
+                {'title': 'Pendapatan', 'rows': self.rows('INCOME'), 'total': series(income)},
+                {'title': 'Harga Pokok Penjualan', 'rows': self.rows('COGS'), 'total': series(cogs)},
+                {'title': 'Beban', 'rows': self.rows('EXPENSES'), 'total': series(expenses)},
+            ],
+            'gross_profit': series(gross),
+            'net_profit': series(net),
+        }
+
+    def balance_sheet(self):
+        assets = self.totals('ASSET')
+        liabilities = self.totals('LIABILITY')
+        equities = self.totals('CAPITAL')
+        return {
+            'sections': [
+                {'title': 'Aset', 'rows': self.rows('ASSET'), 'total': series(assets)},
+                {'title': 'Kewajiban', 'rows': self.rows('LIABILITY'), 'total': series(liabilities)},
+                {'title': 'Ekuitas', 'rows': self.rows('CAPITAL'), 'total': series(equities)},
+            ],
+            'liabilities_equities': series([l + e for l, e in zip(liabilities, equities)]),
+        }
+
+    def ratios(self):
+        income = self.totals('INCOME')
+        cogs = self.totals('COGS')
+        expenses = self.totals('EXPENSES')
+        assets = self.totals('ASSET')
+        liabilities = self.totals('LIABILITY')
+        equities = self.totals('CAPITAL')
+
+        def build(name, values):
+            return {'name': name, 'cells': series(values)}
+
+        return [
+            build("Margin Laba Kotor (%)", [ratio(i - c, i, 100) for i, c in zip(income, cogs)]),
+            build("Margin Laba Bersih (%)", [ratio(i - c - e, i, 100) for i, c, e in zip(income, cogs, expenses)]),
+            build("ROA (%)", [ratio(i - c - e, a, 100) for i, c, e, a in zip(income, cogs, expenses, assets)]),
+            build("Rasio Lancar", [ratio(a, l) for a, l in zip(assets, liabilities)]),
+            build("Utang terhadap Aset", [ratio(l, a) for l, a in zip(liabilities, assets)]),
+            build("Utang terhadap Modal", [ratio(l, e) for l, e in zip(liabilities, equities)]),
+        ]
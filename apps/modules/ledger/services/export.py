@@ -0,0 +1,212 @@
+import csv
+import tempfile
+
+from django.http import StreamingHttpResponse
+
+from apps.modules.ledger.models import Account, JournalItem
+from .ledger_lines import ledger_opening_balances, running_balance_lines, scoped_items
+from .trial_balance import TrialBalance
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # openpyxl ada di requirements.txt; tanpa paket itu hanya CSV yang tersedia
+    Workbook = None
+
+# Jumlah baris yang diambil per round-trip saat ekspor
+EXPORT_CHUNK_SIZE = 2000
+
+# Ukuran potongan file XLSX yang dikirim ke klien
+XLSX_STREAM_BLOCK = 64 * 1024
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+class ExportError(ValueError):
+    """Ekspor tidak bisa dibuat (format / dataset tidak dikenal, openpyxl tidak ada)."""
+
+
+# ==============================
+# WRITER
+# ==============================
+class Echo:
+    """Pseudo-buffer untuk csv.writer: writerow() langsung mengembalikan barisnya."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(header, rows):
+    """Generator baris CSV (str); diawali BOM supaya Excel membaca UTF-8."""
+    writer = csv.writer(Echo())
+    yield '\ufeff' + writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def xlsx_chunks(header, rows, title='Export'):
+    """
+    Generator potongan file XLSX.
+
+    Workbook write_only menulis baris langsung ke file sementara
+    (memori tetap), lalu file dikirim per XLSX_STREAM_BLOCK byte.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=title[:31])
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+
+    with tempfile.TemporaryFile() as tmp:
+        workbook.save(tmp)
+        tmp.seek(0)
+        while True:
+            block = tmp.read(XLSX_STREAM_BLOCK)
+            if not block:
+                break
+            yield block
+
+
+def check_format(fmt):
+    """Pastikan format dikenal dan dependensinya tersedia sebelum mulai menulis."""
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f"Format '{fmt}' tidak dikenal. Pilihan: {', '.join(EXPORT_FORMATS)}.")
+    if fmt == 'xlsx' and Workbook is None:
+        raise ExportError("Ekspor XLSX membutuhkan paket openpyxl.")
+
+
+def export_chunks(export, fmt):
+    """Potongan output (str untuk CSV, bytes untuk XLSX) dari hasil fungsi dataset."""
+    check_format(fmt)
+    if fmt == 'xlsx':
+        return xlsx_chunks(export['header'], export['rows'], title=export['title'])
+    return csv_lines(export['header'], export['rows'])
+
+
+def export_response(export, fmt):
+    """StreamingHttpResponse berisi file ekspor sebagai attachment."""
+    response = StreamingHttpResponse(export_chunks(export, fmt), content_type=CONTENT_TYPES.get(fmt))
+    response['Content-Disposition'] = f'attachment; filename="{export["filename"]}.{fmt}"'
+    return response
+
+
+def write_export(export, fmt, stream):
+    """Tulis ekspor ke file biner yang sudah terbuka (management command)."""
+    for chunk in export_chunks(export, fmt):
+        stream.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+
+
+def scope_label(mode, period=None, year=None):
+    return str(year) if mode == 'year' and year else (period or 'semua')
+
+
+# ==============================
+# DATASET
+# ==============================
+def general_ledger_export(mode='period', period=None, year=None):
+    """
+    Buku besar: baris saldo awal per akun lalu transaksi dengan saldo berjalan.
+
+    Transaksi dibaca dengan satu query berurutan (akun, tanggal, id)
+    lewat .iterator(), jadi memori tidak bertambah dengan jumlah baris.
+    """
+
+    def rows():
+        accounts = Account.objects.all().order_by('account_name', 'id')
+        openings = ledger_opening_balances(mode, period, year)
+        lines = (
+            running_balance_lines(scoped_items(mode, period, year))
+            .order_by('account__account_name', 'account_id', 'journal_entry__date', 'id')
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+        pending = next(lines, None)
+
+        for account in accounts:
+            opening = openings.get(account.id, 0)
+            has_lines = pending is not None and pending[0] == account.id
+            if not opening and not has_lines:
+                continue
+
+            yield [account.coa, account.account_name, None, "Saldo Awal", None, None, opening]
+            while pending is not None and pending[0] == account.id:
+                _, date, desc, debit, credit, running = pending
+                yield [account.coa, account.account_name, date, desc, debit, credit, opening + running]
+                pending = next(lines, None)
+
+    return {
+        'title': "Buku Besar",
+        'filename': f"buku-besar-{scope_label(mode, period, year)}",
+        'header': ["COA", "Akun", "Tanggal", "Deskripsi", "Debit", "Kredit", "Saldo"],
+        'rows': rows(),
+    }
+
+
+def journal_export(mode='period', period=None, year=None):
+    """Daftar jurnal per baris item (posted maupun draft), urut tanggal jurnal."""
+    items = JournalItem.objects.all()
+    if mode == 'year' and year:
+        items = items.filter(journal_entry__date__year=year)
+    elif period:
+        items = items.filter(journal_entry__period=period)
+
+    rows = (
+        items.order_by('journal_entry__date', 'journal_entry_id', 'id')
+        .values_list(
+            'journal_entry_id',
+            'journal_entry__date',
+            'journal_entry__period',
+            'journal_entry__description',
+            'journal_entry__is_posted',
+            'account__coa',
+            'account__account_name',
+            'debit',
+            'credit',
+            'note',
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+    return {
+        'title': "Jurnal",
+        'filename': f"jurnal-{scope_label(mode, period, year)}",
+        'header': ["No Jurnal", "Tanggal", "Periode", "Deskripsi", "Posted", "COA", "Akun", "Debit", "Kredit", "Keterangan"],
+        'rows': rows,
+    }
+
+
+def trial_balance_export(mode='period', period=None, year=None):
+    """Neraca saldo: total debit / kredit dan saldo normal semua akun (satu query)."""
+    trial_balance = TrialBalance(
+        period=period if mode != 'year' else None,
+        year=year if mode == 'year' else None,
+    )
+
+    def rows():
+        for account in trial_balance.accounts:
+            yield [
+                account.coa,
+                account.account_name,
+                account.account_type,
+                trial_balance.debit(account),
+                trial_balance.credit(account),
+                trial_balance.balance(account),
+            ]
+
+    return {
+        'title': "Neraca Saldo",
+        'filename': f"neraca-saldo-{scope_label(mode, period, year)}",
+        'header': ["COA", "Akun", "Tipe", "Debit", "Kredit", "Saldo"],
+        'rows': rows(),
+    }
+
+
+# Dataset yang bisa diekspor lewat URL / management command
+LEDGER_EXPORTS = {
+    'ledger': general_ledger_export,
+    'journals': journal_export,
+    'trial-balance': trial_balance_export,
+}
@@ -0,0 +1,255 @@
+import csv
+import re
+import uuid
+from datetime import datetime
+
+from django.db import transaction
+
+from apps.modules.ledger.models import Account, ClosingPeriod, JournalEntry, JournalItem
+from .closing import close_period
+from .comparative import period_range
+from .journal_posting import JournalPostingError, parse_amount
+from .period_status import period_registry
+from .report_cache import invalidate_journals
+
+# Jumlah jurnal per bulk_create JournalEntry (item ikut batch yang sama)
+IMPORT_BATCH_SIZE = 1000
+# Penutup periode historis hasil impor (ClosingPeriod.closed_by)
+IMPORT_CLOSED_BY = 'import'
+
+# Header CSV sama dengan ekspor 'journals', jadi hasil ekspor bisa diimpor ulang
+# (kolom 'Posted' diabaikan: status posted ditentukan oleh status periode)
+IMPORT_COLUMNS = {
+    'no jurnal': 'journal',
+    'tanggal': 'date',
+    'periode': 'period',
+    'deskripsi': 'description',
+    'coa': 'coa',
+    'debit': 'debit',
+    'kredit': 'credit',
+    'keterangan': 'note',
+}
+REQUIRED_COLUMNS = ('journal', 'date', 'coa', 'debit', 'credit')
+
+PERIOD_PATTERN = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
+
+
+class JournalImportError(ValueError):
+    """File impor tidak valid; `errors` berisi [(nomor baris, pesan)]."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f"{len(errors)} kesalahan pada file impor, tidak ada jurnal yang disimpan.")
+
+
+# ==============================
+# PARSE & VALIDASI (SATU PASS)
+# ==============================
+def read_columns(header):
+    """Header CSV → {field: index}; kolom tak dikenal (mis. 'Akun') diabaikan."""
+    columns = {}
+    for index, name in enumerate(header or []):
+        field = IMPORT_COLUMNS.get(name.strip().lstrip('\ufeff').lower())
+        if field:
+            columns[field] = index
+    missing = [name for name, field in IMPORT_COLUMNS.items() if field in REQUIRED_COLUMNS and field not in columns]
+    if missing:
+        raise JournalImportError([(1, f"Kolom wajib tidak ada: {', '.join(missing)}.")])
+    return columns
+
+
+def parse_journals(stream):
+    """
+    Baca CSV baris jurnal dan validasi semuanya dalam satu pass.
+
+    - akun di-resolve dari peta COA yang dimuat sekali
+    - periode dari kolom 'Periode' atau bulan tanggal jurnal; periode s/d
+      periode closed terakhir ditolak (snapshot saldo & retained earnings
+      periode itu sudah final dan tidak dihitung ulang)
+    - status posted ditentukan import_journals() dari periode open saat ini
+    - baris dikelompokkan per 'No Jurnal', setiap jurnal harus seimbang
+
+    Return: list dict {'date', 'description', 'period', 'lines'}.
+    Raise JournalImportError berisi semua kesalahan per baris.
+    """
+    reader = csv.reader(stream)
+    columns = read_columns(next(reader, None))
+
+    accounts = {}
+    ambiguous = set()
+    for account in Account.objects.only('id', 'coa'):
+        if account.coa in accounts:
+            ambiguous.add(account.coa)
+        accounts[account.coa] = account
+    latest_closed = period_registry().latest_closed()
+
+    def cell(row, field):
+        index = columns.get(field)
+        return row[index].strip() if index is not None and index < len(row) else ''
+
+    journals = {}
+    errors = []
+    dates = {}  # baris satu jurnal berbagi tanggal, parse sekali
+
+    for row in reader:
+        line_no = reader.line_num
+        if not any(value.strip() for value in row):
+            continue
+
+        key = cell(row, 'journal')
+        if not key:
+            errors.append((line_no, "No Jurnal kosong."))
+            continue
+
+        date_text = cell(row, 'date')
+        date = dates.get(date_text)
+        if date is None:
+            try:
+                date = dates[date_text] = datetime.strptime(date_text, '%Y-%m-%d').date()
+            except ValueError:
+                errors.append((line_no, f"Tanggal '{date_text}' tidak valid (YYYY-MM-DD)."))
+                continue
+
+        period = cell(row, 'period') or date.strftime('%Y-%m')
+        if not PERIOD_PATTERN.match(period):
+            errors.append((line_no, f"Periode '{period}' tidak valid (YYYY-MM)."))
+            continue
+        if latest_closed and period <= latest_closed:
+            errors.append((line_no, f"Periode {period} tidak setelah periode closed terakhir ({latest_closed})."))
+            continue
+
+        coa = cell(row, 'coa')
+        account = accounts.get(coa)
+        if account is None or coa in ambiguous:
+            reason = "dipakai lebih dari satu akun" if coa in ambiguous else "tidak ditemukan"
+            errors.append((line_no, f"COA '{coa}' {reason}."))
+            continue
+
+        try:
+            debit = parse_amount(cell(row, 'debit'))
+            credit = parse_amount(cell(row, 'credit'))
+        except JournalPostingError as e:
+            errors.append((line_no, str(e)))
+            continue
+        if debit and credit:
+            errors.append((line_no, "Satu baris jurnal hanya boleh berisi debit atau kredit."))
+            continue
+
+        journal = journals.setdefault(key, {
+            'line_no': line_no,
+            'date': date,
+            'description': cell(row, 'description'),
+            'period': period,
+            'lines': [],
+        })
+        if (journal['date'], journal['period']) != (date, period):
+            errors.append((line_no, f"Tanggal / periode berbeda dengan baris pertama jurnal {key}."))
+            continue
+
+        if debit or credit:
+            journal['lines'].append({
+                'account': account,
+                'debit': debit,
+                'credit': credit,
+                'note': cell(row, 'note'),
+            })
+
+    for key, journal in journals.items():
+        total_debit = sum(line['debit'] for line in journal['lines'])
+        total_credit = sum(line['credit'] for line in journal['lines'])
+        if not journal['lines']:
+            errors.append((journal['line_no'], f"Jurnal {key} tidak berisi nominal."))
+        elif total_debit != total_credit:
+            errors.append((
+                journal['line_no'],
+                f"Jurnal {key} tidak seimbang: debit {total_debit:,.0f} ≠ kredit {total_credit:,.0f}.",
+            ))
+
+    if errors:
+        raise JournalImportError(sorted(errors))
+    return list(journals.values())
+
+
+# ==============================
+# SIMPAN (BULK, SATU TRANSAKSI)
+# ==============================
+def historical_periods(periods):
+    """
+    Periode (urut naik) yang ditutup setelah impor: semua bulan dari periode
+    impor pertama s/d periode impor terakhir yang lebih awal dari periode
+    open saat ini, termasuk bulan kosong di antaranya agar tidak ada periode
+    open tertinggal di belakang periode closed.
+    """
+    current = period_registry().latest_open() or ClosingPeriod.get_current_period()
+    past = [period for period in periods if period < current]
+    return period_range(past[0], past[-1]) if past else []
+
+
+def import_journals(stream, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+    """
+    Impor CSV jurnal: validasi semua baris dulu, lalu simpan dalam satu
+    transaksi dengan bulk_create per `batch_size` jurnal. Ada satu kesalahan
+    saja → tidak ada yang disimpan (JournalImportError).
+
+    - jurnal periode lampau (sebelum periode open saat ini) disimpan posted
+      di periodenya sendiri, lalu periode-periode itu ditutup berurutan lewat
+      close_period() (retained earnings & snapshot saldo per periode)
+    - jurnal periode open saat ini / sesudahnya disimpan sebagai draft dan
+      diposting saat periodenya di-close
+
+    Setiap jurnal diberi import_ref '<batch>:<urutan>' untuk memetakan id
+    hasil bulk_create (MySQL tidak mengembalikan id dari INSERT multi-baris).
+    Return: {'batch', 'journals', 'lines', 'periods', 'closed'}.
+    """
+    journals = parse_journals(stream)
+    batch = uuid.uuid4().hex[:12]
+    periods = sorted({journal['period'] for journal in journals})
+    closed = historical_periods(periods)
+    result = {
+        'batch': batch,
+        'journals': len(journals),
+        'lines': sum(len(journal['lines']) for journal in journals),
+        'periods': periods,
+        'closed': closed,
+    }
+    if dry_run or not journals:
+        return result
+
+    past = set(closed)
+
+    with transaction.atomic():
+        created = []
+        for start in range(0, len(journals), batch_size):
+            chunk = journals[start:start + batch_size]
+            entries = [
+                JournalEntry(
+                    date=journal['date'],
+                    description=journal['description'],
+                    period=journal['period'],
+                    is_posted=journal['period'] in past,
+                    import_ref=f'{batch}:{start + offset}',
+                )
+                for offset, journal in enumerate(chunk)
+            ]
+            JournalEntry.objects.bulk_create(entries)
+            ids = dict(
+                JournalEntry.objects.filter(import_ref__in=[entry.import_ref for entry in entries])
+                .values_list('import_ref', 'id')
+            )
+
+            JournalItem.objects.bulk_create(
+                [
+                    JournalItem(journal_entry_id=ids[entry.import_ref], **line)
+                    for entry, journal in zip(entries, chunk)
+                    for line in journal['lines']
+                ],
+                batch_size=batch_size,
+            )
+            created += entries
+
+        for period in closed:
+            close_period(period, user=IMPORT_CLOSED_BY, open_next=False)
+
+        transaction.on_commit(lambda: invalidate_journals(created))
+
+    return result
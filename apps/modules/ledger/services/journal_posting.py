@@ -0,0 +1,245 @@
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from apps.modules.ledger.models import Account, JournalEntry, JournalItem
+from apps.modules.ledger.services.period_status import assign_open_period
+from apps.modules.ledger.services.report_cache import invalidate_journals
+
+
+class JournalPostingError(ValueError):
+    """Baris jurnal tidak valid (akun tidak ada, nominal salah, tidak seimbang)."""
+
+
+def parse_amount(value):
+    """
+    Nominal dari form / dict → int >= 0.
+
+    debit / kredit disimpan di IntegerField: nilai pecahan ditolak (bukan
+    dibulatkan) supaya jurnal yang lolos cek seimbang tersimpan persis sama.
+    """
+    if isinstance(value, str):
+        value = value.strip().replace(',', '')
+    try:
+        amount = Decimal(str(value or 0))
+    except InvalidOperation:
+        raise JournalPostingError(f"Nominal '{value}' tidak valid.")
+    if not amount.is_finite():
+        raise JournalPostingError(f"Nominal '{value}' tidak valid.")
+    if amount != amount.to_integral_value():
+        raise JournalPostingError(f"Nominal '{value}' harus bilangan bulat.")
+    if amount < 0:
+        raise JournalPostingError("Nominal debit / kredit tidak boleh negatif.")
+    return int(amount)
+
+
+def clean_lines(lines):
+    """
+    Validasi baris jurnal & resolve semua akun dengan satu in_bulk.
+
+    Setiap baris: dict dengan 'account' (instance) atau 'account_id',
+    'debit', 'credit', opsional 'note' dan 'id' (JournalItem yang diedit).
+    Baris tanpa akun atau bernilai 0 di kedua sisi dilewati.
+    Return: list dict {'id', 'account', 'debit', 'credit', 'note'}.
+    """
+    cleaned = []
+    for line in lines:
+        account = line.get('account')
+        account_id = account.pk if account is not None else str(line.get('account_id') or '').strip()
+        if not account_id:
+            continue
+
+        debit = parse_amount(line.get('debit'))
+        credit = parse_amount(line.get('credit'))
+        if debit and credit:
+            raise JournalPostingError("Satu baris jurnal hanya boleh berisi debit atau kredit.")
+        if not debit and not credit:
+            continue
+
+        item_id = str(line.get('id') or '').strip()
+        if item_id and not item_id.isdigit():
+            raise JournalPostingError(f"ID baris jurnal '{item_id}' tidak valid.")
+
+        cleaned.append({
+            'id': int(item_id) if item_id else None,
+            'account': account,
+            'account_id': account_id,
+            'debit': debit,
+            'credit': credit,
+            'note': line.get('note') or '',
+        })
+
+    missing_ids = {line['account_id'] for line in cleaned if line['account'] is None}
+    if missing_ids:
+        try:
+            accounts = Account.objects.in_bulk(missing_ids)
+        except (TypeError, ValueError):
+            raise JournalPostingError("ID akun tidak valid.")
+        by_key = {str(pk): account for pk, account in accounts.items()}
+        for line in cleaned:
+            if line['account'] is None:
+                line['account'] = by_key.get(str(line['account_id']))
+                if line['account'] is None:
+                    raise JournalPostingError(f"Akun dengan ID {line['account_id']} tidak ditemukan.")
+
+    if not cleaned:
+        raise JournalPostingError("Jurnal minimal berisi satu baris dengan nominal.")
+
+    total_debit = sum(line['debit'] for line in cleaned)
+    total_credit = sum(line['credit'] for line in cleaned)
+    if total_debit != total_credit:
+        raise JournalPostingError(
+            f"Jurnal tidak seimbang: debit {total_debit:,.0f} ≠ kredit {total_credit:,.0f}."
+        )
+
+    return cleaned
+
+
+def with_accounts(lines, accounts):
+    """Isi 'account' dari peta {str(id): Account} supaya clean_lines tidak query lagi."""
+    result = []
+    for line in lines:
+        if line.get('account') is None:
+            account = accounts.get(str(line.get('account_id') or '').strip())
+            if account is not None:
+                line = dict(line, account=account)
+        result.append(line)
+    return result
+
+
+# ==============================
+# POSTING JURNAL
+# ==============================
+def post_journal(date, description, lines, period=None, is_posted=False):
+    """
+    Buat JournalEntry + semua JournalItem dalam satu transaksi.
+
+    Query: satu in_bulk akun (jika baris berisi account_id), satu INSERT
+    jurnal, satu bulk_create item; periode open (jika `period` kosong)
+    dibaca dari cache (services.period_status.open_period). Cache laporan diinvalidasi setelah commit karena
+    bulk_create tidak mengirim signal.
+    """
+    journal = {'date': date, 'description': description, 'lines': lines}
+    return post_journals([journal], period=period, is_posted=is_posted)[0]
+
+
+def post_journals(journals, period=None, is_posted=False):
+    """
+    Versi banyak jurnal dari post_journal(): `journals` berisi dict
+    {'date', 'description', 'lines'}. Semua baris divalidasi dulu, akun
+    di-resolve dengan satu in_bulk, lalu item semua jurnal ditulis dengan
+    satu bulk_create. Return: list JournalEntry (urutan sama).
+    """
+    journals = list(journals)
+
+    # akun dari semua jurnal → satu in_bulk, lalu validasi per jurnal tanpa query
+    account_ids = {
+        str(line.get('account_id')).strip()
+        for journal in journals
+        for line in journal['lines']
+        if line.get('account') is None and str(line.get('account_id') or '').strip()
+    }
+    accounts = {}
+    if account_ids:
+        try:
+            accounts = {str(pk): account for pk, account in Account.objects.in_bulk(account_ids).items()}
+        except (TypeError, ValueError):
+            raise JournalPostingError("ID akun tidak valid.")
+
+    cleaned = [clean_lines(with_accounts(journal['lines'], accounts)) for journal in journals]
+
+    # periode open di-resolve sekali untuk semua jurnal, save() tidak mencarinya lagi
+    entries = assign_open_period(
+        JournalEntry(
+            date=journal['date'],
+            description=journal['description'],
+            period=period,
+            is_posted=is_posted,
+        )
+        for journal in journals
+    )
+
+    with transaction.atomic():
+        items = []
+        for entry, lines in zip(entries, cleaned):
+            entry.save(force_insert=True)
+            items += [
+                JournalItem(
+                    journal_entry=entry,
+                    account=line['account'],
+                    debit=line['debit'],
+                    credit=line['credit'],
+                    note=line['note'],
+                )
+                for line in lines
+            ]
+
+        JournalItem.objects.bulk_create(items)
+        transaction.on_commit(lambda: invalidate_journals(entries))
+
+    return entries
+
+
+# ==============================
+# EDIT JURNAL (DIFF)
+# ==============================
+ITEM_FIELDS = ('account', 'debit', 'credit', 'note')
+
+
+def update_journal(entry, lines, **changes):
+    """
+    Terapkan perubahan jurnal sebagai diff terhadap item yang sudah ada.
+
+    - `changes`: field JournalEntry yang diubah (mis. description, is_posted),
+      hanya disimpan jika nilainya berbeda
+    - baris ber-'id' milik jurnal ini → bulk_update jika ada yang berubah
+    - baris tanpa 'id' → bulk_create
+    - item lama yang tidak dikirim lagi → satu DELETE
+
+    Cache laporan hanya diinvalidasi jika memang ada perubahan.
+    Return: {'updated', 'created', 'deleted'} (jumlah item).
+    """
+    cleaned = clean_lines(lines)
+
+    with transaction.atomic():
+        header_fields = [field for field, value in changes.items() if getattr(entry, field) != value]
+        for field in header_fields:
+            setattr(entry, field, changes[field])
+        if header_fields:
+            entry.save(update_fields=header_fields)
+
+        existing = {item.id: item for item in entry.items.all()}
+        to_update, to_create = [], []
+
+        for line in cleaned:
+            item = existing.pop(line['id'], None)
+            if item is None:
+                to_create.append(JournalItem(
+                    journal_entry=entry,
+                    **{field: line[field] for field in ITEM_FIELDS},
+                ))
+                continue
+
+            changed = (
+                item.account_id != line['account'].pk
+                or item.debit != line['debit']
+                or item.credit != line['credit']
+                or (item.note or '') != line['note']
+            )
+            if changed:
+                for field in ITEM_FIELDS:
+                    setattr(item, field, line[field])
+                to_update.append(item)
+
+        # sisa `existing` = item yang dihapus dari form
+        if existing:
+            JournalItem.objects.filter(id__in=list(existing)).delete()
+        if to_update:
+            JournalItem.objects.bulk_update(to_update, ITEM_FIELDS)
+        if to_create:
+            JournalItem.objects.bulk_create(to_create)
+
+        if header_fields or existing or to_update or to_create:
+            transaction.on_commit(lambda: invalidate_journals([entry]))
+
+    return {'updated': len(to_update), 'created': len(to_create), 'deleted': len(existing)}
@@ -0,0 +1,69 @@
+from django.db.models import F, Sum, Value, Window
+from django.db.models.functions import Coalesce
+
+from apps.modules.ledger.models import JournalItem
+from .period_balance import opening_balances
+
+# Kolom yang dikembalikan running_balance_lines(), urut sesuai tuple
+LINE_FIELDS = ('account_id', 'journal_entry__date', 'journal_entry__description', 'debit', 'credit', 'running')
+
+
+def running_balance_lines(items, amount=None, fields=LINE_FIELDS):
+    """
+    Tambahkan saldo berjalan per akun yang dihitung di database:
+
+        SUM(debit - credit) OVER (PARTITION BY account_id ORDER BY tanggal, id)
+
+    `amount` bisa diganti (mis. F('credit') untuk pendapatan).
+    Return values_list tuple sesuai `fields` (default LINE_FIELDS);
+    urutan hasil tetap diatur pemanggil lewat .order_by().
+    """
+    if amount is None:
+        amount = F('debit') - F('credit')
+
+    return items.annotate(
+        running=Window(
+            expression=Sum(amount),
+            partition_by=[F('account_id')],
+            order_by=[F('journal_entry__date').asc(), F('id').asc()],
+        )
+    ).values_list(*fields)
+
+
+# ===============================
+# SALDO AWAL SEMUA AKUN
+# ===============================
+def ledger_opening_balances(mode, selected_period=None, selected_year=None):
+    """Saldo awal (debit - kredit) semua akun, {account_id: saldo}."""
+    if mode == 'year' and selected_year:
+        rows = (
+            JournalItem.objects.filter(
+                journal_entry__date__year__lt=selected_year,
+                journal_entry__is_posted=True
+            )
+            .order_by()
+            .values('account_id')
+            .annotate(total=Coalesce(Sum(F('debit') - F('credit')), Value(0)))
+        )
+        return {row['account_id']: row['total'] for row in rows}
+
+    if selected_period:
+        return opening_balances(selected_period)
+
+    return {}
+
+
+# ===============================
+# TRANSAKSI DALAM RENTANG LAPORAN
+# ===============================
+def scoped_items(mode, selected_period=None, selected_year=None):
+    """JournalItem posted untuk periode (mode=period) atau tahun (mode=year)."""
+    if mode == 'year' and selected_year:
+        return JournalItem.objects.filter(
+            journal_entry__date__year=selected_year,
+            journal_entry__is_posted=True
+        )
+    return JournalItem.objects.filter(
+        journal_entry__period=selected_period,
+        journal_entry__is_posted=True
+    )
@@ -0,0 +1,129 @@
+from django.db import transaction
+from django.db.models import F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from apps.modules.ledger.models import AccountPeriodBalance, ClosingPeriod, JournalItem
+from .period_status import period_registry
+
+
+# ==============================
+# TULIS SNAPSHOT SALDO PERIODE
+# ==============================
+def write_period_snapshot(period):
+    """
+    Simpan saldo semua akun untuk satu periode ke AccountPeriodBalance.
+
+    Saldo akhir = saldo akhir snapshot sebelumnya + mutasi posted sesudahnya
+    s/d periode ini, jadi yang di-scan hanya jurnal setelah snapshot terakhir.
+    Snapshot lama untuk periode yang sama diganti seluruhnya.
+    """
+    with transaction.atomic():
+        previous_period = (
+            AccountPeriodBalance.objects.filter(period__lt=period)
+            .order_by('-period')
+            .values_list('period', flat=True)
+            .first()
+        )
+
+        closing = {}
+        if previous_period:
+            closing = dict(
+                AccountPeriodBalance.objects.filter(period=previous_period)
+                .values_list('account_id', 'closing_balance')
+            )
+
+        items = JournalItem.objects.filter(
+            journal_entry__is_posted=True,
+            journal_entry__period__lte=period,
+        )
+        if previous_period:
+            items = items.filter(journal_entry__period__gt=previous_period)
+
+        in_period = Q(journal_entry__period=period)
+        movements = (
+            items.order_by()
+            .values('account_id')
+            .annotate(
+                movement=Coalesce(Sum(F('debit') - F('credit')), Value(0)),
+                period_debit=Coalesce(Sum('debit', filter=in_period), Value(0)),
+                period_credit=Coalesce(Sum('credit', filter=in_period), Value(0)),
+            )
+        )
+
+        period_totals = {}
+        for row in movements:
+            account_id = row['account_id']
+            closing[account_id] = closing.get(account_id, 0) + row['movement']
+            period_totals[account_id] = (row['period_debit'], row['period_credit'])
+
+        AccountPeriodBalance.objects.filter(period=period).delete()
+        AccountPeriodBalance.objects.bulk_create([
+            AccountPeriodBalance(
+                account_id=account_id,
+                period=period,
+                debit=period_totals.get(account_id, (0, 0))[0],
+                credit=period_totals.get(account_id, (0, 0))[1],
+                closing_balance=balance,
+            )
+            for account_id, balance in closing.items()
+        ])
+
+    return len(closing)
+
+
+def rebuild_period_snapshots(since=None):
+    """
+    Bangun ulang snapshot semua periode closed (urut naik),
+    mulai dari `since` (YYYY-MM) jika diisi. Return daftar periode.
+    """
+    periods = ClosingPeriod.objects.filter(is_closed=True)
+    stale = AccountPeriodBalance.objects.all()
+    if since:
+        periods = periods.filter(period__gte=since)
+        stale = stale.filter(period__gte=since)
+
+    periods = list(periods.order_by('period').values_list('period', flat=True))
+
+    with transaction.atomic():
+        stale.delete()
+        for period in periods:
+            write_period_snapshot(period)
+
+    return periods
+
+
+# ==============================
+# SALDO AWAL DARI SNAPSHOT
+# ==============================
+def opening_balances(period):
+    """
+    Saldo awal (debit - kredit) semua akun untuk `period`,
+    diambil dari snapshot periode closed terakhir sebelum `period`.
+
+    Return: {account_id: saldo}. Jika snapshot belum dibangun,
+    fallback ke scan JournalItem seperti sebelumnya.
+    """
+    previous_closed = next(
+        (status.period for status in period_registry().closed() if status.period < period),
+        None,
+    )
+    if not previous_closed:
+        return {}
+
+    snapshot = dict(
+        AccountPeriodBalance.objects.filter(period=previous_closed)
+        .values_list('account_id', 'closing_balance')
+    )
+    if snapshot:
+        return snapshot
+
+    rows = (
+        JournalItem.objects.filter(
+            journal_entry__period__lte=previous_closed,
+            journal_entry__is_posted=True,
+        )
+        .order_by()
+        .values('account_id')
+        .annotate(total=Coalesce(Sum(F('debit') - F('credit')), Value(0)))
+    )
+    return {row['account_id']: row['total'] for row in rows}
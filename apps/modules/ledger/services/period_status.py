@@ -0,0 +1,215 @@
+import logging
+import time
+from collections import namedtuple
+
+from asgiref.local import Local
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.modules.ledger.models import ClosingPeriod
+
+logger = logging.getLogger(__name__)
+
+PERIOD_STATUS_KEY = 'ledger:period-status'
+PERIOD_STATUS_TIMEOUT = 60 * 60
+
+OPEN_PERIOD_KEY = 'ledger:open-period'
+# Generasi periode open di cache: close / reopen menaikkannya, nilai di memori
+# proses yang generasinya berbeda langsung dibuang (juga di proses lain).
+OPEN_PERIOD_GENERATION_KEY = 'ledger:open-period:gen'
+# Lama periode open disimpan di memori proses (detik); 0 = selalu baca cache.
+# Batas ini hanya penentu jika cache tidak tersedia untuk membaca generasi.
+OPEN_PERIOD_LOCAL_TIMEOUT = getattr(settings, 'LEDGER_OPEN_PERIOD_LOCAL_TIMEOUT', 5)
+
+# Pengganti ringan instance ClosingPeriod untuk dropdown periode
+PeriodStatus = namedtuple('PeriodStatus', ['period', 'is_closed'])
+
+# Registry per request (aktif antara signal request_started dan request_finished)
+_request = Local()
+
+# Periode open di memori proses: (period, generasi, kedaluwarsa menurut time.monotonic())
+_process = {'open_period': (None, None, 0.0)}
+
+
+class PeriodRegistry:
+    """
+    Status semua periode {period: is_closed} untuk satu request.
+
+    Dimuat sekali dari cache (atau satu query jika cache kosong), setelah
+    itu semua pengecekan status periode tidak butuh query lagi.
+    """
+
+    def __init__(self, statuses):
+        self.statuses = statuses
+
+    def exists(self, period):
+        return period in self.statuses
+
+    def is_closed(self, period):
+        return self.statuses.get(period, False)
+
+    def periods(self, closed=None):
+        """[PeriodStatus] urut terbaru dulu; closed=True/False untuk menyaring."""
+        return [
+            PeriodStatus(period, is_closed)
+            for period, is_closed in sorted(self.statuses.items(), reverse=True)
+            if closed is None or is_closed == closed
+        ]
+
+    def closed(self):
+        return self.periods(closed=True)
+
+    def open(self):
+        return self.periods(closed=False)
+
+    def latest_closed(self):
+        closed = self.closed()
+        return closed[0].period if closed else None
+
+    def latest_open(self):
+        open_periods = self.open()
+        return open_periods[0].period if open_periods else None
+
+
+def load_period_statuses():
+    """{period: is_closed} dari cache, atau satu query lalu disimpan ke cache."""
+    try:
+        statuses = cache.get(PERIOD_STATUS_KEY)
+    except Exception:
+        logger.exception("Gagal membaca status periode dari cache")
+        statuses = None
+
+    if statuses is None:
+        statuses = dict(ClosingPeriod.objects.values_list('period', 'is_closed'))
+        # di dalam transaksi status bisa belum di-commit (atau di-rollback): jangan di-cache
+        if not transaction.get_connection().in_atomic_block:
+            try:
+                cache.set(PERIOD_STATUS_KEY, statuses, PERIOD_STATUS_TIMEOUT)
+            except Exception:
+                logger.exception("Gagal menyimpan status periode ke cache")
+    return statuses
+
+
+def period_registry():
+    """
+    PeriodRegistry request saat ini. Di luar request (management command,
+    shell) registry dibuat ulang dari cache setiap kali dipanggil.
+    """
+    registry = getattr(_request, 'registry', None)
+    if registry is None:
+        registry = PeriodRegistry(load_period_statuses())
+        if getattr(_request, 'active', False):
+            _request.registry = registry
+    return registry
+
+
+# ==============================
+# PERIODE OPEN
+# ==============================
+def open_period_generation():
+    generation = cache.get(OPEN_PERIOD_GENERATION_KEY)
+    if generation is None:
+        cache.add(OPEN_PERIOD_GENERATION_KEY, time.time_ns(), None)
+        generation = cache.get(OPEN_PERIOD_GENERATION_KEY)
+    return generation
+
+
+def bump_open_period_generation():
+    try:
+        try:
+            cache.incr(OPEN_PERIOD_GENERATION_KEY)
+        except ValueError:
+            cache.set(OPEN_PERIOD_GENERATION_KEY, time.time_ns(), None)
+    except Exception:
+        logger.exception("Gagal menaikkan generasi periode open")
+
+
+def open_period():
+    """
+    Periode open terbaru (YYYY-MM) untuk jurnal tanpa periode.
+
+    Urutan: memori proses (selama generasinya sama dengan di cache) →
+    cache (OPEN_PERIOD_KEY) → registry; jika tidak ada periode open sama
+    sekali, ClosingPeriod.get_open_period() membuat periode bulan ini.
+    Close / reopen mengosongkan ketiganya (invalidate_period_status).
+    """
+    try:
+        generation = open_period_generation()
+    except Exception:
+        logger.exception("Gagal membaca generasi periode open dari cache")
+        generation = None
+
+    period, local_generation, expires = _process['open_period']
+    if period and local_generation == generation and time.monotonic() < expires:
+        return period
+
+    try:
+        period = cache.get(OPEN_PERIOD_KEY)
+    except Exception:
+        logger.exception("Gagal membaca periode open dari cache")
+        period = None
+
+    if not period:
+        period = period_registry().latest_open() or ClosingPeriod.get_open_period().period
+        # sama seperti status periode: hasil di dalam transaksi tidak di-cache
+        if transaction.get_connection().in_atomic_block:
+            return period
+        try:
+            cache.set(OPEN_PERIOD_KEY, period, PERIOD_STATUS_TIMEOUT)
+        except Exception:
+            logger.exception("Gagal menyimpan periode open ke cache")
+
+    if OPEN_PERIOD_LOCAL_TIMEOUT:
+        _process['open_period'] = (period, generation, time.monotonic() + OPEN_PERIOD_LOCAL_TIMEOUT)
+    return period
+
+
+def assign_open_period(entries):
+    """
+    Isi `period` semua JournalEntry (belum disimpan) yang periodenya kosong
+    dengan satu lookup periode open, supaya save() / bulk_create tidak
+    mencari periode per baris. Return: entries.
+    """
+    entries = list(entries)
+    if any(not entry.period for entry in entries):
+        period = open_period()
+        for entry in entries:
+            if not entry.period:
+                entry.period = period
+    return entries
+
+
+def reset_period_registry(**kwargs):
+    _request.registry = None
+
+
+def begin_request(**kwargs):
+    _request.active = True
+    _request.registry = None
+
+
+def end_request(**kwargs):
+    _request.active = False
+    _request.registry = None
+
+
+def invalidate_period_status():
+    """
+    Buang registry request ini, periode open di memori proses dan
+    cache-nya (generasi dinaikkan agar proses lain ikut membuang nilai
+    lokalnya), sekarang dan sekali lagi setelah commit (request lain bisa
+    mengisi ulang cache dengan status lama selama transaksi berjalan).
+    """
+    reset_period_registry()
+
+    def delete():
+        _process['open_period'] = (None, None, 0.0)
+        bump_open_period_generation()
+        try:
+            cache.delete_many([PERIOD_STATUS_KEY, OPEN_PERIOD_KEY])
+        except Exception:
+            logger.exception("Gagal invalidasi cache status periode")
+
+    delete()
+    transaction.on_commit(delete)
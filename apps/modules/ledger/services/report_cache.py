@@ -0,0 +1,129 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .period_status import period_registry
+
+logger = logging.getLogger(__name__)
+
+REPORT_CACHE_PREFIX = 'ledger:report'
+GENERATION_PREFIX = 'ledger:gen'
+
+
+# ==============================
+# GENERASI (VERSI) PER CAKUPAN
+# ==============================
+# Setiap hasil laporan disimpan dengan key yang memuat nomor generasi
+# cakupannya. Mengubah jurnal cukup menaikkan generasi cakupan terkait
+# (period:YYYY-MM, year:YYYY, ...), key lama otomatis tidak terpakai.
+
+def _generation_key(scope):
+    return f'{GENERATION_PREFIX}:{scope}'
+
+
+def bump_generations(*scopes):
+    """Naikkan generasi cakupan → semua laporan di cakupan itu jadi basi."""
+    for scope in set(filter(None, scopes)):
+        key = _generation_key(scope)
+        try:
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, time.time_ns(), None)
+        except Exception:
+            logger.exception("Gagal invalidasi cache laporan untuk %s", scope)
+
+
+def _generations(scopes):
+    keys = [_generation_key(scope) for scope in scopes]
+    values = cache.get_many(keys)
+
+    for key in keys:
+        if key not in values:
+            # generasi baru (atau ter-evict) → nilai unik agar tidak bentrok dengan key lama
+            cache.add(key, time.time_ns(), None)
+            values[key] = cache.get(key)
+
+    return '.'.join(str(values[key]) for key in keys)
+
+
+def scope_generation(*scopes):
+    """Generasi gabungan cakupan, untuk cache lain yang ikut basi bersama cakupan itu."""
+    return _generations(scopes)
+
+
+def report_scopes(mode, period=None, year=None):
+    """Cakupan yang memengaruhi hasil laporan periode / tahun."""
+    if mode == 'year':
+        return ['accounts', 'posting', f'year:{year}']
+    return ['accounts', f'period:{period}']
+
+
+def is_immutable(mode, period=None, year=None):
+    """Periode closed (atau tahun yang 12 bulannya closed) tidak akan berubah lagi."""
+    registry = period_registry()
+    if mode == 'year':
+        closed = [status for status in registry.closed() if status.period.startswith(f'{year}-')]
+        return len(closed) >= 12
+    return registry.is_closed(period)
+
+
+# ==============================
+# CACHE HASIL LAPORAN
+# ==============================
+def cached_report(report, mode, period=None, year=None, build=None):
+    """
+    Ambil hasil laporan dari cache, atau jalankan build() lalu simpan.
+
+    - Periode / tahun closed → LEDGER_REPORT_CLOSED_CACHE_TIMEOUT detik
+      (lama, tapi tetap berbatas agar entri lama tidak menumpuk di cache)
+    - Periode open → LEDGER_REPORT_CACHE_TIMEOUT detik, dan ikut basi
+      begitu jurnal di cakupannya berubah (lihat ledger.signals)
+    """
+    scope_value = year if mode == 'year' else period
+    if not scope_value:
+        return build()
+
+    try:
+        version = _generations(report_scopes(mode, period, year))
+        key = f'{REPORT_CACHE_PREFIX}:{report}:{mode}:{scope_value}:{version}'
+        data = cache.get(key)
+    except Exception:
+        logger.exception("Cache laporan tidak tersedia, hitung langsung")
+        return build()
+
+    if data is None:
+        data = build()
+        if is_immutable(mode, period, year):
+            timeout = getattr(settings, 'LEDGER_REPORT_CLOSED_CACHE_TIMEOUT', 60 * 60 * 24)
+        else:
+            timeout = getattr(settings, 'LEDGER_REPORT_CACHE_TIMEOUT', 300)
+        try:
+            cache.set(key, data, timeout)
+        except Exception:
+            logger.exception("Gagal menyimpan cache laporan %s", key)
+
+    return data
+
+
+# ==============================
+# INVALIDASI DARI JURNAL
+# ==============================
+def journal_scopes(period=None, date=None):
+    """Cakupan yang terdampak perubahan jurnal dengan periode / tanggal ini."""
+    scopes = []
+    if period:
+        scopes.append(f'period:{period}')
+    if date:
+        scopes.append(f'year:{date.year}')
+    return scopes
+
+
+def invalidate_journals(entries):
+    """Invalidasi manual untuk jalur yang melewati signal (bulk_create, update)."""
+    scopes = []
+    for entry in entries:
+        scopes += journal_scopes(entry.period, entry.date)
+    bump_generations(*scopes)
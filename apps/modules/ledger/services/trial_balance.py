@@ -0,0 +1,92 @@
+from django.utils.functional import cached_property
+
+from apps.modules.ledger.models import Account
+from .balance import account_totals
+
+
+class TrialBalance:
+    """
+    Neraca saldo: total debit / kredit semua akun untuk satu rentang
+    (periode, tahun, atau rentang tanggal), dihitung dalam satu query.
+
+    Semua laporan (neraca, laba rugi, rasio) mengambil angka dari sini
+    supaya filter dan aturan saldonya sama. Gunakan for_request() agar
+    rentang yang sama hanya dihitung sekali per request.
+    """
+
+    def __init__(self, period=None, year=None, date_from=None, date_to=None):
+        self.period = period
+        self.year = year
+        self.date_from = date_from
+        self.date_to = date_to
+
+    @classmethod
+    def for_request(cls, request, period=None, year=None, date_from=None, date_to=None):
+        """Ambil TrialBalance yang sudah dihitung di request ini, atau buat baru."""
+        cache = request.__dict__.setdefault('_ledger_trial_balances', {})
+        key = (period, str(year) if year else None, date_from, date_to)
+        if key not in cache:
+            cache[key] = cls(period=period, year=year, date_from=date_from, date_to=date_to)
+        return cache[key]
+
+    @classmethod
+    def from_totals(cls, totals, accounts, period=None):
+        """TrialBalance dari total yang sudah dihitung (mis. satu query multi-periode)."""
+        trial_balance = cls(period=period)
+        trial_balance.__dict__['totals'] = totals
+        trial_balance.__dict__['accounts'] = accounts
+        return trial_balance
+
+    # ==============================
+    # DATA
+    # ==============================
+    @cached_property
+    def totals(self):
+        """{account_id: (debit, credit)} — hanya jurnal yang sudah posted."""
+        if not (self.period or self.year or self.date_from or self.date_to):
+            return {}
+        return account_totals(
+            period=self.period,
+            year=self.year,
+            date_from=self.date_from,
+            date_to=self.date_to,
+        )
+
+    @cached_property
+    def accounts(self):
+        return list(Account.objects.all().order_by('account_name', 'id'))
+
+    def accounts_of_type(self, *account_types, active_only=True):
+        return [
+            acc for acc in self.accounts
+            if acc.account_type in account_types and (acc.active or not active_only)
+        ]
+
+    # ==============================
+    # SALDO
+    # ==============================
+    def debit(self, account):
+        return self.totals.get(account.id, (0, 0))[0]
+
+    def credit(self, account):
+        return self.totals.get(account.id, (0, 0))[1]
+
+    def balance(self, account):
+        """Saldo normal akun sesuai balance_type (Debit: D - K, selain itu: K - D)."""
+        debit, credit = self.totals.get(account.id, (0, 0))
+        if account.balance_type == 'Debit':
+            return debit - credit
+        return credit - debit
+
+    def rows(self, *account_types, active_only=True):
+        """[{'account': acc, 'balance': saldo}] untuk tipe akun tertentu."""
+        return [
+            {'account': acc, 'balance': self.balance(acc)}
+            for acc in self.accounts_of_type(*account_types, active_only=active_only)
+        ]
+
+    def total(self, *account_types, active_only=True):
+        return sum(
+            self.balance(acc)
+            for acc in self.accounts_of_type(*account_types, active_only=active_only)
+        )
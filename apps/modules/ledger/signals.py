@@ -0,0 +1,55 @@
+from django.core.signals import request_finished, request_started
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.modules.ledger.models import Account, ClosingPeriod, JournalEntry, JournalItem
+from apps.modules.ledger.services import period_status
+from apps.modules.ledger.services.report_cache import bump_generations, journal_scopes
+
+
+# ==========================================================
+# 🧾 JURNAL → invalidasi cache laporan periode / tahun terkait
+# ==========================================================
+@receiver(post_save, sender=JournalEntry)
+@receiver(post_delete, sender=JournalEntry)
+def invalidate_journal_entry(sender, instance, **kwargs):
+    # _ledger_origin diisi JournalEntry.from_db: pindah periode ikut meng-invalidasi yang lama
+    old_period, old_date = getattr(instance, '_ledger_origin', (None, None))
+    bump_generations(
+        *journal_scopes(old_period, old_date),
+        *journal_scopes(instance.period, instance.date),
+    )
+    instance._ledger_origin = (instance.period, instance.date)
+
+
+@receiver(post_save, sender=JournalItem)
+@receiver(post_delete, sender=JournalItem)
+def invalidate_journal_item(sender, instance, **kwargs):
+    try:
+        entry = instance.journal_entry
+    except JournalEntry.DoesNotExist:
+        return
+    bump_generations(*journal_scopes(entry.period, entry.date))
+
+
+# ==========================================================
+# 🔒 PERIODE & AKUN
+# ==========================================================
+@receiver(post_save, sender=ClosingPeriod)
+@receiver(post_delete, sender=ClosingPeriod)
+def invalidate_closing_period(sender, instance, **kwargs):
+    # close_period() mem-posting jurnal lewat update() (tanpa signal),
+    # jadi laporan tahunan ikut dibuat basi lewat cakupan 'posting'
+    bump_generations(f'period:{instance.period}', f'year:{instance.period[:4]}', 'posting')
+    period_status.invalidate_period_status()
+
+
+# registry status periode berlaku per request
+request_started.connect(period_status.begin_request, dispatch_uid='ledger_period_registry_begin')
+request_finished.connect(period_status.end_request, dispatch_uid='ledger_period_registry_end')
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+def invalidate_accounts(sender, instance, **kwargs):
+    bump_generations('accounts')
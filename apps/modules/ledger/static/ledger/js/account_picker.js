@@ -0,0 +1,106 @@
+// === Picker akun: satu <datalist> COA untuk semua baris jurnal ===
+// Daftar akun diambil sekali dari JSON COA (URL di data-url datalist,
+// ber-ETag & Cache-Control), setiap baris cukup berisi input teks
+// .account-picker + hidden account_id[].
+const AccountPicker = {
+    byId: new Map(),
+    byLabel: new Map(),
+    loaded: null,
+
+    load(url) {
+        if (!this.loaded) {
+            this.loaded = fetch(url, { credentials: 'same-origin' })
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error(`HTTP ${response.status}`);
+                    }
+                    return response.json();
+                })
+                .then(data => this.fill(data))
+                .catch(() => alert('Daftar akun gagal dimuat. Muat ulang halaman.'));
+        }
+        return this.loaded;
+    },
+
+    fill(data) {
+        const col = {};
+        data.fields.forEach((field, index) => { col[field] = index; });
+
+        const datalist = document.getElementById('account-options');
+        const fragment = document.createDocumentFragment();
+
+        data.accounts.forEach(row => {
+            const account = { id: String(row[col.id]), active: row[col.active] };
+            let label = row[col.code] ? `${row[col.code]} · ${row[col.name]}` : row[col.name];
+            if (this.byLabel.has(label)) {
+                label += ` #${account.id}`;  // COA + nama kembar: bedakan dengan id
+            }
+            account.label = label;
+            this.byId.set(account.id, account);
+            this.byLabel.set(label, account);
+
+            // akun nonaktif tidak ditawarkan, tapi tetap tampil di baris yang sudah memakainya
+            if (account.active) {
+                const option = document.createElement('option');
+                option.value = label;
+                fragment.appendChild(option);
+            }
+        });
+
+        datalist.appendChild(fragment);
+        document.querySelectorAll('.account-picker').forEach(input => this.sync(input));
+    },
+
+    hiddenFor(input) {
+        return input.closest('tr').querySelector('input[name="account_id[]"]');
+    },
+
+    // Tampilkan label akun yang sudah terpilih (prefill / edit)
+    sync(input) {
+        const account = this.byId.get(this.hiddenFor(input).value);
+        if (account) {
+            input.value = account.label;
+        }
+    },
+
+    bind(row) {
+        const input = row.querySelector('.account-picker');
+        const hidden = this.hiddenFor(input);
+
+        input.classList.remove('is-invalid');
+        input.addEventListener('input', () => {
+            const account = this.byLabel.get(input.value);
+            hidden.value = account ? account.id : '';
+            input.classList.toggle('is-invalid', input.value !== '' && !account);
+        });
+        this.sync(input);
+    },
+
+    // Baris bernominal wajib punya akun (server melewati baris tanpa akun)
+    validate() {
+        let valid = true;
+        document.querySelectorAll('.account-picker').forEach(input => {
+            const row = input.closest('tr');
+            if (row.style.display === 'none' || this.hiddenFor(input).value) {
+                return;
+            }
+            const amounts = row.querySelectorAll('input[name="debit[]"], input[name="credit[]"]');
+            const hasAmount = Array.from(amounts).some(amount => /[1-9]/.test(amount.value));
+            if (input.value !== '' || hasAmount) {
+                input.classList.add('is-invalid');
+                valid = false;
+            }
+        });
+        if (!valid) {
+            alert('Pilih akun dari daftar untuk setiap baris jurnal.');
+        }
+        return valid;
+    },
+};
+
+document.addEventListener('DOMContentLoaded', () => {
+    const datalist = document.getElementById('account-options');
+    if (datalist) {
+        AccountPicker.load(datalist.dataset.url);
+    }
+});
@@ -53,6 +53,9 @@ function addEntry() {
         removeEntry(this);
     };
 
+    // Picker akun (account_picker.js) untuk baris baru
+    AccountPicker.bind(row);
+
     document.getElementById('entries').appendChild(row);
     updateTotals();
 }
@@ -103,6 +106,10 @@ function validateJournal() {
         return false;
     }
 
+    if (!AccountPicker.validate()) {
+        return false;
+    }
+
     // Hapus titik sebelum submit (agar backend terima angka polos)
     document.querySelectorAll('input[name="debit[]"], input[name="credit[]"]').forEach(input => {
         input.value = parseNumber(input.value);
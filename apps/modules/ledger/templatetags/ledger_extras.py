@@ -1,6 +1,6 @@
 from django import template
 
-from apps.modules.ledger.models import ClosingPeriod
+from apps.modules.ledger.services import period_registry
 
 register = template.Library()
 
@@ -9,5 +9,4 @@ def closing_status(period):
     """Return True jika periode sudah closing, False jika belum atau tidak ditemukan."""
     if not period:
         return False
-    cp = ClosingPeriod.objects.filter(period=period).first()
-    return cp.is_closed if cp else False
+    return period_registry().is_closed(period)
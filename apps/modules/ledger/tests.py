@@ -1,3 +1,663 @@
-from django.test import TestCase
+import io
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.modules.ledger.models import Account, AccountPeriodBalance, ClosingPeriod, JournalEntry, JournalItem
+from apps.modules.ledger.services import (
+    JournalImportError,
+    JournalPostingError,
+    PeriodClosingError,
+    cached_report,
+    close_period,
+    import_journals,
+    opening_balances,
+    period_registry,
+    post_journal,
+    rebuild_period_snapshots,
+    update_journal,
+)
+from apps.modules.ledger.services import period_status
+from apps.modules.ledger.services.journal_posting import parse_amount
+from apps.modules.ledger.services.report_cache import scope_generation
+
+# Cache in-memory agar test tidak bergantung pada Redis
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'ledger-tests',
+    }
+}
+
+
+def make_accounts():
+    """Bagan akun minimal: {coa: Account}."""
+    chart = [
+        ('1101', 'Kas', 'ASSET', 'Debit'),
+        ('2101', 'Utang Usaha', 'LIABILITY', 'Credit'),
+        ('3101', 'Modal', 'CAPITAL', 'Credit'),
+        ('3999', 'Retained Earnings', 'CAPITAL', 'Credit'),
+        ('4101', 'Pendapatan Parkir', 'INCOME', 'Credit'),
+        ('5001', 'Harga Pokok Penjualan', 'COGS', 'Debit'),
+        ('6101', 'Beban Gaji', 'EXPENSES', 'Debit'),
+    ]
+    return {
+        coa: Account.objects.create(coa=coa, account_name=name, account_type=account_type, balance_type=balance_type)
+        for coa, name, account_type, balance_type in chart
+    }
+
+
+def make_journal(entry_date, period, lines, posted=True, description='Jurnal test'):
+    """lines: [(Account, debit, credit)]."""
+    entry = JournalEntry.objects.create(date=entry_date, description=description, period=period, is_posted=posted)
+    JournalItem.objects.bulk_create([
+        JournalItem(journal_entry=entry, account=account, debit=debit, credit=credit)
+        for account, debit, credit in lines
+    ])
+    return entry
+
+
+class LedgerTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        period_status.invalidate_period_status()
+        self.accounts = make_accounts()
+
+
+# ==========================================================
+# 📸 SNAPSHOT SALDO PERIODE (user-002 / user-019)
+# ==========================================================
+@override_settings(CACHES=LOCMEM_CACHES)
+class PeriodSnapshotTests(LedgerTestCase):
+    def setUp(self):
+        super().setUp()
+        kas, utang, modal = self.accounts['1101'], self.accounts['2101'], self.accounts['3101']
+        ClosingPeriod.objects.create(period='2025-01')
+        make_journal(date(2025, 1, 3), '2025-01', [(kas, 1000, 0), (modal, 0, 1000)])
+        close_period('2025-01', user='test')
+
+        make_journal(date(2025, 2, 10), '2025-02', [(kas, 0, 300), (utang, 300, 0)])
+        close_period('2025-02', user='test')
+
+    def snapshot(self, period):
+        return {
+            row.account_id: (row.debit, row.credit, row.closing_balance)
+            for row in AccountPeriodBalance.objects.filter(period=period)
+        }
+
+    def test_snapshot_chains_previous_closing_balance(self):
+        kas, utang, modal = self.accounts['1101'], self.accounts['2101'], self.accounts['3101']
+
+        self.assertEqual(self.snapshot('2025-01')[kas.id], (1000, 0, 1000))
+        # periode kedua: mutasi periode itu saja, saldo akhir melanjutkan snapshot sebelumnya
+        self.assertEqual(self.snapshot('2025-02')[kas.id], (0, 300, 700))
+        self.assertEqual(
+            opening_balances('2025-03'),
+            {kas.id: 700, utang.id: 300, modal.id: -1000},
+        )
+
+    def test_rebuild_reproduces_snapshots(self):
+        before = {period: self.snapshot(period) for period in ('2025-01', '2025-02')}
+
+        AccountPeriodBalance.objects.all().delete()
+        self.assertEqual(rebuild_period_snapshots(), ['2025-01', '2025-02'])
+
+        self.assertEqual({period: self.snapshot(period) for period in before}, before)
+
+    def test_opening_balances_fall_back_without_snapshot(self):
+        expected = opening_balances('2025-03')
+        AccountPeriodBalance.objects.all().delete()
+        self.assertEqual(opening_balances('2025-03'), expected)
+
+    def test_import_rejects_closed_periods(self):
+        csv_text = (
+            "No Jurnal,Tanggal,Periode,Deskripsi,COA,Debit,Kredit\n"
+            "J1,2025-02-15,2025-02,Koreksi,1101,50,0\n"
+            "J1,2025-02-15,2025-02,Koreksi,3101,0,50\n"
+        )
+        with self.assertRaises(JournalImportError) as raised:
+            import_journals(io.StringIO(csv_text))
+
+        self.assertIn('2025-02', raised.exception.errors[0][1])
+        self.assertFalse(JournalEntry.objects.filter(description='Koreksi').exists())
+        self.assertEqual(self.snapshot('2025-02')[self.accounts['1101'].id], (0, 300, 700))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class JournalImportTests(LedgerTestCase):
+    CSV = (
+        "No Jurnal,Tanggal,Deskripsi,COA,Debit,Kredit\n"
+        "J1,2024-01-10,Impor Jan,1101,100,0\n"
+        "J1,2024-01-10,Impor Jan,4101,0,100\n"
+        "J2,2024-02-10,Impor Feb,1101,200,0\n"
+        "J2,2024-02-10,Impor Feb,4101,0,200\n"
+        "J3,2024-03-10,Impor Mar,1101,300,0\n"
+        "J3,2024-03-10,Impor Mar,4101,0,300\n"
+        "J4,2024-05-10,Impor Mei,1101,50,0\n"
+        "J4,2024-05-10,Impor Mei,4101,0,50\n"
+    )
+
+    def setUp(self):
+        super().setUp()
+        ClosingPeriod.objects.create(period='2024-05')  # periode open saat ini
+
+    def import_csv(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return import_journals(io.StringIO(self.CSV), **kwargs)
+
+    def test_past_periods_posted_in_own_period_and_closed(self):
+        result = self.import_csv()
+
+        self.assertEqual(result['periods'], ['2024-01', '2024-02', '2024-03', '2024-05'])
+        # hanya periode lampau yang diimpor; 2024-04 tidak ada di file, tetap open
+        self.assertEqual(result['closed'], ['2024-01', '2024-02', '2024-03'])
+        self.assertEqual(
+            dict(JournalEntry.objects.filter(description__startswith='Impor').values_list('description', 'period')),
+            {'Impor Jan': '2024-01', 'Impor Feb': '2024-02', 'Impor Mar': '2024-03', 'Impor Mei': '2024-05'},
+        )
+        self.assertEqual(
+            list(ClosingPeriod.objects.filter(is_closed=True).order_by('period').values_list('period', flat=True)),
+            result['closed'],
+        )
+        self.assertFalse(JournalEntry.objects.get(description='Impor Mei').is_posted)
+
+    def test_each_period_closed_with_its_own_profit(self):
+        self.import_csv()
+
+        retained = dict(
+            JournalItem.objects.filter(journal_entry__description__startswith='Automatic Retained')
+            .values_list('journal_entry__period', 'credit')
+        )
+        self.assertEqual(retained, {'2024-01': 100, '2024-02': 200, '2024-03': 300})
+
+        kas = self.accounts['1101'].id
+        self.assertEqual(opening_balances('2024-02')[kas], 100)
+        self.assertEqual(opening_balances('2024-05')[kas], 600)
+
+    def test_closing_current_period_keeps_imported_periods(self):
+        self.import_csv()
+        close_period('2024-05', user='test', open_next=False)
+
+        entry = JournalEntry.objects.get(description='Impor Mei')
+        self.assertEqual((entry.period, entry.is_posted), ('2024-05', True))
+        self.assertEqual(
+            list(
+                JournalEntry.objects.filter(description__startswith='Impor')
+                .order_by('date').values_list('period', flat=True)
+            ),
+            ['2024-01', '2024-02', '2024-03', '2024-05'],
+        )
+
+    def test_gap_between_imported_periods_is_closed(self):
+        csv_text = (
+            "No Jurnal,Tanggal,Deskripsi,COA,Debit,Kredit\n"
+            "J1,2024-01-10,Impor Jan,1101,100,0\n"
+            "J1,2024-01-10,Impor Jan,4101,0,100\n"
+            "J2,2024-03-10,Impor Mar,1101,300,0\n"
+            "J2,2024-03-10,Impor Mar,4101,0,300\n"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            result = import_journals(io.StringIO(csv_text))
+
+        self.assertEqual(result['closed'], ['2024-01', '2024-02', '2024-03'])
+        self.assertTrue(ClosingPeriod.objects.get(period='2024-02').is_closed)
+
+    def test_dry_run_writes_nothing(self):
+        result = self.import_csv(dry_run=True)
+
+        self.assertEqual(result['closed'], ['2024-01', '2024-02', '2024-03'])
+        self.assertFalse(JournalEntry.objects.exists())
+        self.assertFalse(ClosingPeriod.objects.filter(is_closed=True).exists())
+
+
+# ==========================================================
+# 🧾 VALIDASI POSTING JURNAL (user-011)
+# ==========================================================
+@override_settings(CACHES=LOCMEM_CACHES)
+class JournalPostingTests(LedgerTestCase):
+    def test_parse_amount(self):
+        self.assertEqual(parse_amount('1,500'), 1500)
+        self.assertEqual(parse_amount(' 20 '), 20)
+        self.assertEqual(parse_amount('2000.00'), 2000)
+        self.assertEqual(parse_amount(''), 0)
+        self.assertEqual(parse_amount(None), 0)
+        self.assertIsInstance(parse_amount('7'), int)
+
+        for value in ('abc', 'NaN', 'inf', '-Infinity', '12.5', '-1'):
+            with self.subTest(value=value), self.assertRaises(JournalPostingError):
+                parse_amount(value)
+
+    def test_post_journal_writes_balanced_lines(self):
+        ClosingPeriod.objects.create(period='2025-01')
+        kas, pendapatan = self.accounts['1101'], self.accounts['4101']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            entry = post_journal(date(2025, 1, 5), 'Setoran', [
+                {'account_id': str(kas.id), 'debit': '1,000', 'credit': ''},
+                {'account_id': str(pendapatan.id), 'debit': '', 'credit': '1000'},
+                {'account_id': '', 'debit': '', 'credit': ''},
+            ])
+
+        self.assertEqual(entry.period, '2025-01')
+        self.assertEqual(
+            sorted(entry.items.values_list('account_id', 'debit', 'credit')),
+            sorted([(kas.id, 1000, 0), (pendapatan.id, 0, 1000)]),
+        )
+
+    def test_post_journal_rejects_invalid_lines(self):
+        ClosingPeriod.objects.create(period='2025-01')
+        kas, pendapatan = self.accounts['1101'], self.accounts['4101']
+        invalid = {
+            'tidak seimbang': [
+                {'account_id': kas.id, 'debit': 1000},
+                {'account_id': pendapatan.id, 'credit': 900},
+            ],
+            'debit dan kredit': [
+                {'account_id': kas.id, 'debit': 100, 'credit': 100},
+            ],
+            'akun tidak ada': [
+                {'account_id': kas.id, 'debit': 100},
+                {'account_id': 999999, 'credit': 100},
+            ],
+            'pecahan': [
+                {'account_id': kas.id, 'debit': '0.5'},
+                {'account_id': pendapatan.id, 'credit': '0.5'},
+            ],
+            'kosong': [],
+        }
+        for reason, lines in invalid.items():
+            with self.subTest(reason), self.assertRaises(JournalPostingError):
+                post_journal(date(2025, 1, 5), reason, lines)
+
+        self.assertFalse(JournalEntry.objects.exists())
+        self.assertFalse(JournalItem.objects.exists())
+
+
+# ==========================================================
+# ✏️ EDIT JURNAL (user-012)
+# ==========================================================
+@override_settings(CACHES=LOCMEM_CACHES)
+class UpdateJournalTests(LedgerTestCase):
+    def setUp(self):
+        super().setUp()
+        a = self.accounts
+        ClosingPeriod.objects.create(period='2025-01')
+        self.entry = make_journal(
+            date(2025, 1, 5), '2025-01',
+            [(a['1101'], 1000, 0), (a['4101'], 0, 600), (a['4101'], 0, 400)],
+            description='Setoran',
+        )
+        self.entry = JournalEntry.objects.get(pk=self.entry.pk)
+        self.items = list(self.entry.items.order_by('id'))
+
+    def lines(self, *changes):
+        """Baris form dari item yang ada; changes: dict per item (None = item dihapus)."""
+        lines = []
+        for item, change in zip(self.items, changes or [{}] * len(self.items)):
+            if change is None:
+                continue
+            line = {'id': item.id, 'account': item.account, 'debit': item.debit, 'credit': item.credit, 'note': item.note}
+            line.update(change)
+            lines.append(line)
+        return lines
+
+    def item_writes(self, queries):
+        """Query tulis ke tabel JournalItem, dikelompokkan per jenis."""
+        table = JournalItem._meta.db_table
+        writes = {}
+        for query in queries:
+            sql = query['sql'].lstrip().upper()
+            verb = sql.split(None, 1)[0]
+            if verb in ('INSERT', 'UPDATE', 'DELETE') and table.upper() in sql:
+                writes[verb] = writes.get(verb, 0) + 1
+        return writes
+
+    def test_unchanged_items_keep_ids(self):
+        result = update_journal(self.entry, self.lines({}, {'credit': 500}, {'credit': 500}))
+
+        self.assertEqual(result, {'updated': 2, 'created': 0, 'deleted': 0})
+        self.assertEqual(
+            list(self.entry.items.order_by('id').values_list('id', 'credit')),
+            [(self.items[0].id, 0), (self.items[1].id, 500), (self.items[2].id, 500)],
+        )
+
+    def test_description_only_edit_writes_no_items(self):
+        with CaptureQueriesContext(connection) as queries:
+            result = update_journal(self.entry, self.lines(), description='Setoran kas')
+
+        self.assertEqual(result, {'updated': 0, 'created': 0, 'deleted': 0})
+        self.assertEqual(self.item_writes(queries), {})
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.description, 'Setoran kas')
+
+    def test_removed_rows_deleted_with_one_delete(self):
+        with CaptureQueriesContext(connection) as queries:
+            result = update_journal(self.entry, self.lines({'debit': 600}, {}, None))
+
+        self.assertEqual(result, {'updated': 1, 'created': 0, 'deleted': 1})
+        self.assertEqual(self.item_writes(queries), {'DELETE': 1, 'UPDATE': 1})
+        self.assertFalse(JournalItem.objects.filter(pk=self.items[2].pk).exists())
+
+    def test_new_rows_bulk_created(self):
+        beban = self.accounts['6101']
+        lines = self.lines() + [
+            {'account': beban, 'debit': 50, 'credit': 0},
+            {'account': self.accounts['1101'], 'debit': 0, 'credit': 50},
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            result = update_journal(self.entry, lines)
+
+        self.assertEqual(result, {'updated': 0, 'created': 2, 'deleted': 0})
+        self.assertEqual(self.item_writes(queries), {'INSERT': 1})
+        self.assertEqual(self.entry.items.count(), 5)
+
+    def test_unbalanced_edit_leaves_entry_unchanged(self):
+        before = list(self.entry.items.order_by('id').values_list('id', 'account_id', 'debit', 'credit'))
+
+        with self.assertRaises(JournalPostingError):
+            update_journal(self.entry, self.lines({'debit': 900}), description='Salah')
+
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.description, 'Setoran')
+        self.assertEqual(list(self.entry.items.order_by('id').values_list('id', 'account_id', 'debit', 'credit')), before)
+
+    def test_only_edited_scopes_invalidated(self):
+        a = self.accounts
+        ClosingPeriod.objects.create(period='2024-12')
+        make_journal(date(2024, 12, 5), '2024-12', [(a['1101'], 10, 0), (a['4101'], 0, 10)])
+        scopes = ['period:2025-01', 'year:2025', 'period:2024-12', 'year:2024', 'accounts', 'posting']
+        before = {scope: scope_generation(scope) for scope in scopes}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            update_journal(self.entry, self.lines({}, {'credit': 500}, {'credit': 500}))
+
+        changed = {scope for scope in scopes if scope_generation(scope) != before[scope]}
+        self.assertEqual(changed, {'period:2025-01', 'year:2025'})
+
+    def test_no_change_invalidates_nothing(self):
+        before = scope_generation('period:2025-01', 'year:2025')
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            update_journal(self.entry, self.lines())
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(scope_generation('period:2025-01', 'year:2025'), before)
+
+
+# ==========================================================
+# 🔒 TUTUP PERIODE (user-016)
+# ==========================================================
+@override_settings(CACHES=LOCMEM_CACHES)
+class ClosePeriodTests(LedgerTestCase):
+    def setUp(self):
+        super().setUp()
+        a = self.accounts
+        ClosingPeriod.objects.create(period='2025-01')
+        ClosingPeriod.objects.create(period='2025-02')
+
+        # pendapatan 1000, HPP 300, beban 200 → laba 500
+        make_journal(date(2025, 1, 5), '2025-01', [(a['1101'], 1000, 0), (a['4101'], 0, 1000)])
+        make_journal(date(2025, 1, 6), '2025-01', [(a['5001'], 300, 0), (a['1101'], 0, 300)], posted=False)
+        undated = make_journal(date(2025, 1, 7), '2025-01', [(a['6101'], 200, 0), (a['1101'], 0, 200)], posted=False)
+        # jurnal lama tanpa periode (save() selalu mengisi periode, jadi lewat update)
+        JournalEntry.objects.filter(pk=undated.pk).update(period=None)
+        self.later = make_journal(
+            date(2025, 2, 3), '2025-02', [(a['1101'], 700, 0), (a['4101'], 0, 700)], posted=False,
+        )
+
+    def test_profit_grouped_by_account_type(self):
+        result = close_period('2025-01', user='test', open_next=False)
+
+        self.assertEqual(result['profit'], {'INCOME': 1000, 'COGS': -300, 'EXPENSES': -200})
+        self.assertEqual(result['net_profit'], 500)
+        self.assertEqual(result['posted_count'], 2)
+
+    def test_retained_earnings_entry(self):
+        result = close_period('2025-01', user='test', open_next=False)
+
+        entry = result['retained_entry']
+        self.assertEqual((entry.date, entry.period, entry.is_posted), (date(2025, 1, 31), '2025-01', True))
+        self.assertEqual(
+            list(entry.items.values_list('account_id', 'debit', 'credit')),
+            [(self.accounts['3999'].id, 0, 500)],
+        )
+
+    def test_snapshot_written_and_period_closed(self):
+        close_period('2025-01', user='test', open_next=False)
+
+        period = ClosingPeriod.objects.get(period='2025-01')
+        self.assertEqual((period.is_closed, period.closed_by), (True, 'test'))
+        snapshot = dict(
+            AccountPeriodBalance.objects.filter(period='2025-01').values_list('account_id', 'closing_balance')
+        )
+        self.assertEqual(snapshot[self.accounts['1101'].id], 1000 - 300 - 200)
+        self.assertEqual(snapshot[self.accounts['3999'].id], -500)
+
+    def test_later_drafts_keep_their_period(self):
+        close_period('2025-01', user='test', open_next=False)
+
+        self.later.refresh_from_db()
+        self.assertEqual((self.later.period, self.later.is_posted), ('2025-02', False))
+        self.assertFalse(JournalEntry.objects.filter(period__isnull=True).exists())
+
+    def test_failure_rolls_back(self):
+        with mock.patch(
+            'apps.modules.ledger.services.closing.write_period_snapshot', side_effect=RuntimeError('gagal'),
+        ):
+            with self.assertRaises(RuntimeError):
+                close_period('2025-01', user='test')
+
+        self.assertFalse(ClosingPeriod.objects.get(period='2025-01').is_closed)
+        self.assertEqual(JournalEntry.objects.filter(is_posted=False).count(), 3)
+        self.assertFalse(JournalEntry.objects.filter(description__startswith='Automatic Retained').exists())
+        self.assertFalse(AccountPeriodBalance.objects.exists())
+
+    def test_closed_period_cannot_be_closed_again(self):
+        close_period('2025-01', user='test', open_next=False)
+
+        with self.assertRaises(PeriodClosingError):
+            close_period('2025-01', user='test')
+
+
+# ==========================================================
+# 📄 KEYSET PAGINATION (user-005 / user-020)
+# ==========================================================
+@override_settings(CACHES=LOCMEM_CACHES)
+class KeysetPaginationTests(LedgerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.kas, modal = self.accounts['1101'], self.accounts['3101']
+        ClosingPeriod.objects.create(period='2024-12', is_closed=True)
+        ClosingPeriod.objects.create(period='2025-01')
+        make_journal(date(2024, 12, 20), '2024-12', [(self.kas, 500, 0), (modal, 0, 500)])
+
+        # beberapa jurnal di tanggal yang sama: kursor harus memakai (tanggal, id)
+        self.entries = [
+            make_journal(date(2025, 1, day), '2025-01', [(self.kas, 10 * n, 0), (modal, 0, 10 * n)])
+            for n, day in enumerate([3, 3, 3, 5, 5, 9, 12], start=1)
+        ]
+
+    def page_through(self, url, params, key):
+        pages, cursor = [], {}
+        while True:
+            response = self.client.get(url, {**params, **cursor})
+            self.assertEqual(response.status_code, 200)
+            page, cursor = key(response)
+            pages.append(page)
+            if not cursor:
+                return pages
+
+    def test_journal_list_rows_visits_every_entry_once(self):
+        url = reverse('ledger:journal_list_rows')
+        pages = self.page_through(
+            url, {'period': '2025-01', 'limit': 2},
+            lambda r: ([journal.id for journal in r.context['journals']], r.context['next_cursor']),
+        )
+
+        seen = [entry_id for page in pages for entry_id in page]
+        expected = [
+            entry.id for entry in sorted(self.entries, key=lambda e: (e.date, e.id), reverse=True)
+        ]
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(pages), 4)
+
+    def test_journal_list_rows_requires_full_cursor(self):
+        url = reverse('ledger:journal_list_rows')
+        for params in ({'after_date': '2025-01-05'}, {'after_id': self.entries[3].id}, {'after_date': 'x', 'after_id': 1}):
+            with self.subTest(params=params):
+                response = self.client.get(url, {'period': '2025-01', **params})
+                self.assertEqual(response.status_code, 400)
+
+    def test_account_lines_running_balance_across_pages(self):
+        url = reverse('ledger:ledger_account_lines', args=[self.kas.id])
+        pages = self.page_through(
+            url, {'period': '2025-01', 'limit': 3},
+            lambda r: (r.json()['rows'], r.json()['next_cursor']),
+        )
+
+        rows = [row for page in pages for row in page]
+        self.assertEqual(len(rows), len(self.entries))
+        self.assertEqual(pages[0][0]['balance'], 500 + 10)
+        self.assertEqual(rows[-1]['balance'], 500 + sum(10 * n for n in range(1, 8)))
+        self.assertEqual([row['balance'] for row in rows], sorted(row['balance'] for row in rows))
+
+    def test_account_lines_validates_cursor_and_limit(self):
+        url = reverse('ledger:ledger_account_lines', args=[self.kas.id])
+        self.assertEqual(self.client.get(url, {'period': '2025-01', 'after_date': '2025-01-03'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'period': '2025-01', 'after_id': 1}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'period': '2025-01', 'limit': 'x'}).status_code, 400)
+
+        # limit <= 0 dibatasi menjadi 1 baris
+        response = self.client.get(url, {'period': '2025-01', 'limit': 0})
+        self.assertEqual(len(response.json()['rows']), 1)
+
+    def test_account_lines_year_mode_defaults_year(self):
+        url = reverse('ledger:ledger_account_lines', args=[self.kas.id])
+        response = self.client.get(url, {'mode': 'year', 'limit': 50})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['rows']), len(self.entries))
+
+
+# ==========================================================
+# ♻️ INVALIDASI CACHE (user-008 / user-021 / user-024)
+# ==========================================================
+@override_settings(CACHES=LOCMEM_CACHES)
+class ReportCacheTests(LedgerTestCase):
+    def setUp(self):
+        super().setUp()
+        ClosingPeriod.objects.create(period='2025-01')
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        return {'build': self.builds}
+
+    def report(self, period='2025-01'):
+        return cached_report('test', 'period', period=period, build=self.build)
+
+    def test_cached_until_journal_in_scope_changes(self):
+        kas, modal = self.accounts['1101'], self.accounts['3101']
+        self.assertEqual(self.report(), {'build': 1})
+        self.assertEqual(self.report(), {'build': 1})
+
+        entry = make_journal(date(2025, 1, 2), '2025-01', [(kas, 100, 0), (modal, 0, 100)])
+        self.assertEqual(self.report(), {'build': 2})
+
+        JournalItem.objects.create(journal_entry=entry, account=kas, debit=10)
+        self.assertEqual(self.report(), {'build': 3})
+
+        # jurnal periode lain tidak membuat cache periode ini basi
+        self.report('2025-02')
+        make_journal(date(2025, 2, 2), '2025-02', [(kas, 100, 0), (modal, 0, 100)])
+        self.assertEqual(self.report(), {'build': 3})
+
+    def test_moving_entry_invalidates_old_period(self):
+        kas, modal = self.accounts['1101'], self.accounts['3101']
+        entry = make_journal(date(2025, 1, 2), '2025-01', [(kas, 100, 0), (modal, 0, 100)])
+        self.assertEqual(self.report(), {'build': 1})
+
+        entry = JournalEntry.objects.get(pk=entry.pk)
+        entry.period, entry.date = '2025-02', date(2025, 2, 2)
+        entry.save()
+        self.assertEqual(self.report(), {'build': 2})
+
+    def test_post_journal_invalidates_on_commit(self):
+        kas, pendapatan = self.accounts['1101'], self.accounts['4101']
+        self.report()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post_journal(date(2025, 1, 5), 'Setoran', [
+                {'account': kas, 'debit': 100},
+                {'account': pendapatan, 'credit': 100},
+            ])
+        self.assertEqual(self.report(), {'build': 2})
+
+    def test_balance_sheet_reflects_new_items(self):
+        kas, modal = self.accounts['1101'], self.accounts['3101']
+        url = reverse('ledger:balance_sheet')
+        entry = make_journal(date(2025, 1, 2), '2025-01', [(kas, 100, 0), (modal, 0, 100)])
+        self.assertEqual(self.client.get(url, {'period': '2025-01'}).context['total_assets'], 100)
+
+        JournalItem.objects.create(journal_entry=entry, account=kas, debit=50)
+        JournalItem.objects.create(journal_entry=entry, account=modal, credit=50)
+        self.assertEqual(self.client.get(url, {'period': '2025-01'}).context['total_assets'], 150)
+
+    def test_period_registry_follows_closing_period_changes(self):
+        # registry berlaku per request: dimuat sekali, dibuang saat ClosingPeriod berubah
+        period_status.begin_request()
+        self.addCleanup(period_status.end_request)
+
+        registry = period_registry()
+        self.assertIs(period_registry(), registry)
+        self.assertFalse(registry.is_closed('2025-01'))
+
+        close_period('2025-01', user='test')
+        self.assertIsNot(period_registry(), registry)
+        self.assertTrue(period_registry().is_closed('2025-01'))
+        self.assertEqual(period_registry().latest_open(), '2025-02')
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class OpenPeriodCacheTests(TransactionTestCase):
+    # di luar transaksi test: periode open baru disimpan ke cache & memori proses di autocommit
+    def setUp(self):
+        cache.clear()
+        period_status.invalidate_period_status()
+        ClosingPeriod.objects.create(period='2025-01', is_closed=True)
+        ClosingPeriod.objects.create(period='2025-02')
+
+    def test_open_period_served_from_memory(self):
+        self.assertEqual(period_status.open_period(), '2025-02')
+        with self.assertNumQueries(0):
+            self.assertEqual(period_status.open_period(), '2025-02')
+
+    def test_stale_local_value_dropped_when_generation_changes(self):
+        self.assertEqual(period_status.open_period(), '2025-02')
+        generation = period_status.open_period_generation()
+
+        # proses lain menutup periode: status berubah tanpa signal di proses ini,
+        # lalu generasi di cache dinaikkan
+        ClosingPeriod.objects.filter(period='2025-02').update(is_closed=True)
+        ClosingPeriod.objects.bulk_create([ClosingPeriod(period='2025-03')])
+        self.assertEqual(period_status.open_period(), '2025-02')
+
+        period_status.bump_open_period_generation()
+        cache.delete_many([period_status.PERIOD_STATUS_KEY, period_status.OPEN_PERIOD_KEY])
+        self.assertNotEqual(period_status.open_period_generation(), generation)
+        self.assertEqual(period_status.open_period(), '2025-03')
+
+    def test_close_period_refreshes_open_period(self):
+        self.assertEqual(period_status.open_period(), '2025-02')
+
+        close_period('2025-02', user='test')
+        self.assertEqual(period_status.open_period(), '2025-03')
+
+        entry = JournalEntry(date=date(2025, 3, 1), description='Tanpa periode')
+        entry.save()
+        self.assertEqual(entry.period, '2025-03')
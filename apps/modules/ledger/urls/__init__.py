@@ -6,6 +6,8 @@ urlpatterns = [
     path('', include('apps.modules.ledger.urls.index')),
     path('report/', include('apps.modules.ledger.urls.ledger_report')),
     path('report/', include('apps.modules.ledger.urls.profit_loss')),
+    path('report/', include('apps.modules.ledger.urls.comparative')),
+    path('report/', include('apps.modules.ledger.urls.export')),
     path('journal/', include('apps.modules.ledger.urls.journal_entry')),
     path('journal/', include('apps.modules.ledger.urls.journal_edit')),
     path('accounts/', include('apps.modules.ledger.urls.balance_sheet')),
@@ -1,7 +1,8 @@
 from django.urls import path
-from apps.modules.ledger.views import account_list, account_create
+from apps.modules.ledger.views import account_chart, account_list, account_create
 
 urlpatterns = [
     path('accounts/', account_list, name='account_list'),  # ✅ BENAR
     path('accounts/new/', account_create, name='account_create'),  # ✅ BENAR
+    path('accounts/chart.json', account_chart, name='account_chart'),  # COA JSON untuk picker akun
 ]
@@ -0,0 +1,6 @@
+from django.urls import path
+from apps.modules.ledger.views.comparative import comparative_report
+
+urlpatterns = [
+    path('report/comparative/', comparative_report, name='comparative_report'),  # tren akun x periode
+]
@@ -0,0 +1,6 @@
+from django.urls import path
+from apps.modules.ledger.views.export import export_report
+
+urlpatterns = [
+    path('report/export/<slug:dataset>/', export_report, name='export_report'),  # unduh CSV / XLSX
+]
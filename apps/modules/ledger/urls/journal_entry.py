@@ -1,7 +1,10 @@
 from django.urls import path
-from apps.modules.ledger.views import create_journal_entry, journal_list
+from apps.modules.ledger.views import create_journal_entry, journal_list, journal_list_rows
+from apps.modules.ledger.views.journal_import import journal_import
 
 urlpatterns = [
     path('journal/create/', create_journal_entry, name='create_journal_entry'),
     path('journal/list', journal_list, name='journal_list'),
+    path('journal/list/rows/', journal_list_rows, name='journal_list_rows'),  # baris jurnal per periode (keyset)
+    path('journal/import/', journal_import, name='journal_import'),
 ]
@@ -1,6 +1,7 @@
 from django.urls import path
-from apps.modules.ledger.views.ledger_report import ledger_report
+from apps.modules.ledger.views.ledger_report import ledger_report, ledger_account_lines
 from apps.modules.ledger.views.profit_loss import profit_and_loss_report
 urlpatterns = [
     path('report/', ledger_report, name='ledger_report'),  # /report/ --> laporan buku besar
+    path('report/account/<int:account_id>/lines/', ledger_account_lines, name='ledger_account_lines'),  # drill-down per akun
 ]
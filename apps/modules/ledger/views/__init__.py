@@ -1,6 +1,6 @@
 # Ini agar views bisa diimpor dari ledger.views langsung (opsional)
 from .index import index
-from .journal_entry import create_journal_entry, journal_list
-from .account import account_create, account_list
+from .journal_entry import create_journal_entry, journal_list, journal_list_rows
+from .account import account_chart, account_create, account_list
 from .profit_loss import profit_and_loss_report
 from .closing_period import close_period, closing_period_list
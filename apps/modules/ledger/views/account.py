@@ -1,6 +1,14 @@
+from django.http import HttpResponse, HttpResponseNotModified
 from django.shortcuts import render, redirect
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
 from apps.modules.ledger.models import Account
 from apps.modules.ledger.forms import AccountForm
+from apps.modules.ledger.services import coa_json, coa_version
+
+# URL ber-?v=<versi> tidak pernah berubah isinya, boleh disimpan browser selama ini (detik)
+COA_MAX_AGE = 60 * 60 * 24 * 365
 
 def account_list(request):
     accounts = Account.objects.all()
@@ -15,3 +23,35 @@ def account_create(request):
     else:
         form = AccountForm()
     return render(request, 'ledger/account_form.html', {'form': form})
+
+
+def account_chart_url():
+    """URL JSON COA dengan versi saat ini (untuk picker akun di form jurnal)."""
+    version = coa_version()
+    url = reverse('ledger:account_chart')
+    return f'{url}?v={version}' if version else url
+
+
+def account_chart(request):
+    """
+    Semua akun sebagai JSON ringkas untuk picker akun di form jurnal.
+
+    - ETag = versi COA (naik setiap Account disimpan / dihapus) → 304 jika sama
+    - ?v=<versi saat ini> → Cache-Control immutable, browser tidak bertanya lagi
+    - tanpa / versi lama → no-cache, browser revalidasi dengan ETag
+    """
+    version = coa_version()
+    etag = f'"coa-{version}"' if version else None
+
+    if etag and etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(coa_json(version), content_type='application/json')
+
+    if etag:
+        response['ETag'] = etag
+    if version and request.GET.get('v') == str(version):
+        patch_cache_control(response, private=True, max_age=COA_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -1,6 +1,5 @@
 from django.shortcuts import render
-from django.db.models import Sum
-from apps.modules.ledger.models import Account, JournalItem, ClosingPeriod
+from apps.modules.ledger.services import TrialBalance, account_totals, balance_from_totals, cached_report, period_registry
 
 
 # ==============================
@@ -12,21 +11,8 @@ def calculate_balance(account, period=None, year=None):
     - per periode (YYYY-MM)
     - atau per tahun (YYYY)
     """
-
-    items = JournalItem.objects.filter(account=account, journal_entry__is_posted=True)
-
-    if year:
-        items = items.filter(journal_entry__date__year=year)
-    elif period:
-        items = items.filter(journal_entry__period=period)
-
-    debit_total = items.aggregate(total=Sum('debit'))['total'] or 0
-    credit_total = items.aggregate(total=Sum('credit'))['total'] or 0
-
-    if account.balance_type == 'Debit':
-        return debit_total - credit_total
-    else:
-        return credit_total - debit_total
+    totals = account_totals(period=period, year=year, accounts=[account])
+    return balance_from_totals(account, totals)
 
 
 # ==============================
@@ -44,57 +30,45 @@ def balance_sheet_view(request):
     # ==========================
     # DATA PERIODE
     # ==========================
-    periods = ClosingPeriod.objects.all().order_by('-period')
+    periods = period_registry().periods()
 
     if mode == 'period':
-        if not selected_period and periods.exists():
-            selected_period = periods.first().period
-
-    # ==========================
-    # AKUN
-    # ==========================
-    asset_accounts = Account.objects.filter(account_type='ASSET', active=True)
-    liability_accounts = Account.objects.filter(account_type='LIABILITY', active=True)
-    equity_accounts = Account.objects.filter(account_type='CAPITAL', active=True)
-
-    assets, liabilities, equities = [], [], []
-    total_assets = total_liabilities = total_equities = 0
-
-    # ==========================
-    # HITUNG ASSET
-    # ==========================
-    for acc in asset_accounts:
-        balance = calculate_balance(
-            acc,
+        if not selected_period and periods:
+            selected_period = periods[0].period
+
+    # data laporan, dihitung hanya saat cache miss
+    def build():
+        # ==========================
+        # NERACA SALDO (1 QUERY, DIPAKAI BERSAMA)
+        # ==========================
+        trial_balance = TrialBalance.for_request(
+            request,
             period=selected_period if mode == 'period' else None,
-            year=selected_year if mode == 'year' else None
+            year=selected_year if mode == 'year' else None,
         )
-        assets.append({'account': acc, 'balance': balance})
-        total_assets += balance
 
-    # ==========================
-    # HITUNG LIABILITY
-    # ==========================
-    for acc in liability_accounts:
-        balance = calculate_balance(
-            acc,
-            period=selected_period if mode == 'period' else None,
-            year=selected_year if mode == 'year' else None
-        )
-        liabilities.append({'account': acc, 'balance': balance})
-        total_liabilities += balance
+        assets = trial_balance.rows('ASSET')
+        liabilities = trial_balance.rows('LIABILITY')
+        equities = trial_balance.rows('CAPITAL')
+
+        total_assets = sum(row['balance'] for row in assets)
+        total_liabilities = sum(row['balance'] for row in liabilities)
+        total_equities = sum(row['balance'] for row in equities)
+
+        return {
+            'assets': assets,
+            'liabilities': liabilities,
+            'equities': equities,
+            'total_assets': total_assets,
+            'total_liabilities': total_liabilities,
+            'total_equities': total_equities,
+            'total_liabilities_equities': total_liabilities + total_equities,
+        }
 
     # ==========================
-    # HITUNG EQUITY
+    # HASIL (CACHE PER MODE & PERIODE/TAHUN)
     # ==========================
-    for acc in equity_accounts:
-        balance = calculate_balance(
-            acc,
-            period=selected_period if mode == 'period' else None,
-            year=selected_year if mode == 'year' else None
-        )
-        equities.append({'account': acc, 'balance': balance})
-        total_equities += balance
+    report = cached_report('balance_sheet', mode, selected_period, selected_year, build)
 
     # ==========================
     # CONTEXT
@@ -104,13 +78,7 @@ def balance_sheet_view(request):
         'periods': periods,
         'selected_period': selected_period,
         'selected_year': selected_year,
-        'assets': assets,
-        'liabilities': liabilities,
-        'equities': equities,
-        'total_assets': total_assets,
-        'total_liabilities': total_liabilities,
-        'total_equities': total_equities,
-        'total_liabilities_equities': total_liabilities + total_equities,
+        **report,
     }
 
     return render(request, 'ledger/balance_sheet.html', context)
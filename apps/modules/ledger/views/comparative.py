@@ -0,0 +1,63 @@
+from datetime import datetime
+
+from dateutil.relativedelta import relativedelta
+from django.shortcuts import render
+
+from apps.modules.ledger.services import (
+    MAX_COMPARATIVE_PERIODS,
+    ComparativeReport,
+    open_period,
+    period_range,
+    period_registry,
+)
+
+# Jumlah bulan default (periode akhir ke belakang)
+DEFAULT_COMPARATIVE_MONTHS = 12
+
+
+def comparative_report(request):
+    """
+    Laporan perbandingan bulanan (akun x periode):
+    laba rugi, neraca dan rasio untuk `start` s/d `end` (YYYY-MM),
+    maksimal MAX_COMPARATIVE_PERIODS periode, dari satu query GROUP BY.
+    """
+    end = request.GET.get('end')
+    start = request.GET.get('start')
+
+    # ===============================
+    # DEFAULT: 12 bulan s/d periode closed terakhir
+    # ===============================
+    if not end:
+        end = period_registry().latest_closed() or open_period()
+
+    context = {
+        'start': start,
+        'end': end,
+        'max_periods': MAX_COMPARATIVE_PERIODS,
+    }
+
+    try:
+        if not start:
+            end_date = datetime.strptime(end, '%Y-%m').date()
+            start = (end_date - relativedelta(months=DEFAULT_COMPARATIVE_MONTHS - 1)).strftime('%Y-%m')
+            context['start'] = start
+        periods = period_range(start, end)
+    except ValueError:
+        context['error'] = "Format periode tidak valid. Gunakan YYYY-MM."
+        return render(request, 'ledger/comparative.html', context)
+
+    if not periods:
+        context['error'] = "Periode awal harus sebelum periode akhir."
+        return render(request, 'ledger/comparative.html', context)
+    if len(periods) > MAX_COMPARATIVE_PERIODS:
+        context['error'] = f"Maksimal {MAX_COMPARATIVE_PERIODS} periode dalam satu laporan."
+        return render(request, 'ledger/comparative.html', context)
+
+    report = ComparativeReport(periods)
+    context.update({
+        'periods': periods,
+        'profit_loss': report.profit_loss(),
+        'balance_sheet': report.balance_sheet(),
+        'ratios': report.ratios(),
+    })
+    return render(request, 'ledger/comparative.html', context)
@@ -0,0 +1,25 @@
+from django.http import Http404, HttpResponseBadRequest
+
+from apps.modules.ledger.services import LEDGER_EXPORTS, ExportError, export_response
+
+
+def export_report(request, dataset):
+    """
+    Unduh laporan sebagai CSV / XLSX (streaming, memori tetap).
+
+    dataset: ledger | journals | trial-balance
+    GET: format=csv|xlsx, mode=period|year, period (YYYY-MM), year (YYYY)
+    """
+    build = LEDGER_EXPORTS.get(dataset)
+    if build is None:
+        raise Http404("Dataset ekspor tidak dikenal.")
+
+    export = build(
+        mode=request.GET.get('mode', 'period'),
+        period=request.GET.get('period') or None,
+        year=request.GET.get('year') or None,
+    )
+    try:
+        return export_response(export, request.GET.get('format', 'csv'))
+    except ExportError as e:
+        return HttpResponseBadRequest(str(e))
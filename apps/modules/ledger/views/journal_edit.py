@@ -1,51 +1,44 @@
+from django.contrib import messages
 from django.shortcuts import render, get_object_or_404, redirect
-from apps.modules.ledger.models import JournalEntry, JournalItem, Account
+from apps.modules.ledger.models import JournalEntry, JournalItem
+from apps.modules.ledger.services import update_journal
+from apps.modules.ledger.views.account import account_chart_url
 
 def journal_edit(request, pk):
     journal = get_object_or_404(JournalEntry, pk=pk)
 
-    # GANTI ini:
-    # journal_items = journal.items.all()
-    # DENGAN:
-    journal_items = JournalItem.objects.filter(journal_entry=journal)
+    journal_items = JournalItem.objects.filter(journal_entry=journal).select_related('account').order_by('id')
 
     if request.method == 'POST':
-        description = request.POST.get('description')
-        is_posted = request.POST.get('post') == '1'
-
-        journal.description = description
-        journal.is_posted = is_posted
-        journal.save()
-
-        # Hapus semua item
-        journal.items.all().delete()
-
-        # Ambil ulang data form
-        account_ids = request.POST.getlist('account_id[]')
-        debits = request.POST.getlist('debit[]')
-        credits = request.POST.getlist('credit[]')
-        notes = request.POST.getlist('note[]')
-
-
-        for account_id, debit, credit, note in zip(account_ids, debits, credits, notes):
-            if not account_id.strip():
-                continue
-
-            account = get_object_or_404(Account, pk=account_id)
-            JournalItem.objects.create(
-                journal_entry=journal,
-                account=account,
-                debit=debit or 0,
-                credit=credit or 0,
-                note=note or ''
+        lines = [
+            {'id': item_id, 'account_id': account_id, 'debit': debit, 'credit': credit, 'note': note}
+            for item_id, account_id, debit, credit, note in zip(
+                request.POST.getlist('item_id[]'),
+                request.POST.getlist('account_id[]'),
+                request.POST.getlist('debit[]'),
+                request.POST.getlist('credit[]'),
+                request.POST.getlist('note[]'),
             )
+        ]
+
+        # Hanya baris yang berubah yang ditulis ulang (bukan hapus semua lalu buat lagi)
+        try:
+            update_journal(
+                journal,
+                lines,
+                description=request.POST.get('description'),
+                is_posted=request.POST.get('post') == '1',
+            )
+        except ValueError as e:
+            messages.error(request, str(e))
+            return redirect('ledger:journal_edit', pk=journal.pk)
 
         return redirect('ledger:journal_list')
 
     return render(request, 'ledger/journal_edit.html', {
         'journal': journal,
         'journal_items': journal_items,
-        'accounts': Account.objects.all()
+        'account_chart_url': account_chart_url(),
     })
 
 
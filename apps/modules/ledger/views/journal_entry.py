@@ -1,11 +1,21 @@
 import json
 
-from django.shortcuts import get_object_or_404, render, redirect
-from apps.modules.ledger.models import JournalEntry, JournalItem, Account, ClosingPeriod
+from django.db.models import Count, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.http import HttpResponseBadRequest
+from django.shortcuts import render, redirect
+from apps.modules.ledger.models import JournalEntry
+from apps.modules.ledger.services import post_journal
+from apps.modules.ledger.views.account import account_chart_url
 from django.utils.timezone import now
 from datetime import datetime
 from django.contrib import messages
 
+# Jumlah jurnal per halaman di daftar jurnal (per periode)
+JOURNAL_PAGE_SIZE = 50
+JOURNAL_MAX_PAGE_SIZE = 500
+
+
 def create_journal_entry(request):
     if request.method == 'POST':
         try:
@@ -14,38 +24,26 @@ def create_journal_entry(request):
             description = request.POST.get('description', '').strip()
             report_id = request.POST.get('report_id')
 
-            # Ambil periode open saat ini
-            open_period = ClosingPeriod.get_open_period()
-            period_now = open_period.period
+            lines = [
+                {'account_id': account_id, 'debit': debit, 'credit': credit, 'note': note}
+                for account_id, debit, credit, note in zip(
+                    request.POST.getlist('account_id[]'),
+                    request.POST.getlist('debit[]'),
+                    request.POST.getlist('credit[]'),
+                    request.POST.getlist('note[]'),
+                )
+            ]
 
-            # Buat jurnal baru (akan otomatis pakai periode open saat ini)
-            journal = JournalEntry.objects.create(date=date, description=description)
+            # Validasi + simpan semua baris sekaligus (jurnal otomatis pakai periode open saat ini)
+            journal = post_journal(date, description, lines)
 
             # Jika user input tanggal beda bulan dari periode open, beri warning
             date_period = date.strftime("%Y-%m")
-            if date_period != period_now:
+            if date_period != journal.period:
                 messages.warning(
                     request,
-                    f"Tanggal jurnal {date_period} berbeda dari periode open ({period_now}). "
-                    f"Transaksi dimasukkan ke periode {period_now}."
-                )
-
-            accounts = request.POST.getlist('account_id[]')
-            debits = request.POST.getlist('debit[]')
-            credits = request.POST.getlist('credit[]')
-            notes = request.POST.getlist('note[]')
-
-            for account_id, debit, credit, note in zip(accounts, debits, credits, notes):
-                if not account_id.strip():
-                    continue
-
-                account = get_object_or_404(Account, pk=account_id)
-                JournalItem.objects.create(
-                    journal_entry=journal,
-                    account=account,
-                    debit=float(debit or 0),
-                    credit=float(credit or 0),
-                    note=note or ''
+                    f"Tanggal jurnal {date_period} berbeda dari periode open ({journal.period}). "
+                    f"Transaksi dimasukkan ke periode {journal.period}."
                 )
 
             messages.success(request, f"Jurnal berhasil dibuat untuk periode {journal.period}.")
@@ -55,7 +53,7 @@ def create_journal_entry(request):
 
         except ValueError as e:
             messages.error(request, str(e))
-            return redirect('journal_list')
+            return redirect('ledger:create_journal_entry')
 
     prefill = request.session.pop('journal_prefill', None)
     prefill_entries = prefill.get('entries', []) if prefill else []
@@ -66,7 +64,7 @@ def create_journal_entry(request):
 
     context = {
         'today': now().date().strftime('%Y-%m-%d'),
-        'accounts': Account.objects.all(),
+        'account_chart_url': account_chart_url(),
         'prefill_entries_json': prefill_entries_json,
         'prefill_date': prefill_date,
         'prefill_description': prefill_description,
@@ -76,20 +74,97 @@ def create_journal_entry(request):
     return render(request, 'ledger/journal_entry.html', context)
 
 
-def journal_list(request):
-    # Ambil semua jurnal, urutkan berdasarkan periode dan tanggal
-    journals = (
-        JournalEntry.objects
-        .order_by('-period', '-date', '-id')
-        .prefetch_related('items', 'items__account')
+# ===============================
+# DAFTAR JURNAL PER PERIODE
+# ===============================
+def journal_period_summaries():
+    """
+    Header tiap periode: jumlah jurnal, jumlah posted, total debit & kredit,
+    dari satu query GROUP BY period (LEFT JOIN item).
+    """
+    rows = (
+        JournalEntry.objects.order_by()
+        .values('period')
+        .annotate(
+            entries=Count('id', distinct=True),
+            posted=Count('id', filter=Q(is_posted=True), distinct=True),
+            debit=Coalesce(Sum('items__debit'), Value(0)),
+            credit=Coalesce(Sum('items__credit'), Value(0)),
+        )
     )
+    summaries = [dict(row, period=row['period'] or '') for row in rows]
+    # periode terbaru di atas, jurnal tanpa periode paling bawah
+    summaries.sort(key=lambda row: row['period'], reverse=True)
+    return summaries
+
+
+def journal_page(period, after_date=None, after_id=None, limit=JOURNAL_PAGE_SIZE):
+    """
+    Satu halaman jurnal dalam satu periode, keyset pada (period, date, id)
+    menurun: halaman berikutnya = baris sebelum (after_date, after_id).
+    Return: (jurnal beserta total debit, cursor berikutnya / None).
+    """
+    entries = JournalEntry.objects.filter(
+        Q(period=period) if period else Q(period__isnull=True) | Q(period='')
+    )
+    if after_date:
+        entries = entries.filter(Q(date__lt=after_date) | Q(date=after_date, id__lt=after_id))
+
+    journals = list(
+        entries.annotate(total=Coalesce(Sum('items__debit'), Value(0)))
+        .order_by('-date', '-id')[:limit + 1]
+    )
+    next_cursor = None
+    if len(journals) > limit:
+        journals = journals[:limit]
+        next_cursor = {'after_date': journals[-1].date.isoformat(), 'after_id': journals[-1].id}
+    return journals, next_cursor
 
-    # Kelompokkan berdasarkan periode
-    grouped_journals = {}
-    for j in journals:
-        grouped_journals.setdefault(j.period or 'Tanpa Periode', []).append(j)
+
+def journal_list(request):
+    """
+    Daftar jurnal per periode: header (ringkasan) semua periode dari satu
+    query agregat, baris jurnal dimuat per periode saat header dibuka.
+    Periode terbaru langsung dirender halaman pertamanya.
+    """
+    summaries = journal_period_summaries()
+
+    first_page = None
+    if summaries:
+        journals, next_cursor = journal_page(summaries[0]['period'])
+        first_page = {'journals': journals, 'next_cursor': next_cursor, 'period': summaries[0]['period']}
 
     context = {
-        'grouped_journals': grouped_journals
+        'summaries': summaries,
+        'first_page': first_page,
     }
-    return render(request, 'ledger/journal_list.html', context)
\ No newline at end of file
+    return render(request, 'ledger/journal_list.html', context)
+
+
+def journal_list_rows(request):
+    """
+    Potongan <tr> jurnal satu periode (keyset pagination).
+    GET: period ('' = tanpa periode), after_date (YYYY-MM-DD), after_id, limit
+    """
+    period = request.GET.get('period', '')
+    after_date = request.GET.get('after_date')
+    after_id = request.GET.get('after_id')
+
+    # kursor (after_date, after_id) harus lengkap, tanpa id baris di tanggal kursor bisa terlewat / berulang
+    if bool(after_date) != bool(after_id):
+        return HttpResponseBadRequest("after_date dan after_id harus dikirim bersama")
+
+    try:
+        limit = max(1, min(int(request.GET.get('limit', JOURNAL_PAGE_SIZE)), JOURNAL_MAX_PAGE_SIZE))
+        if after_date:
+            after_date = datetime.strptime(after_date, '%Y-%m-%d').date()
+            after_id = int(after_id)
+    except ValueError:
+        return HttpResponseBadRequest("Parameter tidak valid")
+
+    journals, next_cursor = journal_page(period, after_date, after_id, limit)
+    return render(request, 'ledger/partials/journal_rows.html', {
+        'period': period,
+        'journals': journals,
+        'next_cursor': next_cursor,
+    })
@@ -0,0 +1,55 @@
+import io
+
+from django.contrib import messages
+from django.shortcuts import redirect, render
+
+from apps.modules.ledger.services import JournalImportError, import_journals
+
+# Jumlah kesalahan per baris yang ditampilkan di halaman
+IMPORT_ERRORS_SHOWN = 200
+
+
+def journal_import(request):
+    """Unggah CSV jurnal historis; semua baris divalidasi dulu, simpan semua atau tidak sama sekali."""
+    context = {'errors': [], 'dry_run': False}
+
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        dry_run = request.POST.get('dry_run') == '1'
+        context['dry_run'] = dry_run
+
+        if upload is None:
+            messages.error(request, "Pilih file CSV terlebih dahulu.")
+            return redirect('ledger:journal_import')
+
+        try:
+            stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+            result = import_journals(
+                stream,
+                dry_run=dry_run,
+            )
+        except UnicodeDecodeError:
+            messages.error(request, "File harus berformat UTF-8.")
+            return redirect('ledger:journal_import')
+        except JournalImportError as e:
+            messages.error(request, str(e))
+            context['errors'] = e.errors[:IMPORT_ERRORS_SHOWN]
+            context['hidden_errors'] = max(len(e.errors) - IMPORT_ERRORS_SHOWN, 0)
+            return render(request, 'ledger/journal_import.html', context)
+
+        closed = f"{result['closed'][0]} s/d {result['closed'][-1]}" if result['closed'] else None
+
+        if dry_run:
+            message = f"File valid: {result['journals']} jurnal / {result['lines']} baris siap diimpor."
+            if closed:
+                message += f" Periode {closed} akan ditutup."
+            messages.info(request, message)
+            return render(request, 'ledger/journal_import.html', context)
+
+        message = f"{result['journals']} jurnal / {result['lines']} baris berhasil diimpor."
+        if closed:
+            message += f" Periode {closed} ditutup."
+        messages.success(request, message)
+        return redirect('ledger:journal_list')
+
+    return render(request, 'ledger/journal_import.html', context)
@@ -1,16 +1,136 @@
-from django.shortcuts import render
+from datetime import datetime
+
+from django.shortcuts import render, get_object_or_404
+from django.http import JsonResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
 from django.contrib.humanize.templatetags.humanize import intcomma
-from django.db.models import Sum, F, Value
+from django.db.models import Sum, F, Q, Value
 from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.modules.ledger.models import Account
+from apps.modules.ledger.services import (
+    LINE_FIELDS,
+    account_totals,
+    ledger_opening_balances,
+    period_registry,
+    running_balance_lines,
+    scoped_items,
+)
+
+# Jumlah baris JournalItem yang diambil per round-trip saat iterasi
+ITEM_CHUNK_SIZE = 2000
+
+# Ukuran halaman drill-down transaksi per akun
+LINES_PAGE_SIZE = 50
+LINES_MAX_PAGE_SIZE = 500
+
+
+def default_scope(mode, selected_period=None, selected_year=None):
+    """
+    Lengkapi periode / tahun yang tidak dipilih: periode open terbaru,
+    tahun dari periode itu (atau tahun berjalan). Tanpa ini mode=year
+    tanpa year menghitung seluruh riwayat.
+    """
+    latest_open = period_registry().latest_open()
+    if mode == 'year':
+        if not selected_year:
+            selected_year = latest_open[:4] if latest_open else str(timezone.now().year)
+    elif not selected_period:
+        selected_period = latest_open
+    return selected_period, selected_year
+
+
+# ===============================
+# RINGKASAN SALDO PER AKUN
+# ===============================
+def ledger_summary_rows(mode, selected_period=None, selected_year=None):
+    """
+    Saldo awal, mutasi debit/kredit dan saldo akhir semua akun,
+    dari satu lookup saldo awal + satu query GROUP BY account_id.
+    """
+    accounts = Account.objects.all().order_by('account_name', 'id')
+    openings = ledger_opening_balances(mode, selected_period, selected_year)
+    totals = account_totals(
+        period=selected_period if mode != 'year' else None,
+        year=selected_year if mode == 'year' else None,
+    ) if (selected_period or selected_year) else {}
+
+    rows = []
+    for account in accounts:
+        opening = openings.get(account.id, 0)
+        debit, credit = totals.get(account.id, (0, 0))
+        rows.append({
+            'account': account,
+            'opening_balance': opening,
+            'debit': debit,
+            'credit': credit,
+            'closing_balance': opening + debit - credit,
+            'has_lines': account.id in totals,
+        })
+    return rows
+
+
+# ===============================
+# SECTION BUKU BESAR PER AKUN
+# ===============================
+def iter_ledger_sections(mode, selected_period=None, selected_year=None):
+    """
+    Generator satu section (dict) per akun, urut nama akun.
+
+    Semua transaksi diambil dalam satu query berurutan (akun, tanggal, id)
+    sebagai tuple (values_list) dengan saldo berjalan dari window function,
+    dibaca lewat .iterator(), jadi yang tertahan di memori hanya baris
+    milik satu akun.
+    """
+    accounts = Account.objects.all().order_by('account_name', 'id')
+    openings = ledger_opening_balances(mode, selected_period, selected_year)
+    items = scoped_items(mode, selected_period, selected_year)
+
+    lines = (
+        running_balance_lines(items)
+        .order_by('account__account_name', 'account_id', 'journal_entry__date', 'id')
+        .iterator(chunk_size=ITEM_CHUNK_SIZE)
+    )
+    pending = next(lines, None)
 
-from apps.modules.ledger.models import Account, JournalItem, ClosingPeriod
+    for account in accounts:
+        opening_balance = openings.get(account.id, 0)
+
+        # ---------------------------
+        # MUTASI & SALDO BERJALAN
+        # ---------------------------
+        balance = opening_balance
+        rows = []
+
+        while pending is not None and pending[0] == account.id:
+            _, date, desc, debit, credit, running = pending
+            balance = opening_balance + running
+            rows.append({
+                'date': date,
+                'desc': desc,
+                'debit': intcomma(int(debit)),
+                'credit': intcomma(int(credit)),
+                'balance': intcomma(int(balance)),
+            })
+            pending = next(lines, None)
+
+        yield {
+            'account': account,
+            'rows': rows,
+            'opening_balance': intcomma(int(opening_balance)),
+            'closing_balance': intcomma(int(balance)),
+        }
 
 
 def ledger_report(request):
     """
     Ledger report:
     - mode=period → laporan per periode akuntansi (bulanan)
-    - mode=year   → laporan per tahun
+    - mode=year   → laporan per tahun (default dikirim streaming)
+    - view=summary → ringkasan saldo per akun, transaksi dimuat saat akun dibuka (default)
+    - view=full    → semua transaksi semua akun
+    - stream=1/0   → paksa / matikan mode streaming (view=full)
     """
 
     # ===============================
@@ -19,122 +139,149 @@ def ledger_report(request):
     mode = request.GET.get('mode', 'period')   # 'period' | 'year'
     selected_period = request.GET.get('period')
     selected_year = request.GET.get('year')
-
-    ledger_data = []
+    view = request.GET.get('view', 'summary')   # 'summary' | 'full'
+    stream = request.GET.get('stream', '1' if mode == 'year' else '0') == '1'
 
     # ===============================
     # DATA PERIODE
     # ===============================
-    closed_periods = ClosingPeriod.objects.filter(is_closed=True).order_by('-period')
-    open_periods = list(
-        ClosingPeriod.objects.filter(is_closed=False).values_list('period', flat=True)
-    )
+    closed_periods = period_registry().closed()
 
-    # Default periode jika tidak dipilih
-    if mode == 'period' and not selected_period and open_periods:
-        selected_period = open_periods[0]
+    # Default periode / tahun jika tidak dipilih
+    selected_period, selected_year = default_scope(mode, selected_period, selected_year)
+
+    context = {
+        'mode': mode,
+        'selected_period': selected_period,
+        'selected_year': selected_year,
+        'closed_periods': closed_periods,
+        'view': view,
+    }
 
     # ===============================
-    # PREVIOUS CLOSED PERIOD (UNTUK MODE PERIOD)
+    # RINGKASAN (DRILL-DOWN LAZY)
     # ===============================
-    previous_closed_period = None
-    if mode == 'period' and selected_period:
-        previous_closed = (
-            ClosingPeriod.objects.filter(is_closed=True, period__lt=selected_period)
-            .order_by('-period')
-            .first()
-        )
-        previous_closed_period = previous_closed.period if previous_closed else None
+    if view != 'full':
+        context['summary_rows'] = ledger_summary_rows(mode, selected_period, selected_year)
+        return render(request, 'ledger/ledger_summary.html', context)
+
+    sections = iter_ledger_sections(mode, selected_period, selected_year)
 
     # ===============================
-    # AKUN
+    # RENDER STREAMING (PER AKUN)
     # ===============================
-    accounts = Account.objects.all().order_by('account_name')
+    if stream:
+        return StreamingHttpResponse(
+            stream_ledger_report(request, context, sections),
+            content_type='text/html; charset=utf-8',
+        )
 
     # ===============================
-    # LOOP PER AKUN
+    # RENDER
     # ===============================
-    for account in accounts:
+    context['ledger_data'] = list(sections)
+    return render(request, 'ledger/ledger_report.html', context)
 
-        # ---------------------------
-        # AMBIL TRANSAKSI
-        # ---------------------------
-        if mode == 'year' and selected_year:
-            items = JournalItem.objects.filter(
-                account=account,
-                journal_entry__date__year=selected_year,
-                journal_entry__is_posted=True
-            )
-        else:
-            items = JournalItem.objects.filter(
-                account=account,
-                journal_entry__period=selected_period,
-                journal_entry__is_posted=True
-            )
-
-        items = items.select_related('journal_entry').order_by(
-            'journal_entry__date', 'id'
+
+def stream_ledger_report(request, context, sections):
+    """Kirim kepala halaman, lalu satu kartu per akun, lalu penutup."""
+    yield render_to_string('ledger/partials/ledger_report_head.html', context, request=request)
+
+    has_data = False
+    for data in sections:
+        has_data = True
+        # tanpa request: kartu tidak butuh context processor (hemat query per akun)
+        yield render_to_string(
+            'ledger/partials/ledger_account_card.html',
+            dict(context, data=data),
         )
 
-        # ---------------------------
-        # SALDO AWAL
-        # ---------------------------
-        if mode == 'year' and selected_year:
-            opening_balance_qs = JournalItem.objects.filter(
-                account=account,
-                journal_entry__date__year__lt=selected_year,
-                journal_entry__is_posted=True
-            ).aggregate(
-                total=Coalesce(Sum(F('debit') - F('credit')), Value(0))
-            )
-            opening_balance = opening_balance_qs['total'] or 0
-
-        else:
-            if previous_closed_period:
-                opening_balance_qs = JournalItem.objects.filter(
-                    account=account,
-                    journal_entry__period__lte=previous_closed_period,
-                    journal_entry__is_posted=True
-                ).aggregate(
-                    total=Coalesce(Sum(F('debit') - F('credit')), Value(0))
-                )
-                opening_balance = opening_balance_qs['total'] or 0
-            else:
-                opening_balance = 0
+    yield render_to_string(
+        'ledger/partials/ledger_report_foot.html',
+        dict(context, has_data=has_data),
+        request=request,
+    )
 
-        # ---------------------------
-        # MUTASI & SALDO BERJALAN
-        # ---------------------------
-        balance = opening_balance
-        rows = []
 
-        for item in items:
-            balance += item.debit - item.credit
-            rows.append({
-                'date': item.journal_entry.date,
-                'desc': item.journal_entry.description,
-                'debit': intcomma(int(item.debit)),
-                'credit': intcomma(int(item.credit)),
-                'balance': intcomma(int(balance)),
-            })
+# ===============================
+# DRILL-DOWN TRANSAKSI PER AKUN
+# ===============================
+def ledger_account_lines(request, account_id):
+    """
+    Transaksi satu akun per halaman (keyset pagination pada tanggal, id).
 
-        # ---------------------------
-        # SIMPAN DATA AKUN
-        # ---------------------------
-        ledger_data.append({
+    GET: mode, period, year, after_date (YYYY-MM-DD), after_id, limit,
+         format=json|html (html → potongan <tr> untuk halaman ringkasan)
+    """
+    account = get_object_or_404(Account, pk=account_id)
+
+    mode = request.GET.get('mode', 'period')
+    selected_period = request.GET.get('period')
+    selected_year = request.GET.get('year')
+    after_date = request.GET.get('after_date')
+    after_id = request.GET.get('after_id')
+    selected_period, selected_year = default_scope(mode, selected_period, selected_year)
+
+    # kursor (after_date, after_id) harus lengkap, tanpa id baris di tanggal kursor bisa terlewat / berulang
+    if bool(after_date) != bool(after_id):
+        return JsonResponse({'error': 'after_date dan after_id harus dikirim bersama'}, status=400)
+
+    try:
+        limit = max(1, min(int(request.GET.get('limit', LINES_PAGE_SIZE)), LINES_MAX_PAGE_SIZE))
+        if after_date:
+            after_date = datetime.strptime(after_date, '%Y-%m-%d').date()
+            after_id = int(after_id)
+    except ValueError:
+        return JsonResponse({'error': 'Parameter tidak valid'}, status=400)
+
+    items = scoped_items(mode, selected_period, selected_year).filter(account=account)
+    opening_balance = ledger_opening_balances(mode, selected_period, selected_year).get(account.id, 0)
+
+    # Saldo sebelum kursor = saldo awal + mutasi baris-baris sebelumnya
+    carry = opening_balance
+    if after_date:
+        before_cursor = (
+            Q(journal_entry__date__lt=after_date)
+            | Q(journal_entry__date=after_date, id__lte=after_id)
+        )
+        carry += items.filter(before_cursor).aggregate(
+            total=Coalesce(Sum(F('debit') - F('credit')), Value(0))
+        )['total']
+        items = items.exclude(before_cursor)
+
+    lines = list(
+        running_balance_lines(items, fields=('id',) + LINE_FIELDS)
+        .order_by('journal_entry__date', 'id')[:limit + 1]
+    )
+    has_more = len(lines) > limit
+    lines = lines[:limit]
+
+    rows = [
+        {
+            'id': item_id,
+            'date': date.isoformat(),
+            'desc': desc,
+            'debit': debit,
+            'credit': credit,
+            'balance': carry + running,
+        }
+        for item_id, _, date, desc, debit, credit, running in lines
+    ]
+
+    next_cursor = None
+    if has_more and rows:
+        next_cursor = {'after_date': rows[-1]['date'], 'after_id': rows[-1]['id']}
+
+    if request.GET.get('format') == 'html':
+        return render(request, 'ledger/partials/ledger_account_lines.html', {
             'account': account,
             'rows': rows,
-            'opening_balance': intcomma(int(opening_balance)),
-            'closing_balance': intcomma(int(balance)),
+            'next_cursor': next_cursor,
         })
 
-    # ===============================
-    # RENDER
-    # ===============================
-    return render(request, 'ledger/ledger_report.html', {
-        'ledger_data': ledger_data,
-        'mode': mode,
-        'selected_period': selected_period,
-        'selected_year': selected_year,
-        'closed_periods': closed_periods,
+    return JsonResponse({
+        'account_id': account.id,
+        'opening_balance': opening_balance,
+        'rows': rows,
+        'next_cursor': next_cursor,
     })
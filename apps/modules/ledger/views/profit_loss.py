@@ -1,5 +1,9 @@
+from collections import defaultdict
+
 from django.shortcuts import render
-from apps.modules.ledger.models import Account, JournalItem, ClosingPeriod
+from django.db.models import F
+from apps.modules.ledger.models import JournalItem
+from apps.modules.ledger.services import TrialBalance, cached_report, period_registry, running_balance_lines
 
 
 def profit_and_loss_report(request):
@@ -16,108 +20,121 @@ def profit_and_loss_report(request):
     selected_period = request.GET.get('period')
     selected_year = request.GET.get('year')
 
-    income_data = []
-    expense_data = []
-    total_income = 0
-    total_expense = 0
-
     # ==========================
     # DATA PERIODE
     # ==========================
-    closing_periods = ClosingPeriod.objects.filter(is_closed=True).order_by('-period')
+    registry = period_registry()
+    closing_periods = registry.closed()
 
     if mode == 'period':
-        if not selected_period and closing_periods.exists():
-            selected_period = closing_periods.first().period
+        if not selected_period:
+            selected_period = registry.latest_closed()
 
         # validasi: hanya boleh periode closed
-        if not ClosingPeriod.objects.filter(period=selected_period, is_closed=True).exists():
+        if not registry.is_closed(selected_period):
             selected_period = None
 
-    # ==========================
-    # AKUN
-    # ==========================
-    income_accounts = Account.objects.filter(account_type='INCOME', active=True)
-    expense_accounts = Account.objects.filter(account_type='EXPENSES', active=True)
-
-    # ==========================
-    # FILTER TRANSAKSI
-    # ==========================
-    def get_items(account):
-        qs = JournalItem.objects.filter(
-            account=account,
-            journal_entry__is_posted=True
-        ).select_related('journal_entry').order_by('journal_entry__date', 'id')
-
-        if mode == 'year' and selected_year:
-            qs = qs.filter(journal_entry__date__year=selected_year)
-        elif mode == 'period' and selected_period:
-            qs = qs.filter(journal_entry__period=selected_period)
-        else:
-            qs = qs.none()
-
-        return qs
-
-    # ==========================
-    # PENDAPATAN
-    # ==========================
-    for account in income_accounts:
-        items = get_items(account)
-
-        balance = 0
-        rows = []
-        for item in items:
-            balance += item.credit or 0
-            rows.append({
-                'date': item.journal_entry.date,
-                'desc': item.journal_entry.description,
-                'debit': item.debit,
-                'credit': item.credit,
-                'balance': balance,
+    # data laporan, dihitung hanya saat cache miss
+    def build():
+        # ==========================
+        # NERACA SALDO & AKUN
+        # ==========================
+        trial_balance = TrialBalance.for_request(
+            request,
+            period=selected_period if mode == 'period' else None,
+            year=selected_year if mode == 'year' else None,
+        )
+        income_accounts = trial_balance.accounts_of_type('INCOME')
+        expense_accounts = trial_balance.accounts_of_type('EXPENSES')
+
+        # ==========================
+        # TRANSAKSI + SALDO BERJALAN (WINDOW)
+        # ==========================
+        def get_rows(accounts, amount):
+            """Baris per akun {account_id: [row, ...]}, saldo berjalan dihitung di DB."""
+            qs = JournalItem.objects.filter(
+                account__in=accounts,
+                journal_entry__is_posted=True
+            )
+
+            if mode == 'year' and selected_year:
+                qs = qs.filter(journal_entry__date__year=selected_year)
+            elif mode == 'period' and selected_period:
+                qs = qs.filter(journal_entry__period=selected_period)
+            else:
+                return {}
+
+            lines = running_balance_lines(qs, amount).order_by(
+                'account_id', 'journal_entry__date', 'id'
+            )
+
+            grouped = defaultdict(list)
+            for account_id, date, desc, debit, credit, running in lines:
+                grouped[account_id].append({
+                    'date': date,
+                    'desc': desc,
+                    'debit': debit,
+                    'credit': credit,
+                    'balance': running,
+                })
+            return grouped
+
+        income_data = []
+        expense_data = []
+        total_income = 0
+        total_expense = 0
+
+        # ==========================
+        # PENDAPATAN
+        # ==========================
+        income_rows = get_rows(income_accounts, F('credit') - F('debit'))
+
+        for account in income_accounts:
+            rows = income_rows.get(account.id, [])
+
+            subtotal = trial_balance.balance(account)
+            total_income += subtotal
+
+            income_data.append({
+                'account': account,
+                'rows': rows,
+                'subtotal': subtotal,
             })
 
-        subtotal = sum(item.credit or 0 for item in items)
-        total_income += subtotal
+        # ==========================
+        # BEBAN
+        # ==========================
+        expense_rows = get_rows(expense_accounts, F('debit') - F('credit'))
 
-        income_data.append({
-            'account': account,
-            'rows': rows,
-            'subtotal': subtotal,
-        })
+        for account in expense_accounts:
+            rows = expense_rows.get(account.id, [])
 
-    # ==========================
-    # BEBAN
-    # ==========================
-    for account in expense_accounts:
-        items = get_items(account)
-
-        balance = 0
-        rows = []
-        for item in items:
-            balance += (item.debit or 0) - (item.credit or 0)
-            rows.append({
-                'date': item.journal_entry.date,
-                'desc': item.journal_entry.description,
-                'debit': item.debit,
-                'credit': item.credit,
-                'balance': balance,
+            subtotal = trial_balance.balance(account)
+            total_expense += subtotal
+
+            expense_data.append({
+                'account': account,
+                'rows': rows,
+                'subtotal': subtotal,
             })
 
-        total_debit = sum(item.debit or 0 for item in items)
-        total_credit = sum(item.credit or 0 for item in items)
-        subtotal = total_debit - total_credit
-        total_expense += subtotal
+        # ==========================
+        # LABA BERSIH
+        # ==========================
+        net_income = total_income - total_expense
 
-        expense_data.append({
-            'account': account,
-            'rows': rows,
-            'subtotal': subtotal,
-        })
+        return {
+            'income_data': income_data,
+            'expense_data': expense_data,
+            'total_income': total_income,
+            'total_expense': total_expense,
+            'net_income': net_income,
+        }
 
     # ==========================
-    # LABA BERSIH
+    # HASIL (CACHE PER MODE & PERIODE/TAHUN)
     # ==========================
-    net_income = total_income - total_expense
+    report = cached_report('profit_loss', mode, selected_period, selected_year, build)
 
     # ==========================
     # RENDER
@@ -127,9 +144,5 @@ def profit_and_loss_report(request):
         'selected_period': selected_period,
         'selected_year': selected_year,
         'closing_periods': closing_periods,
-        'income_data': income_data,
-        'expense_data': expense_data,
-        'total_income': total_income,
-        'total_expense': total_expense,
-        'net_income': net_income,
+        **report,
     })
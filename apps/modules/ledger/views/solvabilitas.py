@@ -1,37 +1,25 @@
 from django.shortcuts import render
-from django.db.models import Sum
-from apps.modules.ledger.models import Account, JournalItem, ClosingPeriod
+from apps.modules.ledger.services import TrialBalance, cached_report, period_registry
 
 
-def get_balance_by_prefix(prefixes, period=None, year=None):
+def get_balance_by_prefix(prefixes, trial_balance):
     """
-    Hitung total saldo akun-akun dengan prefix tertentu.
-    Bisa filter per periode (YYYY-MM) atau per tahun.
+    Hitung total saldo akun-akun dengan prefix kode tertentu,
+    dari neraca saldo (TrialBalance) periode / tahun yang dipilih.
     """
 
     if isinstance(prefixes, str):
         prefixes = [prefixes]
 
-    accounts = Account.objects.all()
     total = 0
     detail = []
 
-    for acc in accounts:
+    for acc in trial_balance.accounts:
         code = acc.coa if acc.coa and acc.coa != "Default CoA" else acc.account_name.split(':')[0].strip()
         if not any(code.startswith(p) for p in prefixes):
             continue
 
-        items = JournalItem.objects.filter(account=acc)
-
-        if period:
-            items = items.filter(journal_entry__period=period)
-        elif year:
-            items = items.filter(journal_entry__date__year=year)
-
-        debit = items.aggregate(total=Sum("debit"))["total"] or 0
-        credit = items.aggregate(total=Sum("credit"))["total"] or 0
-
-        balance = debit - credit if acc.balance_type == 'Debit' else credit - debit
+        balance = trial_balance.balance(acc)
 
         total += balance
         detail.append({
@@ -46,7 +34,7 @@ def get_balance_by_prefix(prefixes, period=None, year=None):
 def solvabilitas_view(request):
     """Laporan Rasio Solvabilitas & Likuiditas (Bulanan / Tahunan)."""
 
-    closed_periods = ClosingPeriod.objects.filter(is_closed=True).order_by('-period')
+    closed_periods = period_registry().closed()
 
     mode = request.GET.get("mode", "period")   # period | year
     selected_period = request.GET.get("period")
@@ -55,56 +43,69 @@ def solvabilitas_view(request):
     # ===== Default nilai =====
     if mode == "year":
         if not selected_year:
-            if closed_periods.exists():
-                selected_year = closed_periods.first().period[:4]
+            if closed_periods:
+                selected_year = closed_periods[0].period[:4]
     else:
-        if not selected_period and closed_periods.exists():
-            selected_period = closed_periods.first().period
+        if not selected_period and closed_periods:
+            selected_period = closed_periods[0].period
 
     if not selected_period and not selected_year:
         return render(request, 'ledger/solvabilitas.html', {'error': 'Belum ada periode yang bisa ditampilkan.'})
 
-    # ===== Ambil saldo =====
-    aset_lancar, aset_lancar_detail = get_balance_by_prefix(['1'], selected_period if mode=="period" else None, int(selected_year) if mode=="year" else None)
-    kewajiban_lancar, kewajiban_detail = get_balance_by_prefix(['2'], selected_period if mode=="period" else None, int(selected_year) if mode=="year" else None)
-    ekuitas, ekuitas_detail = get_balance_by_prefix(['3'], selected_period if mode=="period" else None, int(selected_year) if mode=="year" else None)
-    persediaan, persediaan_detail = get_balance_by_prefix(['1200'], selected_period if mode=="period" else None, int(selected_year) if mode=="year" else None)
-
-    total_aset = aset_lancar
-    total_kewajiban = kewajiban_lancar
-    total_ekuitas = ekuitas
-
-    # ===== Hitung Rasio =====
-    rasio_lancar = aset_lancar / total_kewajiban if total_kewajiban else 0
-    rasio_cepat = (aset_lancar - persediaan) / total_kewajiban if total_kewajiban else 0
-    rasio_utang_aset = total_kewajiban / total_aset if total_aset else 0
-    rasio_utang_modal = total_kewajiban / total_ekuitas if total_ekuitas else 0
-    rasio_ekuitas_aset = total_ekuitas / total_aset if total_aset else 0
+    # data laporan, dihitung hanya saat cache miss
+    def build():
+        # ===== Ambil saldo (satu neraca saldo untuk semua rasio) =====
+        trial_balance = TrialBalance.for_request(
+            request,
+            period=selected_period if mode == "period" else None,
+            year=int(selected_year) if mode == "year" else None,
+        )
+        aset_lancar, aset_lancar_detail = get_balance_by_prefix(['1'], trial_balance)
+        kewajiban_lancar, kewajiban_detail = get_balance_by_prefix(['2'], trial_balance)
+        ekuitas, ekuitas_detail = get_balance_by_prefix(['3'], trial_balance)
+        persediaan, persediaan_detail = get_balance_by_prefix(['1200'], trial_balance)
+
+        total_aset = aset_lancar
+        total_kewajiban = kewajiban_lancar
+        total_ekuitas = ekuitas
+
+        # ===== Hitung Rasio =====
+        rasio_lancar = aset_lancar / total_kewajiban if total_kewajiban else 0
+        rasio_cepat = (aset_lancar - persediaan) / total_kewajiban if total_kewajiban else 0
+        rasio_utang_aset = total_kewajiban / total_aset if total_aset else 0
+        rasio_utang_modal = total_kewajiban / total_ekuitas if total_ekuitas else 0
+        rasio_ekuitas_aset = total_ekuitas / total_aset if total_aset else 0
+
+        return {
+            # rasio
+            "rasio_lancar": round(rasio_lancar, 2),
+            "rasio_cepat": round(rasio_cepat, 2),
+            "rasio_utang_aset": round(rasio_utang_aset, 2),
+            "rasio_utang_modal": round(rasio_utang_modal, 2),
+            "rasio_ekuitas_aset": round(rasio_ekuitas_aset, 2),
+
+            # saldo
+            "aset_lancar": round(aset_lancar, 2),
+            "kewajiban_lancar": round(kewajiban_lancar, 2),
+            "persediaan": round(persediaan, 2),
+            "ekuitas": round(ekuitas, 2),
+
+            # detail
+            "aset_lancar_detail": aset_lancar_detail,
+            "kewajiban_detail": kewajiban_detail,
+            "persediaan_detail": persediaan_detail,
+            "ekuitas_detail": ekuitas_detail,
+        }
+
+    # ===== Hasil (cache per mode & periode/tahun) =====
+    report = cached_report("solvabilitas", mode, selected_period, selected_year, build)
 
     context = {
         "mode": mode,
         "periods": closed_periods,
         "period": selected_period,
         "year": selected_year,
-
-        # rasio
-        "rasio_lancar": round(rasio_lancar, 2),
-        "rasio_cepat": round(rasio_cepat, 2),
-        "rasio_utang_aset": round(rasio_utang_aset, 2),
-        "rasio_utang_modal": round(rasio_utang_modal, 2),
-        "rasio_ekuitas_aset": round(rasio_ekuitas_aset, 2),
-
-        # saldo
-        "aset_lancar": round(aset_lancar, 2),
-        "kewajiban_lancar": round(kewajiban_lancar, 2),
-        "persediaan": round(persediaan, 2),
-        "ekuitas": round(ekuitas, 2),
-
-        # detail
-        "aset_lancar_detail": aset_lancar_detail,
-        "kewajiban_detail": kewajiban_detail,
-        "persediaan_detail": persediaan_detail,
-        "ekuitas_detail": ekuitas_detail,
+        **report,
     }
 
     return render(request, "ledger/solvabilitas.html", context)
@@ -1,4 +1,4 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.utils.html import format_html
 from .models import (
     TicketType,
@@ -7,6 +7,7 @@ from .models import (
     ParkingExpense,
     ParkingRevenueRule
 )
+from .services import post_parking_reports
 
 # =========================
 # Master Data
@@ -64,6 +65,8 @@ class ParkingDailyReportAdmin(admin.ModelAdmin):
         'date',
         'status',
         'total_bruto_display',
+        'total_expense_display',
+        'net_cash_display',
         'created_by',
         'posted_at'
     )
@@ -83,6 +86,8 @@ class ParkingDailyReportAdmin(admin.ModelAdmin):
         ParkingExpenseInline
     ]
 
+    actions = ['post_selected_reports', 'post_selected_reports_consolidated']
+
     fieldsets = (
         ("Informasi Laporan", {
             "fields": (
@@ -100,9 +105,58 @@ class ParkingDailyReportAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        # total per laporan dihitung di SQL (satu query untuk seluruh changelist)
+        return super().get_queryset(request).with_totals()
+
     def total_bruto_display(self, obj):
-        return obj.total_bruto()
+        if not obj.pk:
+            return "-"
+        return obj.bruto_total
     total_bruto_display.short_description = "Total Bruto"
+    total_bruto_display.admin_order_field = 'bruto_total'
+
+    def total_expense_display(self, obj):
+        return obj.total_expense
+    total_expense_display.short_description = "Total Biaya"
+    total_expense_display.admin_order_field = 'total_expense'
+
+    def net_cash_display(self, obj):
+        return obj.net_cash
+    net_cash_display.short_description = "Kas Bersih"
+    net_cash_display.admin_order_field = 'net_cash'
+
+    # =========================
+    # Posting massal ke Ledger
+    # =========================
+
+    def _post_reports(self, request, queryset, consolidate):
+        reports = ParkingDailyReport.objects.filter(pk__in=queryset.values('pk'))
+        try:
+            result = post_parking_reports(reports, consolidate=consolidate)
+        except Exception as e:
+            self.message_user(request, f"Gagal posting: {e}", messages.ERROR)
+            return
+
+        for report, reason in result['failures']:
+            self.message_user(request, f"{report.date}: {reason}", messages.WARNING)
+
+        if result['posted']:
+            self.message_user(
+                request,
+                f"{len(result['posted'])} laporan diposting ke {len(result['entries'])} jurnal.",
+                messages.SUCCESS,
+            )
+        elif not result['failures']:
+            self.message_user(request, "Tidak ada laporan draft yang dipilih.", messages.INFO)
+
+    @admin.action(description="Posting ke Ledger (satu jurnal per laporan)")
+    def post_selected_reports(self, request, queryset):
+        self._post_reports(request, queryset, consolidate=False)
+
+    @admin.action(description="Posting ke Ledger (satu jurnal gabungan per periode)")
+    def post_selected_reports_consolidated(self, request, queryset):
+        self._post_reports(request, queryset, consolidate=True)
 
     def has_delete_permission(self, request, obj=None):
         if obj and obj.status == 'posted':
@@ -0,0 +1,42 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.modules.ledger.services import ExportError, check_format, write_export
+from apps.modules.ledger.services.export import EXPORT_FORMATS
+from apps.modules.parkir.services import parking_reports_export
+from .post_parking_reports import parse_date
+
+
+class Command(BaseCommand):
+    help = "Ekspor laporan parkir harian (dengan total) ke CSV atau XLSX."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', help="Tanggal awal (YYYY-MM-DD).")
+        parser.add_argument('--to', dest='date_to', help="Tanggal akhir (YYYY-MM-DD).")
+        parser.add_argument('--format', dest='fmt', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument(
+            '--output',
+            help="File tujuan. Default: nama otomatis di direktori kerja, '-' untuk stdout.",
+        )
+
+    def handle(self, *args, **options):
+        date_from = parse_date(options['date_from'], '--from') if options['date_from'] else None
+        date_to = parse_date(options['date_to'], '--to') if options['date_to'] else None
+
+        fmt = options['fmt']
+        try:
+            check_format(fmt)
+        except ExportError as e:
+            raise CommandError(str(e))
+
+        export = parking_reports_export(date_from, date_to)
+        output = options['output'] or f"{export['filename']}.{fmt}"
+
+        if output == '-':
+            write_export(export, fmt, sys.stdout.buffer)
+            return
+        with open(output, 'wb') as stream:
+            write_export(export, fmt, stream)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {export['title']} diekspor ke {output}"))
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.modules.parkir.models import ParkingDailyReport
+from apps.modules.parkir.services import post_parking_reports
+
+
+def parse_date(value, option):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f"Format {option} tidak valid. Gunakan YYYY-MM-DD.")
+
+
+class Command(BaseCommand):
+    help = "Posting semua laporan parkir draft dalam rentang tanggal ke Ledger (satu transaksi)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', required=True, help="Tanggal awal (YYYY-MM-DD).")
+        parser.add_argument('--to', dest='date_to', required=True, help="Tanggal akhir (YYYY-MM-DD).")
+        parser.add_argument(
+            '--consolidate',
+            action='store_true',
+            help="Satu jurnal gabungan per periode, bukan satu jurnal per laporan.",
+        )
+
+    def handle(self, *args, **options):
+        date_from = parse_date(options['date_from'], '--from')
+        date_to = parse_date(options['date_to'], '--to')
+        if date_from > date_to:
+            raise CommandError("--from harus sebelum --to.")
+
+        reports = ParkingDailyReport.objects.filter(date__range=(date_from, date_to))
+
+        def progress(index, total, report):
+            self.stdout.write(f"  [{index}/{total}] {report.date}")
+
+        try:
+            result = post_parking_reports(reports, consolidate=options['consolidate'], progress=progress)
+        except Exception as e:
+            raise CommandError(f"Gagal posting, tidak ada laporan yang diposting: {e}")
+
+        for report, reason in result['failures']:
+            self.stdout.write(self.style.WARNING(f"⚠️ {report.date}: {reason}"))
+
+        if not result['posted'] and not result['failures']:
+            self.stdout.write(self.style.WARNING("Tidak ada laporan draft dalam rentang tanggal ini."))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(result['posted'])} laporan diposting ke {len(result['entries'])} jurnal, "
+            f"{len(result['failures'])} gagal."
+        ))
@@ -1,4 +1,14 @@
+from decimal import Decimal
+
 from django.db import models
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+# Subtotal tiket di SQL (lembar kosong dihitung 0)
+TICKET_SUBTOTAL = ExpressionWrapper(
+    Coalesce(F('lembar'), Value(0)) * F('price'),
+    output_field=DecimalField(max_digits=14, decimal_places=2),
+)
 
 # apps/parking/models.py
 class TicketType(models.Model):
@@ -12,6 +22,37 @@ class TicketType(models.Model):
     def __str__(self):
         return self.name
 
+class ParkingDailyReportQuerySet(models.QuerySet):
+    def with_totals(self):
+        """
+        Anotasi bruto_total, total_expense dan net_cash per laporan lewat
+        subquery, jadi daftar ratusan hari tetap satu query. (Bukan
+        'total_bruto': nama itu milik method model.)
+        """
+        amount_field = DecimalField(max_digits=14, decimal_places=2)
+
+        def report_sum(model, expression):
+            return Coalesce(
+                Subquery(
+                    model.objects.filter(report=OuterRef('pk'))
+                    .order_by()
+                    .values('report')
+                    .annotate(total=Sum(expression))
+                    .values('total'),
+                    output_field=amount_field,
+                ),
+                Value(Decimal('0')),
+                output_field=amount_field,
+            )
+
+        return self.annotate(
+            bruto_total=report_sum(ParkingTicketItem, TICKET_SUBTOTAL),
+            total_expense=report_sum(ParkingExpense, F('amount')),
+        ).annotate(
+            net_cash=ExpressionWrapper(F('bruto_total') - F('total_expense'), output_field=amount_field),
+        )
+
+
 class ParkingDailyReport(models.Model):
     STATUS_CHOICES = (
         ('draft', 'Draft'),
@@ -33,8 +74,14 @@ class ParkingDailyReport(models.Model):
 
  
 
+    objects = ParkingDailyReportQuerySet.as_manager()
+
     def total_bruto(self):
-        return sum(i.subtotal() for i in self.items.all())
+        """
+        Total bruto satu laporan (satu query SUM).
+        Instance dari with_totals() sudah membawa nilainya di bruto_total.
+        """
+        return self.items.aggregate(total=Sum(TICKET_SUBTOTAL))['total'] or Decimal('0')
 
 class ParkingTicketItem(models.Model):
     report = models.ForeignKey(
@@ -1,10 +1,20 @@
 # apps/parking/services.py
 from django.db import transaction
+from django.db.models import Count, Max, Sum
 from django.utils import timezone
 from decimal import Decimal
 
-from apps.modules.ledger.models import JournalEntry, JournalItem, Account
-from .models import ParkingDailyReport, ParkingRevenueRule
+from apps.modules.ledger.models import Account
+from apps.modules.ledger.services import JournalPostingError, post_journal, post_journals
+from apps.modules.ledger.services.journal_posting import clean_lines, with_accounts
+from apps.modules.ledger.services.export import EXPORT_CHUNK_SIZE
+from .models import (
+    TICKET_SUBTOTAL,
+    ParkingDailyReport,
+    ParkingExpense,
+    ParkingRevenueRule,
+    ParkingTicketItem,
+)
 
 def get_default_cash_account():
     cash_account = Account.objects.filter(coa_role_default__iexact='cash').first()
@@ -18,6 +28,103 @@ def get_default_cash_account():
     raise Account.DoesNotExist("Tidak menemukan akun kas (coa_role_default='cash' atau account_type='ASSET')")
 
 
+# ==========================================================
+# 💰 REKAP PENDAPATAN & BEBAN (GROUP BY DI DATABASE)
+# ==========================================================
+def empty_amounts():
+    return {'revenue': [], 'expenses': [], 'total_revenue': Decimal('0'), 'total_expense': Decimal('0')}
+
+
+def reports_amounts(reports):
+    """
+    Pendapatan per revenue_account (SUM lembar * price) dan beban per
+    expense_account (SUM amount) untuk banyak laporan sekaligus,
+    masing-masing satu query GROUP BY. Return: {report_id: amounts}.
+    """
+    amounts = {report.id: empty_amounts() for report in reports}
+
+    revenue_rows = (
+        ParkingTicketItem.objects.filter(report_id__in=amounts, lembar__gt=0, price__gt=0)
+        .values('report_id', 'revenue_account_id')
+        .annotate(amount=Sum(TICKET_SUBTOTAL))
+        .order_by('report_id', 'revenue_account_id')
+    )
+    for row in revenue_rows:
+        report_amount = amounts[row['report_id']]
+        report_amount['revenue'].append((row['revenue_account_id'], row['amount']))
+        report_amount['total_revenue'] += row['amount']
+
+    expense_rows = (
+        ParkingExpense.objects.filter(report_id__in=amounts, amount__gt=0)
+        .values('report_id', 'expense_account_id')
+        .annotate(amount=Sum('amount'), lines=Count('id'), description=Max('description'))
+        .order_by('report_id', 'expense_account_id')
+    )
+    for row in expense_rows:
+        report_amount = amounts[row['report_id']]
+        # beban satu baris → pakai deskripsinya sebagai catatan jurnal
+        description = row['description'] if row['lines'] == 1 else ""
+        report_amount['expenses'].append((row['expense_account_id'], row['amount'], description))
+        report_amount['total_expense'] += row['amount']
+
+    return amounts
+
+
+def report_amounts(report):
+    """Rekap pendapatan & beban satu laporan (lihat reports_amounts)."""
+    return reports_amounts([report])[report.id]
+
+
+def merge_amounts(amounts_list):
+    """Gabungkan rekap beberapa laporan (jurnal konsolidasi) per akun."""
+    revenue, expenses = {}, {}
+    for amounts in amounts_list:
+        for account_id, amount in amounts['revenue']:
+            revenue[account_id] = revenue.get(account_id, Decimal('0')) + amount
+        for account_id, amount, description in amounts['expenses']:
+            if account_id in expenses:
+                expenses[account_id] = (expenses[account_id][0] + amount, "")
+            else:
+                expenses[account_id] = (amount, description)
+
+    merged = empty_amounts()
+    merged['revenue'] = sorted(revenue.items())
+    merged['expenses'] = [(account_id, amount, note) for account_id, (amount, note) in sorted(expenses.items())]
+    merged['total_revenue'] = sum(revenue.values(), Decimal('0'))
+    merged['total_expense'] = sum((amount for amount, _ in expenses.values()), Decimal('0'))
+    return merged
+
+
+def report_journal_lines(label, amounts, cash_account_id=None):
+    """
+    Baris jurnal laporan parkir:
+    Debit Kas / Kredit pendapatan, lalu Debit beban / Kredit Kas.
+    Baris kas dilewati jika akun kas belum diketahui (draft prefill).
+    """
+    lines = []
+
+    def add_line(account_id, amount, note, side):
+        if not account_id or amount <= 0:
+            return
+        lines.append({
+            'account_id': account_id,
+            'debit': amount if side == 'DEBIT' else Decimal('0'),
+            'credit': amount if side == 'CREDIT' else Decimal('0'),
+            'note': note or "",
+        })
+
+    add_line(cash_account_id, amounts['total_revenue'], "Setoran pendapatan parkir", 'DEBIT')
+    for account_id, amount in amounts['revenue']:
+        add_line(account_id, amount, f"Pendapatan dari {label}", 'CREDIT')
+
+    if amounts['total_expense'] > 0:
+        for account_id, amount, description in amounts['expenses']:
+            add_line(account_id, amount, description, 'DEBIT')
+        add_line(cash_account_id, amounts['total_expense'], "Pengeluaran operasional parkir", 'CREDIT')
+
+    return lines
+
+
 def prepare_journal_prefill(report: ParkingDailyReport):
     cash_warning = None
     try:
@@ -26,153 +133,203 @@ def prepare_journal_prefill(report: ParkingDailyReport):
         cash_account = None
         cash_warning = "Akun kas default tidak ditemukan. Pilih akun kas secara manual sebelum menyimpan jurnal."
 
-    revenue_map = {}
-    for item in report.items.all():
-        amount = Decimal(item.subtotal() or 0)
-        if amount <= 0:
-            continue
-        revenue_map[item.revenue_account] = revenue_map.get(item.revenue_account, Decimal('0')) + amount
-
-    expense_entries = []
-    total_expense = Decimal('0')
-    for expense in report.expenses.all():
-        amount = Decimal(expense.amount or 0)
-        if amount <= 0:
-            continue
-        total_expense += amount
-        expense_entries.append((expense.expense_account, amount, expense.description))
-
-    total_revenue = sum(revenue_map.values(), Decimal('0'))
+    amounts = report_amounts(report)
+    lines = report_journal_lines(report.date, amounts, cash_account.id if cash_account else None)
 
-    entries = []
-
-    def add_entry(account, amount, note="", force_side=None):
-        if not account or amount <= 0:
-            return
-
-        balance_type = (account.balance_type or '').upper()
-        side = (force_side or balance_type or '').upper()
-
-        debit = Decimal('0')
-        credit = Decimal('0')
-
-        if side == 'CREDIT':
-            credit = amount
-        elif side == 'DEBIT':
-            debit = amount
-        else:
-            # fallback gunakan debit
-            debit = amount
-
-        entries.append({
-            'account_id': account.id,
-            'debit': float(debit),
-            'credit': float(credit),
-            'note': note or ""
-        })
-
-    if total_revenue > 0:
-        add_entry(cash_account, total_revenue, "Setoran pendapatan parkir", force_side='DEBIT')
-
-    for account, amount in revenue_map.items():
-        add_entry(account, amount, f"Pendapatan dari {report.date}", force_side='CREDIT')
-
-    if total_expense > 0:
-        for account, amount, description in expense_entries:
-            add_entry(account, amount, description, force_side='DEBIT')
-        add_entry(cash_account, total_expense, "Pengeluaran operasional parkir", force_side='CREDIT')
+    entries = [
+        {
+            'account_id': line['account_id'],
+            'debit': float(line['debit']),
+            'credit': float(line['credit']),
+            'note': line['note'],
+        }
+        for line in lines
+    ]
 
     return {
         'entries': entries,
         'cash_warning': cash_warning,
-        'total_revenue': float(total_revenue),
-        'total_expense': float(total_expense),
+        'total_revenue': float(amounts['total_revenue']),
+        'total_expense': float(amounts['total_expense']),
     }
 
 
 def post_parking_daily_report(report_id):
+    """
+    Posting laporan parkir ke ledger dengan jumlah query tetap:
+    lock laporan, 2 rekap GROUP BY, akun kas, in_bulk akun, periode open,
+    INSERT jurnal + bulk_create item, update status laporan.
+    """
     with transaction.atomic():
         report = ParkingDailyReport.objects.select_for_update().get(id=report_id)
 
         if report.status == 'posted':
             raise ValueError("Report sudah diposting")
 
-        bruto = Decimal(report.total_bruto() or 0)
-        if bruto <= 0:
+        amounts = report_amounts(report)
+        if amounts['total_revenue'] <= 0:
             raise ValueError("Total pendapatan (bruto) masih 0.")
 
         cash_account = get_default_cash_account()
 
-        revenue_map = {}
-        for item in report.items.all():
-            amount = Decimal(item.subtotal() or 0)
-            if amount <= 0:
-                continue
-            revenue_map[item.revenue_account] = revenue_map.get(item.revenue_account, Decimal('0')) + amount
+        # Buat Journal Entry + semua item sekaligus
+        lines = report_journal_lines(report.date, amounts, cash_account.id)
+        entry = post_journal(report.date, f"Pendapatan Parkir {report.date}", lines)
 
-        total_revenue = sum(revenue_map.values(), Decimal('0'))
-        if total_revenue <= 0:
-            raise ValueError("Tidak ada item pendapatan yang valid untuk diposting.")
+        # TODO: Tangani ParkingRevenueRule bila diperlukan (misalnya bagi hasil/pajak)
 
-        total_expense = Decimal('0')
-        expense_entries = []
-        for expense in report.expenses.all():
-            amount = Decimal(expense.amount or 0)
-            if amount <= 0:
-                continue
-            total_expense += amount
-            expense_entries.append((expense.expense_account, amount, expense.description))
+        # Finalisasi
+        report.status = 'posted'
+        report.journal_entry_id = entry.id
+        report.posted_at = timezone.now()
+        report.save(update_fields=['status', 'journal_entry_id', 'posted_at'])
+
+    return entry
 
-        # 1. Buat Journal Entry
-        entry = JournalEntry.objects.create(
-            date=report.date,
-            description=f"Pendapatan Parkir {report.date}"
-        )
 
-        # 2. Debit Kas untuk total pendapatan
-        JournalItem.objects.create(
-            journal_entry=entry,
-            account=cash_account,
-            debit=total_revenue,
-            credit=Decimal('0'),
-            note="Setoran pendapatan parkir"
+# ==========================================================
+# 📦 POSTING BANYAK LAPORAN SEKALIGUS
+# ==========================================================
+def post_parking_reports(reports, consolidate=False, progress=None):
+    """
+    Posting semua laporan draft di `reports` (queryset) dalam satu transaksi.
+
+    - Laporan dikunci dengan satu select_for_update
+    - Rekap pendapatan / beban semua laporan: dua query GROUP BY
+    - consolidate=False → satu jurnal per laporan
+      consolidate=True  → satu jurnal gabungan per periode (bulan tanggal laporan)
+    - Baris jurnal setiap laporan divalidasi dulu (akun dari satu in_bulk);
+      laporan tanpa pendapatan atau dengan baris tidak valid (mis. nominal
+      pecahan) dilewati dan dicatat di 'failures', laporan lain tetap diposting
+    - progress(index, total, report) dipanggil per laporan yang diposting,
+      setelah jurnalnya tersimpan
+
+    Return: {'posted': [laporan], 'entries': [JournalEntry], 'failures': [(laporan, pesan)]}
+    """
+    with transaction.atomic():
+        drafts = list(
+            reports.filter(status='draft').select_for_update().order_by('date')
         )
+        if not drafts:
+            return {'posted': [], 'entries': [], 'failures': []}
 
-        # 3. Kredit Pendapatan sesuai akun
-        for account, amount in revenue_map.items():
-            JournalItem.objects.create(
-                journal_entry=entry,
-                account=account,
-                debit=Decimal('0'),
-                credit=amount,
-                note=f"Pendapatan dari {report.date}"
-            )
-
-        # 4. Catat pengeluaran operasional (Debit beban, Kredit Kas)
-        if total_expense > 0:
-            for account, amount, description in expense_entries:
-                JournalItem.objects.create(
-                    journal_entry=entry,
-                    account=account,
-                    debit=amount,
-                    credit=Decimal('0'),
-                    note=description or ""
-                )
-
-            JournalItem.objects.create(
-                journal_entry=entry,
-                account=cash_account,
-                debit=Decimal('0'),
-                credit=total_expense,
-                note="Pengeluaran operasional parkir"
-            )
+        amounts = reports_amounts(drafts)
+        cash_account = get_default_cash_account()
 
-        # TODO: Tangani ParkingRevenueRule bila diperlukan (misalnya bagi hasil/pajak)
+        # ---------------------------
+        # VALIDASI PER LAPORAN
+        # ---------------------------
+        lines = {
+            report.id: report_journal_lines(report.date, amounts[report.id], cash_account.id)
+            for report in drafts
+        }
+        account_ids = {line['account_id'] for report_lines in lines.values() for line in report_lines}
+        accounts = {str(pk): account for pk, account in Account.objects.in_bulk(account_ids).items()}
+
+        valid, failures = [], []
+        for report in drafts:
+            if amounts[report.id]['total_revenue'] <= 0:
+                failures.append((report, "Total pendapatan (bruto) masih 0."))
+                continue
+            lines[report.id] = with_accounts(lines[report.id], accounts)
+            try:
+                clean_lines(lines[report.id])
+            except JournalPostingError as e:
+                failures.append((report, str(e)))
+                continue
+            valid.append(report)
+
+        # ---------------------------
+        # SUSUN JURNAL
+        # ---------------------------
+        groups = []
+        if consolidate:
+            by_period = {}
+            for report in valid:
+                by_period.setdefault(report.date.strftime('%Y-%m'), []).append(report)
+            for period, period_reports in by_period.items():
+                merged = merge_amounts(amounts[report.id] for report in period_reports)
+                first, last = period_reports[0].date, period_reports[-1].date
+                label = first if first == last else f"{first} s/d {last}"
+                groups.append((period_reports, {
+                    'date': period_reports[-1].date,
+                    'description': f"Pendapatan Parkir {period} ({len(period_reports)} hari)",
+                    'lines': with_accounts(report_journal_lines(label, merged, cash_account.id), accounts),
+                }))
+        else:
+            groups = [
+                ([report], {
+                    'date': report.date,
+                    'description': f"Pendapatan Parkir {report.date}",
+                    'lines': lines[report.id],
+                })
+                for report in valid
+            ]
+
+        entries = post_journals([journal for _, journal in groups]) if groups else []
+
+        # ---------------------------
+        # FINALISASI (satu bulk_update)
+        # ---------------------------
+        posted_at = timezone.now()
+        posted = []
+        for (group_reports, _), entry in zip(groups, entries):
+            for report in group_reports:
+                report.status = 'posted'
+                report.journal_entry_id = entry.id
+                report.posted_at = posted_at
+                posted.append(report)
+
+        ParkingDailyReport.objects.bulk_update(posted, ['status', 'journal_entry_id', 'posted_at'])
+
+    if progress:
+        for index, report in enumerate(posted, start=1):
+            progress(index, len(posted), report)
+
+    return {'posted': posted, 'entries': entries, 'failures': failures}
+
+
+# ==========================================================
+# 📤 EKSPOR LAPORAN HARIAN
+# ==========================================================
+def parking_reports_export(date_from=None, date_to=None):
+    """
+    Dataset ekspor laporan parkir (format sama dengan LEDGER_EXPORTS):
+    total per laporan dari with_totals(), dibaca lewat .iterator().
+    """
+    reports = ParkingDailyReport.objects.with_totals()
+    if date_from:
+        reports = reports.filter(date__gte=date_from)
+    if date_to:
+        reports = reports.filter(date__lte=date_to)
+
+    reports = (
+        reports.order_by('date')
+        .values_list(
+            'date',
+            'status',
+            'description',
+            'created_by__username',
+            'bruto_total',
+            'total_expense',
+            'net_cash',
+            'journal_entry_id',
+            'posted_at',
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
 
-        # 5. Finalisasi
-        report.status = 'posted'
-        report.journal_entry_id = entry.id
-        report.posted_at = timezone.now()
-        report.save()
+    def rows():
+        for *values, posted_at in reports:
+            # XLSX tidak menerima datetime ber-timezone
+            if posted_at and timezone.is_aware(posted_at):
+                posted_at = timezone.make_naive(posted_at)
+            yield values + [posted_at]
 
-    return entry
+    scope = f"{date_from or 'awal'}-{date_to or 'akhir'}" if (date_from or date_to) else 'semua'
+    return {
+        'title': "Laporan Parkir",
+        'filename': f"laporan-parkir-{scope}",
+        'header': ["Tanggal", "Status", "Keterangan", "Dibuat Oleh", "Bruto", "Biaya", "Kas Bersih", "ID Jurnal", "Diposting"],
+        'rows': rows(),
+    }
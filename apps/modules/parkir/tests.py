@@ -1,3 +1,239 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.modules.ledger.models import Account, ClosingPeriod, JournalEntry
+from apps.modules.ledger.services import period_status
+
+from .models import ParkingDailyReport, ParkingExpense, ParkingTicketItem
+from .services import post_parking_reports
+
+# Cache in-memory agar test tidak bergantung pada Redis
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'parkir-tests',
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ParkirTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        period_status.invalidate_period_status()
+
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'rahasia')
+        self.kas = Account.objects.create(
+            coa='1101', account_name='Kas', account_type='ASSET', balance_type='Debit', coa_role_default='cash',
+        )
+        self.pendapatan = Account.objects.create(
+            coa='4101', account_name='Pendapatan Parkir', account_type='INCOME', balance_type='Credit',
+        )
+        self.beban = Account.objects.create(
+            coa='6104', account_name='Beban Operasional Parkir', account_type='EXPENSES', balance_type='Debit',
+        )
+        ClosingPeriod.objects.create(period='2025-02')
+
+    def make_report(self, report_date, lembar=10, price='2000', expense=None, status='draft'):
+        report = ParkingDailyReport.objects.create(date=report_date, created_by=self.user, status=status)
+        ParkingTicketItem.objects.create(
+            report=report, revenue_account=self.pendapatan,
+            start_serial=1, end_serial=lembar or 1, lembar=lembar, price=Decimal(price),
+        )
+        if expense:
+            ParkingExpense.objects.create(
+                report=report, expense_account=self.beban, description='Upah juru parkir', amount=Decimal(expense),
+            )
+        return report
+
+
+class ReportTotalsTests(ParkirTestCase):
+    def make_rich_report(self, report_date):
+        """Laporan dengan beberapa tiket (satu tanpa lembar) dan beberapa pengeluaran."""
+        report = self.make_report(report_date, lembar=10, price='2000', expense='5000')
+        ParkingTicketItem.objects.create(
+            report=report, revenue_account=self.pendapatan, start_serial=11, end_serial=15, lembar=5, price=Decimal('3000'),
+        )
+        ParkingTicketItem.objects.create(
+            report=report, revenue_account=self.pendapatan, start_serial=16, end_serial=16, lembar=None, price=Decimal('4000'),
+        )
+        ParkingExpense.objects.create(
+            report=report, expense_account=self.beban, description='Listrik', amount=Decimal('1500'),
+        )
+        return report
+
+    def test_with_totals_matches_model_totals(self):
+        rich = self.make_rich_report(date(2025, 2, 1))
+        self.make_report(date(2025, 2, 2), lembar=None)
+        self.make_report(date(2025, 2, 3), lembar=3, expense='1000')
+        ParkingDailyReport.objects.create(date=date(2025, 2, 4), created_by=self.user)
+
+        reports = ParkingDailyReport.objects.with_totals().order_by('date')
+
+        for report in reports:
+            expense = report.expenses.aggregate(total=Sum('amount'))['total'] or Decimal('0')
+            self.assertEqual(report.bruto_total, report.total_bruto())
+            self.assertEqual(report.total_expense, expense)
+            self.assertEqual(report.net_cash, report.total_bruto() - expense)
+
+        # 10 x 2000 + 5 x 3000 + 0 x 4000; pengeluaran 5000 + 1500
+        totals = reports.get(pk=rich.pk)
+        self.assertEqual(
+            (totals.bruto_total, totals.total_expense, totals.net_cash),
+            (Decimal('35000'), Decimal('6500'), Decimal('28500')),
+        )
+
+    def test_changelist_query_count_does_not_grow(self):
+        self.client.force_login(self.user)
+        url = reverse('admin:parkir_parkingdailyreport_changelist')
+
+        def changelist_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        for day in (1, 2):
+            self.make_rich_report(date(2025, 2, day))
+        few = changelist_queries()
+        for day in range(3, 9):
+            self.make_rich_report(date(2025, 2, day))
+
+        self.assertEqual(changelist_queries(), few)
+
+
+class PostParkingReportsTests(ParkirTestCase):
+    def journal_totals(self, entry):
+        return entry.items.aggregate(debit=Sum('debit'), credit=Sum('credit'))
+
+    def test_posts_one_journal_per_report(self):
+        first = self.make_report(date(2025, 1, 30), lembar=10, expense='5000')
+        second = self.make_report(date(2025, 2, 1), lembar=5)
+        empty = self.make_report(date(2025, 2, 2), lembar=0)
+        self.make_report(date(2025, 2, 3), status='posted')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = post_parking_reports(ParkingDailyReport.objects.all())
+
+        self.assertEqual([report.pk for report in result['posted']], [first.pk, second.pk])
+        self.assertEqual([report.pk for report, _ in result['failures']], [empty.pk])
+        self.assertEqual(len(result['entries']), 2)
+
+        first.refresh_from_db()
+        self.assertEqual(first.status, 'posted')
+        self.assertIsNotNone(first.posted_at)
+        entry = JournalEntry.objects.get(pk=first.journal_entry_id)
+        self.assertEqual(entry.description, "Pendapatan Parkir 2025-01-30")
+        self.assertEqual(self.journal_totals(entry), {'debit': 25000, 'credit': 25000})
+        self.assertEqual(
+            sorted(entry.items.values_list('account_id', 'debit', 'credit')),
+            sorted([
+                (self.kas.id, 20000, 0),
+                (self.pendapatan.id, 0, 20000),
+                (self.beban.id, 5000, 0),
+                (self.kas.id, 0, 5000),
+            ]),
+        )
+
+        empty.refresh_from_db()
+        self.assertEqual(empty.status, 'draft')
+
+    def test_consolidated_posting_groups_by_month(self):
+        january = [self.make_report(date(2025, 1, day), lembar=day) for day in (28, 29)]
+        february = self.make_report(date(2025, 2, 1), lembar=4, expense='1000')
+
+        result = post_parking_reports(ParkingDailyReport.objects.all(), consolidate=True)
+
+        self.assertEqual(len(result['entries']), 2)
+        january_entry, february_entry = result['entries']
+        self.assertEqual(january_entry.description, "Pendapatan Parkir 2025-01 (2 hari)")
+        self.assertEqual(january_entry.date, date(2025, 1, 29))
+        self.assertEqual(self.journal_totals(january_entry), {'debit': (28 + 29) * 2000, 'credit': (28 + 29) * 2000})
+        self.assertEqual(self.journal_totals(february_entry), {'debit': 9000, 'credit': 9000})
+
+        journal_ids = set(ParkingDailyReport.objects.values_list('journal_entry_id', flat=True))
+        self.assertEqual(journal_ids, {january_entry.id, february_entry.id})
+        self.assertEqual(
+            {report.pk for report in result['posted']},
+            {january[0].pk, january[1].pk, february.pk},
+        )
+
+    def test_posted_reports_are_not_posted_twice(self):
+        self.make_report(date(2025, 2, 1))
+        post_parking_reports(ParkingDailyReport.objects.all())
+
+        result = post_parking_reports(ParkingDailyReport.objects.all())
+
+        self.assertEqual(result, {'posted': [], 'entries': [], 'failures': []})
+        self.assertEqual(JournalEntry.objects.count(), 1)
+
+    def test_invalid_report_does_not_block_the_batch(self):
+        first = self.make_report(date(2025, 2, 1), lembar=10, price='2000')
+        fractional = self.make_report(date(2025, 2, 2), lembar=1, price='2500.50')
+        third = self.make_report(date(2025, 2, 3), lembar=10, price='2000')
+
+        result = post_parking_reports(ParkingDailyReport.objects.all())
+
+        self.assertEqual([report.pk for report in result['posted']], [first.pk, third.pk])
+        self.assertEqual(len(result['failures']), 1)
+        failed, reason = result['failures'][0]
+        self.assertEqual(failed.pk, fractional.pk)
+        self.assertIn('bilangan bulat', reason)
+
+        fractional.refresh_from_db()
+        self.assertEqual((fractional.status, fractional.journal_entry_id), ('draft', None))
+        self.assertEqual(JournalEntry.objects.count(), 2)
+
+    def test_invalid_report_left_out_of_consolidated_journal(self):
+        self.make_report(date(2025, 2, 1), lembar=10)
+        self.make_report(date(2025, 2, 2), lembar=1, price='2500.50')
+
+        result = post_parking_reports(ParkingDailyReport.objects.all(), consolidate=True)
+
+        self.assertEqual(len(result['posted']), 1)
+        self.assertEqual(len(result['failures']), 1)
+        self.assertEqual(result['entries'][0].description, "Pendapatan Parkir 2025-02 (1 hari)")
+        self.assertEqual(self.journal_totals(result['entries'][0]), {'debit': 20000, 'credit': 20000})
+
+    def test_progress_reported_after_journal_written(self):
+        self.make_report(date(2025, 2, 1))
+        self.make_report(date(2025, 2, 2), lembar=0)
+        self.make_report(date(2025, 2, 3))
+        calls = []
+
+        def progress(index, total, report):
+            # jurnal laporan sudah tersimpan saat progress dipanggil
+            self.assertTrue(JournalEntry.objects.filter(pk=report.journal_entry_id).exists())
+            calls.append((index, total, report.date))
+
+        post_parking_reports(ParkingDailyReport.objects.all(), progress=progress)
+
+        self.assertEqual(calls, [(1, 2, date(2025, 2, 1)), (2, 2, date(2025, 2, 3))])
+
+    def test_admin_action_posts_selected_reports(self):
+        selected = self.make_report(date(2025, 2, 1))
+        other = self.make_report(date(2025, 2, 2))
+        self.client.force_login(self.user)
+
+        response = self.client.post(
+            reverse('admin:parkir_parkingdailyreport_changelist'),
+            {'action': 'post_selected_reports', '_selected_action': [selected.pk]},
+            follow=True,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            "1 laporan diposting ke 1 jurnal.",
+            [str(message) for message in response.context['messages']],
+        )
+        selected.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((selected.status, other.status), ('posted', 'draft'))
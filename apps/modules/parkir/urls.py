@@ -6,6 +6,7 @@ app_name = 'parkir'
 urlpatterns = [
     path('', views.parkir_index, name='index'),
     path('daftar-laporan/', views.report_list, name='report_list'),
+    path('daftar-laporan/export/', views.report_export, name='report_export'),
     path('<int:pk>/', views.report_detail, name='report_detail'),
     path('<int:pk>/post/', views.post_to_ledger, name='post_to_ledger'),
     path('<int:pk>/buat-jurnal/', views.report_create_journal, name='report_create_journal'),
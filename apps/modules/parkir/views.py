@@ -1,8 +1,9 @@
+from datetime import datetime
+
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Sum
-from django.http import JsonResponse
+from django.http import HttpResponseBadRequest, JsonResponse
 from django.views.decorators.http import require_GET
 from django.utils import timezone
 
@@ -12,7 +13,8 @@ from .models import (
     ParkingExpense,
     TicketType,
 )
-from .services import post_parking_daily_report, prepare_journal_prefill
+from apps.modules.ledger.services import ExportError, export_response
+from .services import parking_reports_export, post_parking_daily_report, prepare_journal_prefill
 from .forms import (
     ParkingDailyReportForm,
     TicketItemFormSet,
@@ -102,31 +104,43 @@ def parking_daily_report_manage(request, pk=None):
 
 @login_required
 def report_list(request):
-    reports = ParkingDailyReport.objects.all().order_by('-date')
+    reports = ParkingDailyReport.objects.with_totals().order_by('-date')
     return render(request, 'parkir/report_list.html', {
         'reports': reports
     })
 
 
+@login_required
+def report_export(request):
+    """Unduh laporan harian sebagai CSV / XLSX (GET: format, from, to dalam YYYY-MM-DD)."""
+    dates = {}
+    for key in ('from', 'to'):
+        value = request.GET.get(key)
+        try:
+            dates[key] = datetime.strptime(value, '%Y-%m-%d').date() if value else None
+        except ValueError:
+            return HttpResponseBadRequest("Format tanggal tidak valid. Gunakan YYYY-MM-DD.")
+
+    try:
+        return export_response(parking_reports_export(dates['from'], dates['to']), request.GET.get('format', 'csv'))
+    except ExportError as e:
+        return HttpResponseBadRequest(str(e))
+
+
 @login_required
 def report_detail(request, pk):
-    report = get_object_or_404(ParkingDailyReport, pk=pk)
+    report = get_object_or_404(ParkingDailyReport.objects.with_totals(), pk=pk)
 
     tickets = report.items.all()
     expenses = report.expenses.all()
 
-    total_bruto = report.total_bruto()
-    total_expense = expenses.aggregate(
-        total=Sum('amount')
-    )['total'] or 0
-
     context = {
         'report': report,
         'tickets': tickets,
         'expenses': expenses,
-        'total_bruto': total_bruto,
-        'total_expense': total_expense,
-        'net_cash': total_bruto - total_expense,
+        'total_bruto': report.bruto_total,
+        'total_expense': report.total_expense,
+        'net_cash': report.net_cash,
     }
     return render(request, 'parkir/report_detail.html', context)
 
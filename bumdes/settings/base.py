@@ -46,10 +46,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'apps.core.middleware.QueryMetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.core.middleware.UserRolesMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -107,6 +109,34 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 DJANGO_LEDGER_CURRENCY_SYMBOL = 'Rp'
 DJANGO_LEDGER_SPACED_CURRENCY_SYMBOL = True
 
+# Cache hasil laporan ledger untuk periode yang masih open (detik).
+LEDGER_REPORT_CACHE_TIMEOUT = 60 * 5
+# Periode / tahun closed tidak berubah lagi, cukup dihitung ulang sehari sekali.
+LEDGER_REPORT_CLOSED_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Instrumentasi query per view (lihat apps.core.middleware)
+QUERY_METRICS_ENABLED = os.getenv('QUERY_METRICS_ENABLED', '0') == '1'
+QUERY_METRICS_SERVER_TIMING = False
+QUERY_METRICS_BUDGETS = {
+    'default': {'queries': 50, 'db_ms': 500},
+    'ledger_report': {'queries': 20},
+    'balance_sheet_view': {'queries': 15},
+    'profit_and_loss_report': {'queries': 15},
+    'profitabilitas_view': {'queries': 15},
+    'solvabilitas_view': {'queries': 15},
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'apps.core.query_metrics': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 CKEDITOR_UPLOAD_PATH = "uploads/"
 
 
@@ -2,6 +2,9 @@ from .base import *
 
 DEBUG = True
 
+QUERY_METRICS_ENABLED = True
+QUERY_METRICS_SERVER_TIMING = True
+
 ALLOWED_HOSTS = ['127.0.0.1', '192.168.1.102', 'localhost']
 CSRF_TRUSTED_ORIGINS = ['https://*.preview.app.github.dev']
 